@@ -4,6 +4,19 @@ from .base import BenchmarkBase, BenchmarkResult
 from .filesystem import FilesystemBenchmark
 from .native_s3 import NativeS3Benchmark
 from .metrics import MetricsCollector
+from .payload import PayloadPool
+from .parallel import run_multiprocess
+from .spec import WorkloadSpec, load_specs
+from .engine import compile_schedule
+from .loadsweep import LoadSweep, sweep_offered_load
+from .tuning import TuningResult, sweep_configurations
+from .listing import ListingScale, sweep_listing
+from .clients import CLIENT_PROFILES, client_config
+from .repetition import aggregate_runs, run_repeated
+from .resources import ResourceSampler
+from .live import REGISTRY, LiveMetrics, MetricsServer
+from .distributed import WorkerServer, run_distributed
+from .visibility import VisibilityBenchmark
 from .visualize import generate_all_plots
 
 __all__ = [
@@ -12,5 +25,27 @@ __all__ = [
     'FilesystemBenchmark',
     'NativeS3Benchmark',
     'MetricsCollector',
+    'PayloadPool',
+    'run_multiprocess',
+    'WorkloadSpec',
+    'load_specs',
+    'compile_schedule',
+    'LoadSweep',
+    'sweep_offered_load',
+    'TuningResult',
+    'sweep_configurations',
+    'ListingScale',
+    'sweep_listing',
+    'CLIENT_PROFILES',
+    'client_config',
+    'aggregate_runs',
+    'run_repeated',
+    'ResourceSampler',
+    'REGISTRY',
+    'LiveMetrics',
+    'MetricsServer',
+    'WorkerServer',
+    'run_distributed',
+    'VisibilityBenchmark',
     'generate_all_plots'
 ]
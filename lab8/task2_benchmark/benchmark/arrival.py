@@ -0,0 +1,47 @@
+"""Расписание запуска операций для open-loop нагрузки"""
+
+import numpy as np
+
+
+class ArrivalSchedule:
+    """
+    Расписание моментов запуска операций с заданной интенсивностью.
+
+    fixed   - операции через равные интервалы 1/rate
+    poisson - экспоненциальные интервалы (пуассоновский поток)
+
+    Смещения считаются заранее, чтобы генерация случайных чисел
+    не попадала в измеряемый участок.
+    """
+
+    FIXED = "fixed"
+    POISSON = "poisson"
+    KINDS = (FIXED, POISSON)
+
+    def __init__(self, rate: float, arrival: str = FIXED, phase: float = 0.0,
+                 seed: int = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if arrival not in self.KINDS:
+            raise ValueError(f"Unknown arrival process: {arrival}")
+        self.rate = rate
+        self.arrival = arrival
+        self.phase = phase
+        self.seed = seed
+
+    def offsets(self, count: int) -> np.ndarray:
+        """Моменты запуска count операций (в секундах от старта)"""
+        if self.arrival == self.POISSON:
+            rng = np.random.default_rng(self.seed)
+            gaps = rng.exponential(1.0 / self.rate, count)
+            return self.phase + np.cumsum(gaps)
+        return self.phase + np.arange(count) / self.rate
+
+    def split(self, parts: int, index: int) -> 'ArrivalSchedule':
+        """
+        Доля расписания для одного из parts исполнителей.
+        Для fixed исполнители сдвинуты по фазе, чтобы не стартовать пачкой.
+        """
+        seed = None if self.seed is None else self.seed * 1000003 + index
+        phase = self.phase + (index / self.rate if self.arrival == self.FIXED else 0.0)
+        return ArrivalSchedule(self.rate / parts, self.arrival, phase, seed)
@@ -1,10 +1,22 @@
 """Базовые классы для бенчмарков"""
 
+import copy
+import itertools
+import threading
 import time
-import numpy as np
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, asdict
-from typing import List
+from dataclasses import dataclass, asdict, field
+from typing import Callable, Dict, List, Optional
+from .arrival import ArrivalSchedule
+from .histogram import LatencyHistogram
+from .live import REGISTRY, LiveSeries, progress_reporter
+from .resources import DEFAULT_INTERVAL_SEC, ResourceSampler
+from .steady import trim_transient
+from .timeseries import TimeSeriesSampler
+
+
+# Число итераций прогрева, ограниченного только временем
+UNBOUNDED_WARMUP = 10 ** 12
 
 
 @dataclass
@@ -20,6 +32,39 @@ class BenchmarkResult:
     errors: int
     total_time_sec: float
     iterations: int
+    concurrency: int = 1
+    processes: int = 1
+    # Узлы распределенного прогона (distributed.py)
+    nodes: int = 1
+    latency_p50_ms: float = 0.0
+    latency_p90_ms: float = 0.0
+    latency_p999_ms: float = 0.0
+    latency_max_ms: float = 0.0
+    target_rate: float = 0.0
+    arrival: str = ""
+    cleanup_objects: int = 0
+    cleanup_time_sec: float = 0.0
+    cleanup_objects_per_sec: float = 0.0
+    # Прогрев (не входит в метрики) и отсеченный переходный участок (--steady-state)
+    warmup_iterations: int = 0
+    warmup_sec: float = 0.0
+    transient_iterations: int = 0
+    transient_sec: float = 0.0
+    # Фазы HTTP запросов native_s3 (phases.py): гистограммы фаз, повторы, соединения
+    http_phases: Optional[Dict] = field(default=None, repr=False)
+    # Ресурсы клиента и хоста за время замера (resources.py): CPU, RSS, сеть, диск
+    resources: Optional[Dict] = field(default=None, repr=False)
+    # Повторы (--repeat): средние по прогонам, полуширины 95% интервалов, выбросы
+    repeats: int = 1
+    outlier_runs: int = 0
+    throughput_ci_mbps: float = 0.0
+    latency_p99_ci_ms: float = 0.0
+    run_throughputs: Optional[List[float]] = field(default=None, repr=False)
+    run_latency_p99s: Optional[List[float]] = field(default=None, repr=False)
+    run_outliers: Optional[List[bool]] = field(default=None, repr=False)
+    latency_histogram: Optional[Dict] = field(default=None, repr=False)
+    # MB/s по полным окнам временного ряда (для доверительных интервалов)
+    throughput_windows: Optional[List[float]] = field(default=None, repr=False)
 
     def to_dict(self):
         return asdict(self)
@@ -31,8 +76,21 @@ class BenchmarkBase(ABC):
     def __init__(self, name: str, storage_type: str):
         self.name = name
         self.storage_type = storage_type
-        self.latencies: List[float] = []
+        self.histogram = LatencyHistogram()
         self.errors = 0
+        self.worker_id = 0
+        self.recorder = None
+        # Ячейка живых метрик потока (live.py); None - не записывать
+        self.live = None
+        self.cleanup_stats = (0, 0.0)
+        self.warmup_stats = (0, 0.0)
+        # Статистика фаз запросов (PhaseStats), если бенчмарк ее собирает
+        self.phase_stats = None
+        # Период опроса ресурсов (resources.py); 0 - не собирать
+        self.resource_interval = DEFAULT_INTERVAL_SEC
+        # Начало отсчета задержки, переставленное итерацией (restart_latency)
+        self._latency_start = None
+        self._name_counter = itertools.count()
 
     @abstractmethod
     def setup(self):
@@ -48,48 +106,322 @@ class BenchmarkBase(ABC):
         pass
 
     @abstractmethod
-    def cleanup(self):
-        """Очистка после теста"""
+    def cleanup(self) -> Optional[int]:
+        """Очистка после теста; возвращает число удаленных объектов"""
         pass
 
-    def run(self, iterations: int = 100) -> BenchmarkResult:
-        """Запуск бенчмарка с указанным количеством итераций"""
+    def timed_cleanup(self):
+        """cleanup() с замером времени - удаление тоже отдельная метрика"""
+        start = time.perf_counter()
+        deleted = self.cleanup()
+        self.cleanup_stats = (deleted or 0, time.perf_counter() - start)
+
+    def _warmup(self, iterations: int = 0, duration: float = None) -> int:
+        """
+        Прогрев: итерации без учета в метриках (соединения, TLS, кэши ФС).
+        iterations и/или duration (сек) - что наступит раньше.
+        Возвращает число выполненных итераций.
+        """
+        if not iterations and not duration:
+            return 0
+        histogram, errors, recorder, live = self.histogram, self.errors, self.recorder, self.live
+        self.histogram, self.errors, self.recorder, self.live = LatencyHistogram(), 0, None, None
+        try:
+            self._run_loop(iterations or UNBOUNDED_WARMUP, duration=duration)
+            return self.histogram.total_count + self.errors
+        finally:
+            self.histogram, self.errors, self.recorder, self.live = histogram, errors, recorder, live
+
+    def spawn_worker(self, worker_id: int) -> 'BenchmarkBase':
+        """
+        Копия бенчмарка для отдельного потока нагрузки.
+        Подготовленные в setup() данные общие, счетчики и метрики - свои.
+        """
+        worker = copy.copy(self)
+        worker.worker_id = worker_id
+        worker.histogram = LatencyHistogram()
+        worker.errors = 0
+        worker.live = None
+        worker._name_counter = itertools.count()
+        return worker
+
+    def partition(self, index: int, count: int):
+        """
+        Доля общей нагрузки для процесса (узла) index из count; бенчмарки
+        с заранее вычисленным расписанием делят его строки (engine.py).
+        """
+        pass
+
+    def __getstate__(self):
+        """Состояние для передачи бенчмарка в другой процесс"""
+        state = self.__dict__.copy()
+        state.pop('_name_counter', None)
+        state['recorder'] = None
+        state['live'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._name_counter = itertools.count()
+
+    def resource_sampler(self, pids: List[int] = None) -> Optional[ResourceSampler]:
+        """
+        Сэмплер ресурсов на время замера: pids - процессы клиента
+        (по умолчанию текущий), FUSE демон ищется по точке монтирования.
+        """
+        if not self.resource_interval:
+            return None
+        return ResourceSampler(self.resource_interval, getattr(self, 'mount_point', None),
+                               pids)
+
+    def restart_latency(self):
+        """
+        Считать задержку текущей итерации с этого момента: подготовительная
+        часть итерации (например, запись перед ожиданием видимости) не входит
+        в задержку, но входит во время прогона.
+        """
+        self._latency_start = time.perf_counter()
+
+    def _next_name(self, prefix: str) -> str:
+        """Уникальное имя файла/объекта в пределах всех потоков"""
+        return f"{prefix}_{self.worker_id}_{next(self._name_counter)}.dat"
+
+    def run(self, iterations: int = 100, concurrency: int = 1,
+            rate: float = None, arrival: str = ArrivalSchedule.FIXED,
+            sampler: TimeSeriesSampler = None,
+            duration: float = None, warmup: int = 0, warmup_sec: float = None,
+            steady_state: bool = False) -> BenchmarkResult:
+        """
+        Запуск бенчмарка с указанным количеством итераций.
+        При concurrency > 1 итерации распределяются между потоками.
+        duration (сек) - остановиться по времени, даже если итерации не кончились.
+        warmup / warmup_sec - прогрев итерациями / по времени до начала замера.
+        steady_state - отсечь переходный участок по окнам sampler
+        (нужен keep_histograms=True, см. steady.py).
+        
+        Если задан rate (операций/сек), нагрузка open-loop: операции
+        запускаются по расписанию, а задержка считается от запланированного
+        момента старта (коррекция coordinated omission).
+        
+        sampler - запись временного ряда (ops/байты/задержки по окнам).
+        Живые метрики и прогресс пишутся в серию REGISTRY (live.py).
+        """
         print(f"[{self.storage_type}] Запуск {self.name}...")
         
+        schedule = ArrivalSchedule(rate, arrival) if rate else None
+        
         self.setup()
-        total_bytes = 0
-        self.latencies = []
+        self.histogram = LatencyHistogram()
         self.errors = 0
+        resources = self.resource_sampler()
+        live = REGISTRY.series(self.storage_type, self.name)
+        progress = progress_reporter(live, iterations, duration)
+        live.start()
         
-        start_time = time.perf_counter()
+        try:
+            if concurrency > 1:
+                def on_ready():
+                    if resources:
+                        resources.start()
+                    if sampler and sampler.start_time is None:
+                        sampler.start()
+                    if progress:
+                        progress.start()
+                
+                total_bytes, total_time = self._run_concurrent(iterations, concurrency,
+                                                               schedule, sampler, duration,
+                                                               warmup, warmup_sec, on_ready,
+                                                               live)
+            else:
+                warmup_start = time.perf_counter()
+                warmed = self._warmup(warmup, warmup_sec)
+                self.warmup_stats = (warmed, time.perf_counter() - warmup_start)
+                self.recorder = sampler.recorder() if sampler else None
+                self.live = live.cell()
+                if self.phase_stats:
+                    self.phase_stats.start()
+                if resources:
+                    resources.start()
+                if progress:
+                    progress.start()
+                start_time = time.perf_counter()
+                if sampler:
+                    sampler.start(start_time)
+                total_bytes = self._run_loop(iterations, schedule=schedule, duration=duration)
+                total_time = time.perf_counter() - start_time
+                self.recorder = None
+                self.live = None
+        finally:
+            if progress:
+                progress.stop()
+            live.stop()
+        
+        if resources:
+            resources.stop()
+        if self.phase_stats:
+            self.phase_stats.stop()
+        
+        if sampler:
+            sampler.stop()
+        
+        self.timed_cleanup()
+        
+        if duration is not None:
+            # Прогон по времени: итераций столько, сколько успели выполнить
+            iterations = self.histogram.total_count + self.errors
+        result = self._calculate_results(total_bytes, total_time, iterations,
+                                         concurrency)
+        if schedule:
+            result.target_rate = schedule.rate
+            result.arrival = schedule.arrival
+        if resources:
+            result.resources = resources.summary(result.throughput_mbps)
+        if sampler:
+            result.throughput_windows = sampler.throughput_windows()
+            if steady_state:
+                result = trim_transient(result, sampler)
+        return result
+
+    def _run_loop(self, iterations: int, schedule: ArrivalSchedule = None,
+                  duration: float = None) -> float:
+        """Последовательное выполнение итераций в текущем потоке"""
+        total_bytes = 0
+        offsets = schedule.offsets(iterations).tolist() if schedule else None
+        loop_start = time.perf_counter()
+        deadline = loop_start + duration if duration is not None else None
         
         for i in range(iterations):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
             try:
-                iter_start = time.perf_counter()
+                if offsets is not None:
+                    # Open-loop: ждем запланированного момента, но если
+                    # отстаем - задержка все равно считается от него
+                    iter_start = loop_start + offsets[i]
+                    delay = iter_start - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                else:
+                    iter_start = time.perf_counter()
+                self._latency_start = None
                 bytes_processed = self.run_iteration()
-                iter_elapsed = time.perf_counter() - iter_start
+                iter_end = time.perf_counter()
+                if self._latency_start is not None:
+                    iter_start = self._latency_start
+                latency_ms = (iter_end - iter_start) * 1000  # в миллисекунды
                 
-                self.latencies.append(iter_elapsed * 1000)  # в миллисекунды
+                self.histogram.record(latency_ms)
                 total_bytes += bytes_processed
-                
-                if (i + 1) % max(1, iterations // 10) == 0:
-                    print(f"  Progress: {i + 1}/{iterations}")
+                if self.recorder:
+                    self.recorder.record(iter_end, latency_ms, bytes_processed)
+                if self.live:
+                    self.live.record(latency_ms, bytes_processed)
                     
             except Exception as e:
                 print(f"  Error in iteration {i}: {e}")
                 self.errors += 1
+                if self.recorder:
+                    self.recorder.record_error(time.perf_counter())
+                if self.live:
+                    self.live.record_error()
+        
+        return total_bytes
+
+    def _run_concurrent(self, iterations: int, concurrency: int,
+                        schedule: ArrivalSchedule = None,
+                        sampler: TimeSeriesSampler = None,
+                        duration: float = None, warmup: int = 0,
+                        warmup_sec: float = None, on_ready: Callable = None,
+                        live: LiveSeries = None):
+        """
+        Выполнение итераций в concurrency потоках.
+        Каждый поток сначала прогревается (warmup делится между потоками),
+        затем все стартуют одновременно, время считается по самому медленному.
+        on_ready - вызывается после прогрева перед общим стартом
+        (по умолчанию запускает sampler); live - серия живых метрик,
+        у каждого потока в ней своя ячейка.
+        """
+        # Номера потоков уникальны и между процессами (см. parallel.py)
+        workers = [self.spawn_worker(self.worker_id * concurrency + i)
+                   for i in range(concurrency)]
+        if sampler:
+            for worker in workers:
+                worker.recorder = sampler.recorder()
+        if live:
+            for worker in workers:
+                worker.live = live.cell()
+        shares = [iterations // concurrency + (1 if i < iterations % concurrency else 0)
+                  for i in range(concurrency)]
+        warmup_shares = [warmup // concurrency + (1 if i < warmup % concurrency else 0)
+                         for i in range(concurrency)]
+        totals = [0.0] * concurrency
+        warmed = [0] * concurrency
+        barrier = threading.Barrier(concurrency + 1)
         
+        def worker_main(index: int):
+            warmed[index] = workers[index]._warmup(warmup_shares[index], warmup_sec)
+            barrier.wait()  # прогрев закончен
+            barrier.wait()  # общий старт
+            part = schedule.split(concurrency, index) if schedule else None
+            totals[index] = workers[index]._run_loop(shares[index], schedule=part,
+                                                     duration=duration)
+        
+        threads = [threading.Thread(target=worker_main, args=(i,), daemon=True)
+                   for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        
+        warmup_start = time.perf_counter()
+        barrier.wait()
+        self.warmup_stats = (sum(warmed), time.perf_counter() - warmup_start)
+        # У потоков могут быть свои клиенты - и своя статистика фаз
+        phase_stats = [w.phase_stats for w in workers
+                       if w.phase_stats and w.phase_stats is not self.phase_stats]
+        if self.phase_stats:
+            self.phase_stats.start()
+        for stats in phase_stats:
+            stats.start()
+        
+        # Сэмплер запускается до старта потоков, чтобы первые операции
+        # уже попадали в окна
+        if on_ready:
+            on_ready()
+        elif sampler and sampler.start_time is None:
+            sampler.start()
+        barrier.wait()
+        start_time = time.perf_counter()
+        for thread in threads:
+            thread.join()
         total_time = time.perf_counter() - start_time
         
-        self.cleanup()
+        # Объединяем метрики всех потоков
+        for worker in workers:
+            self.histogram.merge(worker.histogram)
+            self.errors += worker.errors
+        for stats in phase_stats:
+            stats.stop()
+            if self.phase_stats:
+                self.phase_stats.merge(stats)
         
-        return self._calculate_results(total_bytes, total_time, iterations)
+        return sum(totals), total_time
 
     def _calculate_results(self, total_bytes: float, total_time: float, 
-                          iterations: int) -> BenchmarkResult:
+                          iterations: int, concurrency: int = 1,
+                          processes: int = 1) -> BenchmarkResult:
         """Вычисление метрик из собранных данных"""
         
-        if not self.latencies:
+        cleanup_objects, cleanup_time = self.cleanup_stats
+        warmup_iterations, warmup_time = self.warmup_stats
+        cleanup_metrics = {
+            'cleanup_objects': cleanup_objects,
+            'cleanup_time_sec': cleanup_time,
+            'cleanup_objects_per_sec': cleanup_objects / cleanup_time if cleanup_time > 0 else 0.0,
+            'warmup_iterations': warmup_iterations,
+            'warmup_sec': warmup_time,
+            'http_phases': self.phase_stats.to_dict() if self.phase_stats else None,
+        }
+        
+        if not self.histogram.total_count:
             return BenchmarkResult(
                 name=self.name,
                 storage_type=self.storage_type,
@@ -100,7 +432,10 @@ class BenchmarkBase(ABC):
                 latency_p99_ms=0.0,
                 errors=self.errors,
                 total_time_sec=total_time,
-                iterations=iterations
+                iterations=iterations,
+                concurrency=concurrency,
+                processes=processes,
+                **cleanup_metrics
             )
         
         # Throughput в MB/s
@@ -109,21 +444,26 @@ class BenchmarkBase(ABC):
         # IOPS (операций в секунду)
         iops = iterations / total_time if total_time > 0 else 0
         
-        # Latency статистика
-        latencies_arr = np.array(self.latencies)
-        latency_avg = np.mean(latencies_arr)
-        latency_p95 = np.percentile(latencies_arr, 95)
-        latency_p99 = np.percentile(latencies_arr, 99)
+        # Latency статистика из гистограммы
+        histogram = self.histogram
         
         return BenchmarkResult(
             name=self.name,
             storage_type=self.storage_type,
             throughput_mbps=throughput_mbps,
             iops=iops,
-            latency_avg_ms=latency_avg,
-            latency_p95_ms=latency_p95,
-            latency_p99_ms=latency_p99,
+            latency_avg_ms=histogram.mean_ms,
+            latency_p95_ms=histogram.percentile(95),
+            latency_p99_ms=histogram.percentile(99),
             errors=self.errors,
             total_time_sec=total_time,
-            iterations=iterations
+            iterations=iterations,
+            concurrency=concurrency,
+            processes=processes,
+            latency_p50_ms=histogram.percentile(50),
+            latency_p90_ms=histogram.percentile(90),
+            latency_p999_ms=histogram.percentile(99.9),
+            latency_max_ms=histogram.max_ms,
+            latency_histogram=histogram.to_dict(),
+            **cleanup_metrics
         )
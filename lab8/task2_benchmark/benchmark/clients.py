@@ -0,0 +1,72 @@
+"""Профили конфигурации boto3 клиента: пул соединений, повторы, таймауты, keep-alive"""
+
+from typing import Dict
+from botocore.config import Config
+
+# Размер пула соединений boto3 по умолчанию
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+# Профили клиента. Пустой профиль - значения botocore по умолчанию:
+# legacy повторы (до 5 попыток), таймауты соединения и чтения 60 с,
+# без TCP keep-alive
+CLIENT_PROFILES: Dict[str, Dict] = {
+    'default': {},
+    # Рекомендуемый AWS режим повторов: экспоненциальная задержка с джиттером
+    'standard': {
+        'retries': {'mode': 'standard', 'max_attempts': 3},
+        'connect_timeout': 10,
+        'read_timeout': 60,
+        'tcp_keepalive': True,
+    },
+    # standard + ограничение скорости на клиенте при троттлинге (503 SlowDown)
+    'adaptive': {
+        'retries': {'mode': 'adaptive', 'max_attempts': 3},
+        'connect_timeout': 10,
+        'read_timeout': 60,
+        'tcp_keepalive': True,
+    },
+    # Без повторов и с короткими таймаутами: ошибки хранилища видны как есть
+    'fail-fast': {
+        'retries': {'mode': 'standard', 'max_attempts': 1},
+        'connect_timeout': 2,
+        'read_timeout': 10,
+    },
+}
+
+# Параметры Config, которые можно переопределить поверх профиля
+CLIENT_OPTIONS = ('retry_mode', 'max_attempts', 'connect_timeout', 'read_timeout',
+                  'tcp_keepalive')
+
+
+def client_config(profile: str = 'default', max_pool_connections: int = None,
+                  retry_mode: str = None, max_attempts: int = None,
+                  connect_timeout: float = None, read_timeout: float = None,
+                  tcp_keepalive: bool = None) -> Config:
+    """Config для boto3 клиента: профиль, размер пула и явные переопределения"""
+    if profile not in CLIENT_PROFILES:
+        raise ValueError(f"Unknown client profile: {profile} "
+                         f"(expected one of: {', '.join(CLIENT_PROFILES)})")
+    options = dict(CLIENT_PROFILES[profile])
+    retries = dict(options.get('retries', {}))
+    if retry_mode is not None:
+        retries['mode'] = retry_mode
+    if max_attempts is not None:
+        retries['max_attempts'] = max_attempts
+    if retries:
+        options['retries'] = retries
+    for name, value in (('connect_timeout', connect_timeout),
+                        ('read_timeout', read_timeout),
+                        ('tcp_keepalive', tcp_keepalive)):
+        if value is not None:
+            options[name] = value
+    options['max_pool_connections'] = max_pool_connections or DEFAULT_MAX_POOL_CONNECTIONS
+    return Config(**options)
+
+
+def describe_config(config: Config) -> str:
+    """Короткое описание конфигурации для вывода"""
+    retries = config.retries or {}
+    return (f"pool {config.max_pool_connections}, "
+            f"retries {retries.get('mode', 'legacy')}/{retries.get('max_attempts', 'default')}, "
+            f"timeouts {config.connect_timeout}/{config.read_timeout} s, "
+            f"keep-alive {'on' if config.tcp_keepalive else 'off'}")
@@ -0,0 +1,467 @@
+"""Распределенный запуск: координатор раздает нагрузку узлам по HTTP и объединяет их метрики"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from .arrival import ArrivalSchedule
+from .base import BenchmarkBase, BenchmarkResult
+from .histogram import LatencyHistogram
+from .live import REGISTRY, LiveSeries, progress_reporter
+from .phases import PhaseStats
+from .resources import merge_resources
+from .spec import WorkloadSpec
+from .steady import trim_transient
+from .timeseries import TimeSeriesSampler, TimeWindow
+
+DEFAULT_WORKER_PORT = 9600
+DEFAULT_WORKER_HOST = '127.0.0.1'
+# Запас до общего старта: команда /start должна успеть дойти до всех узлов
+START_DELAY_SEC = 1.0
+# Ожидание подготовки узлов (setup и прогрев)
+PREPARE_TIMEOUT_SEC = 300
+# Период опроса состояния узлов (заодно - обновления живых метрик)
+POLL_INTERVAL_SEC = 0.5
+REQUEST_TIMEOUT_SEC = 30
+# Сколько узел может не отвечать на опрос, прежде чем считаться потерянным
+NODE_LOST_SEC = 60
+
+# Состояния прогона на узле
+PREPARING, READY, RUNNING, DONE, FAILED = 'preparing', 'ready', 'running', 'done', 'failed'
+# Метка спецификации нагрузки в JSON параметров бенчмарка
+_SPEC_KEY = '__spec__'
+
+
+def encode_options(options: Dict) -> Dict:
+    """Параметры create_benchmark для JSON: спецификации нагрузок - через to_dict()"""
+    encoded = {}
+    for key, value in options.items():
+        if isinstance(value, WorkloadSpec):
+            value = {_SPEC_KEY: value.to_dict()}
+        elif isinstance(value, dict):
+            value = encode_options(value)
+        encoded[key] = value
+    return encoded
+
+
+def decode_options(options: Dict) -> Dict:
+    decoded = {}
+    for key, value in options.items():
+        if isinstance(value, dict):
+            value = (WorkloadSpec.from_dict(value[_SPEC_KEY]) if _SPEC_KEY in value
+                     else decode_options(value))
+        decoded[key] = value
+    return decoded
+
+
+def _window_to_dict(window: TimeWindow) -> Dict:
+    return {'ops': window.ops, 'bytes': window.bytes, 'errors': window.errors,
+            'histogram': window.histogram.to_dict()}
+
+
+def _window_from_dict(data: Dict) -> TimeWindow:
+    histogram = LatencyHistogram.from_dict(data['histogram'])
+    window = TimeWindow(histogram.significant_digits)
+    window.ops, window.bytes, window.errors = data['ops'], data['bytes'], data['errors']
+    window.histogram = histogram
+    return window
+
+
+class WorkerJob:
+    """
+    Прогон на узле: setup и прогрев, ожидание общего старта от
+    координатора, замер. Метрики узла отдаются целиком (гистограмма,
+    окна временного ряда, фазы HTTP, ресурсы) для объединения.
+    """
+
+    def __init__(self, benchmark: BenchmarkBase, node_index: int, job: Dict):
+        self.benchmark = benchmark
+        self.node_index = node_index
+        self.job = job
+        self.state = PREPARING
+        self.error = None
+        self.result = None
+        self.live = LiveSeries(benchmark.storage_type, benchmark.name)
+        self._start = threading.Event()
+        self._start_at = None
+        self._aborted = False
+        self._thread = threading.Thread(target=self._main, daemon=True)
+
+    def prepare(self):
+        self._thread.start()
+
+    def start(self, start_at: float):
+        """Общий старт в момент start_at по часам узла"""
+        self._start_at = start_at
+        self._start.set()
+
+    def abort(self):
+        self._aborted = True
+        self._start.set()
+
+    def _main(self):
+        benchmark, job = self.benchmark, self.job
+        sampler = (TimeSeriesSampler(window_sec=job['window_sec'],
+                                     keep_histograms=job['keep_histograms'])
+                   if job['window_sec'] else None)
+        schedule = (ArrivalSchedule(job['rate'], job['arrival']).split(job['nodes'],
+                                                                       self.node_index)
+                    if job['rate'] else None)
+        resources = None
+
+        def on_ready():
+            nonlocal resources
+            self.state = READY
+            self._start.wait()
+            if self._aborted:
+                raise RuntimeError("aborted by coordinator")
+            delay = self._start_at - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            self.state = RUNNING
+            resources = benchmark.resource_sampler()
+            if resources:
+                resources.start()
+            if sampler:
+                sampler.start(background=False)
+
+        try:
+            benchmark.setup()
+            benchmark.histogram = LatencyHistogram()
+            benchmark.errors = 0
+            # Номера потоков узлов не пересекаются: имена объектов уникальны
+            benchmark.worker_id = self.node_index
+            benchmark.partition(self.node_index, job['nodes'])
+            total_bytes, total_time = benchmark._run_concurrent(
+                job['iterations'], job['concurrency'], schedule, sampler, job['duration'],
+                job['warmup'], job['warmup_sec'], on_ready, self.live)
+            if resources:
+                resources.stop()
+            throughput = total_bytes / (1024 * 1024) / total_time if total_time > 0 else 0.0
+            self.result = {
+                'histogram': benchmark.histogram.to_dict(),
+                'total_bytes': total_bytes,
+                'total_time': total_time,
+                'errors': benchmark.errors,
+                'warmup': list(benchmark.warmup_stats),
+                'windows': {str(i): _window_to_dict(w)
+                            for i, w in (sampler.drain() if sampler else {}).items()},
+                'http_phases': (benchmark.phase_stats.to_dict()
+                                if benchmark.phase_stats else None),
+                'resources': resources.summary(throughput) if resources else None,
+            }
+            self.state = DONE
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.state = FAILED
+
+    def status(self) -> Dict:
+        return {'state': self.state, 'error': self.error, 'time': time.time(),
+                'live': self.live.totals()}
+
+    def cleanup(self, run: bool) -> List[float]:
+        """Удаление тестовых данных (run - только на одном узле) и освобождение узла"""
+        # Неначатый прогон отменяется, начатый - дорабатывает до конца
+        self.abort()
+        self._thread.join()
+        if run:
+            self.benchmark.timed_cleanup()
+        return list(self.benchmark.cleanup_stats)
+
+
+class WorkerServer:
+    """
+    HTTP API узла (JSON): POST /prepare, GET /status, POST /start,
+    GET /result, POST /cleanup. Одновременно - один прогон.
+    make_benchmark(options) создает бенчмарк по параметрам от координатора.
+    """
+
+    def __init__(self, make_benchmark: Callable[[Dict], Optional[BenchmarkBase]],
+                 port: int = DEFAULT_WORKER_PORT, host: str = DEFAULT_WORKER_HOST):
+        self.make_benchmark = make_benchmark
+        self.port = port
+        self.host = host
+        self.job: Optional[WorkerJob] = None
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def handle(self, method: str, path: str, payload: Dict):
+        """(код ответа, тело) для запроса к API"""
+        with self._lock:
+            job = self.job
+            if (method, path) == ('POST', '/prepare'):
+                if job and job.state in (PREPARING, READY, RUNNING):
+                    return 409, {'error': f"busy with {job.benchmark.name}"}
+                benchmark = self.make_benchmark(decode_options(payload['benchmark']))
+                if benchmark is None:
+                    return 400, {'error': "benchmark is not available on this node"}
+                self.job = WorkerJob(benchmark, payload['node_index'], payload['job'])
+                print(f"[node {payload['node_index']}] {benchmark.storage_type} / "
+                      f"{benchmark.name}")
+                self.job.prepare()
+                return 200, {'time': time.time()}
+        if job is None:
+            if (method, path) == ('POST', '/cleanup'):
+                return 200, {'cleanup': None}
+            return 409, {'error': "no job prepared"}
+        if (method, path) == ('GET', '/status'):
+            return 200, job.status()
+        if (method, path) == ('POST', '/start'):
+            job.start(payload['start_at'])
+            return 200, {}
+        if (method, path) == ('GET', '/result'):
+            if job.state != DONE:
+                return 409, {'error': f"job is {job.state}"}
+            return 200, job.result
+        if (method, path) == ('POST', '/cleanup'):
+            cleanup = job.cleanup(payload.get('cleanup', False))
+            with self._lock:
+                if self.job is job:
+                    self.job = None
+            return 200, {'cleanup': cleanup}
+        return 404, {'error': f"unknown request {method} {path}"}
+
+    def serve_forever(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, method: str):
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b'{}')
+                    code, body = server.handle(method, self.path, payload)
+                except Exception as e:
+                    code, body = 500, {'error': f"{type(e).__name__}: {e}"}
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._respond('GET')
+
+            def do_POST(self):
+                self._respond('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        print(f"🛰️  Worker listening on {self.address}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def shutdown(self):
+        if self._server:
+            self._server.shutdown()
+
+
+class WorkerClient:
+    """Запросы координатора к узлу host:port"""
+
+    def __init__(self, address: str):
+        self.address = address if ':' in address else f"{address}:{DEFAULT_WORKER_PORT}"
+
+    def request(self, method: str, path: str, payload: Dict = None,
+                timeout: float = REQUEST_TIMEOUT_SEC) -> Dict:
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(f"http://{self.address}{path}", data=data,
+                                         method=method,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get('error')
+            except ValueError:
+                message = e.reason
+            raise RuntimeError(f"{self.address}: {message}") from None
+        except OSError as e:
+            raise RuntimeError(f"{self.address}: {e}") from None
+
+
+def _wait_ready(nodes: List[WorkerClient], timeout: float) -> List[float]:
+    """
+    Ожидание готовности всех узлов; возвращает смещения их часов
+    относительно координатора (по середине запроса /status).
+    """
+    deadline = time.time() + timeout
+    offsets = [None] * len(nodes)
+    while any(offset is None for offset in offsets):
+        if time.time() > deadline:
+            raise RuntimeError(f"nodes not ready after {timeout:g} s")
+        for i, node in enumerate(nodes):
+            if offsets[i] is not None:
+                continue
+            sent = time.time()
+            status = node.request('GET', '/status')
+            if status['state'] == FAILED:
+                raise RuntimeError(f"{node.address}: {status['error']}")
+            if status['state'] == READY:
+                offsets[i] = status['time'] - (sent + time.time()) / 2
+        time.sleep(POLL_INTERVAL_SEC)
+    return offsets
+
+
+def run_distributed(benchmark: BenchmarkBase, workers: List[str], options: Dict,
+                    iterations: int = 100, concurrency: int = 1, rate: float = None,
+                    arrival: str = ArrivalSchedule.FIXED,
+                    sampler: TimeSeriesSampler = None, duration: float = None,
+                    warmup: int = 0, warmup_sec: float = None,
+                    steady_state: bool = False) -> BenchmarkResult:
+    """
+    Запуск нагрузки на узлах workers (host:port процессов worker.py).
+
+    Каждый узел создает бенчмарк по options (параметры create_benchmark),
+    выполняет setup() и прогрев, затем все стартуют в один момент с
+    поправкой на смещение часов узла. Итерации и rate делятся между
+    узлами, внутри узла - concurrency потоков. Гистограммы, окна
+    sampler, фазы HTTP и ресурсы узлов объединяются в один результат.
+    Тестовые данные удаляет первый узел после завершения всех.
+    benchmark - локальный экземпляр той же нагрузки (имя, тип, итоговые
+    метрики); setup() на координаторе не выполняется.
+    """
+    nodes = [WorkerClient(address) for address in workers]
+    count = len(nodes)
+    print(f"[{benchmark.storage_type}] Запуск {benchmark.name} "
+          f"({count} nodes x {concurrency} threads)...")
+
+    benchmark.histogram = LatencyHistogram()
+    benchmark.errors = 0
+    if benchmark.phase_stats:
+        # Статистику фаз собирают узлы, у координатора только сумма
+        benchmark.phase_stats.stop()
+        benchmark.phase_stats.reset()
+
+    shares = [iterations // count + (1 if i < iterations % count else 0) for i in range(count)]
+    warmup_shares = [warmup // count + (1 if i < warmup % count else 0) for i in range(count)]
+    job = {
+        'nodes': count,
+        'concurrency': concurrency,
+        'rate': rate,
+        'arrival': arrival,
+        'duration': duration,
+        'warmup_sec': warmup_sec,
+        'window_sec': sampler.window_sec if sampler else None,
+        'keep_histograms': sampler.keep_histograms if sampler else False,
+    }
+    # Живые метрики узлов приходят с опросом /status
+    live = REGISTRY.series(benchmark.storage_type, benchmark.name)
+    cells = [live.cell() for _ in nodes]
+    progress = progress_reporter(live, iterations, duration)
+
+    payloads = [None] * count
+    total_time = 0.0
+    live.start()
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        try:
+            list(pool.map(lambda i: nodes[i].request('POST', '/prepare', {
+                'node_index': i,
+                'benchmark': encode_options(options),
+                'job': {**job, 'iterations': shares[i], 'warmup': warmup_shares[i]},
+            }), range(count)))
+            offsets = _wait_ready(nodes, PREPARE_TIMEOUT_SEC + (warmup_sec or 0))
+
+            start_at = time.time() + START_DELAY_SEC
+            list(pool.map(lambda i: nodes[i].request('POST', '/start',
+                                                     {'start_at': start_at + offsets[i]}),
+                          range(count)))
+            if sampler:
+                sampler.start(time.perf_counter() + (start_at - time.time()), background=False)
+            if progress:
+                progress.start()
+
+            # Ошибка опроса не снимает узел: он потерян, только если сообщил
+            # FAILED или не отвечает дольше NODE_LOST_SEC
+            pending = set(range(count))
+            last_seen = [time.monotonic()] * count
+            while pending:
+                time.sleep(POLL_INTERVAL_SEC)
+                for i in sorted(pending):
+                    try:
+                        status = nodes[i].request('GET', '/status')
+                        if status['state'] == DONE:
+                            payloads[i] = nodes[i].request('GET', '/result')
+                    except Exception as e:
+                        if time.monotonic() - last_seen[i] < NODE_LOST_SEC:
+                            continue
+                        print(f"  Node {i} ({nodes[i].address}) lost: {e}")
+                        benchmark.errors += 1
+                        pending.discard(i)
+                        continue
+                    last_seen[i] = time.monotonic()
+                    cells[i].load(status['live'])
+                    if status['state'] == FAILED:
+                        print(f"  Error in node {i} ({nodes[i].address}): {status['error']}")
+                        benchmark.errors += 1
+                    elif status['state'] != DONE:
+                        continue
+                    pending.discard(i)
+            total_time = max((p['total_time'] for p in payloads if p), default=0.0)
+            if sampler:
+                for payload in payloads:
+                    if payload:
+                        sampler.add_windows({int(i): _window_from_dict(w)
+                                             for i, w in payload['windows'].items()})
+                sampler.stop()
+        finally:
+            if progress:
+                progress.stop()
+            live.stop()
+            # Данные общие для всех узлов - удаляет первый, остальные только освобождаются
+            cleanups = list(pool.map(_release, nodes, [i == 0 for i in range(count)]))
+            benchmark.cleanup_stats = tuple(cleanups[0] or (0, 0.0))
+
+    total_bytes = 0.0
+    warmed, warmup_time = 0, 0.0
+    summaries = []
+    for payload in payloads:
+        if payload is None:
+            continue
+        benchmark.histogram.merge(LatencyHistogram.from_dict(payload['histogram']))
+        total_bytes += payload['total_bytes']
+        benchmark.errors += payload['errors']
+        warmed += payload['warmup'][0]
+        warmup_time = max(warmup_time, payload['warmup'][1])
+        if payload['http_phases'] and benchmark.phase_stats is not None:
+            benchmark.phase_stats.merge(PhaseStats.from_dict(payload['http_phases']))
+        summaries.append(payload['resources'])
+    benchmark.warmup_stats = (warmed, warmup_time)
+
+    if duration is not None:
+        iterations = benchmark.histogram.total_count + benchmark.errors
+    result = benchmark._calculate_results(total_bytes, total_time, iterations, concurrency)
+    result.nodes = count
+    if rate:
+        result.target_rate = rate
+        result.arrival = arrival
+    # Ресурсы - по узлу в среднем (максимумы - по самому загруженному)
+    result.resources = merge_resources(summaries, result.throughput_mbps / count)
+    if sampler:
+        result.throughput_windows = sampler.throughput_windows()
+        if steady_state:
+            result = trim_transient(result, sampler)
+    return result
+
+
+def _release(node: WorkerClient, cleanup: bool) -> Optional[List[float]]:
+    try:
+        return node.request('POST', '/cleanup', {'cleanup': cleanup}, timeout=None)['cleanup']
+    except RuntimeError as e:
+        print(f"  Cleanup error on {node.address}: {e}")
+        return None
@@ -0,0 +1,132 @@
+"""Движок декларативных нагрузок: спецификация -> готовое расписание операций"""
+
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+from .payload import get_pool
+from .spec import DEFAULT_SCHEDULE_LENGTH, OPERATIONS, WorkloadSpec
+
+# Потоков для предварительного создания ключей
+PREFILL_CONCURRENCY = 16
+
+
+@dataclass
+class OperationSchedule:
+    """
+    Расписание, вычисленное заранее: на каждую операцию код операции,
+    номер ключа и размер. В цикле нагрузки остается только выбрать
+    следующую строку - генераторы случайных чисел не попадают в замер.
+    """
+    ops: np.ndarray        # индексы в OPERATIONS
+    keys: np.ndarray       # номера ключей
+    sizes: np.ndarray      # размеры для put
+    key_sizes: np.ndarray  # размеры ключей при предварительном создании
+
+    def __len__(self):
+        return len(self.ops)
+
+    def counts(self) -> dict:
+        """Число операций каждого типа"""
+        counts = np.bincount(self.ops, minlength=len(OPERATIONS))
+        return {name: int(counts[i]) for i, name in enumerate(OPERATIONS) if counts[i]}
+
+    @property
+    def max_size(self) -> int:
+        return int(max(self.sizes.max(initial=0), self.key_sizes.max(initial=0)))
+
+
+def compile_schedule(spec: WorkloadSpec) -> OperationSchedule:
+    """Построение расписания по спецификации (детерминировано при заданном seed)"""
+    rng = np.random.default_rng(spec.seed)
+    length = spec.ops or DEFAULT_SCHEDULE_LENGTH
+
+    names = list(spec.operations)
+    weights = np.array([spec.operations[n] for n in names], dtype=float)
+    codes = np.array([OPERATIONS.index(n) for n in names], dtype=np.uint8)
+
+    return OperationSchedule(
+        ops=rng.choice(codes, length, p=weights / weights.sum()),
+        keys=spec.popularity.sample(length, spec.keys, rng),
+        sizes=spec.object_size.sample(length, rng),
+        key_sizes=spec.object_size.sample(spec.keys, rng),
+    )
+
+
+class ScheduleCursor:
+    """
+    Общий курсор по строкам расписания. Потоки одного процесса берут
+    строки по очереди; процесс index из count берет строки index,
+    index + count, index + 2*count, ... - процессы и узлы делят
+    расписание без пересечений и без пропусков.
+    """
+
+    def __init__(self, index: int = 0, count: int = 1):
+        self.index = index
+        self.count = count
+        self._steps = itertools.count()
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            step = next(self._steps)
+        return self.index + step * self.count
+
+
+class ScheduledWorkload:
+    """
+    Примесь для бэкендов: выполнение нагрузки по спецификации.
+
+    Бэкенд реализует примитивы _op_put/_op_get/_op_head/_op_delete/_op_list
+    (аргументы - номер ключа и размер, результат - число байт) и _payload().
+    Все потоки берут строки общего расписания по очереди через общий курсор.
+    """
+
+    # Метод-обработчик для каждого кода операции (порядок как в OPERATIONS)
+    _OPERATION_METHODS = tuple(f"_op_{name}" for name in OPERATIONS)
+
+    def _init_schedule(self, spec: WorkloadSpec):
+        self.spec = spec
+        self.schedule = None
+        self._op_cursor = ScheduleCursor()
+
+    def _setup_schedule(self):
+        """Построение расписания, разогрев пула данных и создание ключей"""
+        self.schedule = compile_schedule(self.spec)
+        get_pool(self.payload_profile, self.schedule.max_size)
+        print(f"  Schedule: {len(self.schedule)} ops {self.schedule.counts()}, "
+              f"{self.spec.keys} keys, {self.spec.popularity.describe()}")
+        if self.spec.prefill:
+            self._prefill()
+
+    def _prefill(self):
+        """Создание всех ключей перед прогоном (параллельно)"""
+        with ThreadPoolExecutor(max_workers=PREFILL_CONCURRENCY) as executor:
+            list(executor.map(self._op_put, range(self.spec.keys),
+                              self.schedule.key_sizes.tolist()))
+
+    def _scheduled_operation(self) -> float:
+        """Следующая операция расписания"""
+        schedule = self.schedule
+        i = self._op_cursor.next() % len(schedule)
+        method = getattr(self, self._OPERATION_METHODS[schedule.ops[i]])
+        return method(int(schedule.keys[i]), int(schedule.sizes[i]))
+
+    def spawn_worker(self, worker_id: int):
+        worker = super().spawn_worker(worker_id)
+        # Копия (потока) получает новый курсор - возвращаем общий курсор процесса
+        worker._op_cursor = self._op_cursor
+        return worker
+
+    def partition(self, index: int, count: int):
+        """Строки расписания процесса (узла) index из count"""
+        self._op_cursor = ScheduleCursor(index, count)
+
+    def _schedule_state(self, state: dict) -> dict:
+        # Курсор с блокировкой не передается в процесс - его задает partition()
+        state.pop('_op_cursor', None)
+        return state
+
+    def _restore_schedule_state(self):
+        self._op_cursor = ScheduleCursor()
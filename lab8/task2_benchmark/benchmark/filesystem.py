@@ -1,72 +1,298 @@
 """Бенчмарки для смонтированных файловых систем (s3fs, goofys)"""
 
+import itertools
+import math
+import mmap
 import os
 import random
+import threading
 from pathlib import Path
 from .base import BenchmarkBase
-from .workloads import WorkloadConfig
+from .engine import ScheduledWorkload
+from .listing import listing_name, populate, run_parallel
+from .payload import RANDOM, get_pool, spread_size
+from .spec import WorkloadSpec, mixed_spec
+from .workloads import WorkloadConfig, WorkloadType
 
 
-class FilesystemBenchmark(BenchmarkBase):
+# Нагрузки, для которых выбирается режим записи
+WRITE_WORKLOADS = ("sequential_write", "small_files")
+
+
+def cold_read_working_set() -> int:
+    """Размер рабочего набора для холодного чтения: с запасом больше RAM"""
+    with open('/proc/meminfo') as f:
+        for line in f:
+            if line.startswith('MemTotal:'):
+                return int(int(line.split()[1]) * 1024 * WorkloadConfig.COLD_READ_RAM_FACTOR)
+    raise RuntimeError("MemTotal not found in /proc/meminfo")
+
+
+def _drop_cache(fd: int):
+    """Выгрузить страницы файла из page cache (только чистые страницы)"""
+    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+class FilesystemBenchmark(ScheduledWorkload, BenchmarkBase):
     """Бенчмарк для смонтированной ФС"""
     
-    def __init__(self, storage_type: str, mount_point: str, workload_type: str):
-        super().__init__(workload_type, storage_type)
+    # Метод итерации для каждой встроенной нагрузки
+    WORKLOAD_METHODS = {
+        "sequential_write": "_sequential_write",
+        "sequential_read": "_sequential_read",
+        "random_io": "_random_io",
+        "small_files": "_small_file_create",
+        "metadata_ops": "_metadata_operation",
+        "listing": "_listing_walk",
+    }
+    
+    def __init__(self, storage_type: str, mount_point: str, workload_type: str,
+                 payload_profile: str = RANDOM, size_spread: float = 0.0,
+                 read_mode: str = WorkloadConfig.RANDOM_READ_REOPEN,
+                 write_mode: str = WorkloadConfig.WRITE_BUFFERED,
+                 cold_read_bytes: int = 0, object_size: int = None,
+                 spec: WorkloadSpec = None,
+                 listing_entries: int = WorkloadConfig.LISTING_ENTRIES,
+                 listing_layout: str = WorkloadConfig.LISTING_FLAT):
+        if spec is None and workload_type == WorkloadType.MIXED:
+            spec = mixed_spec()
+        if spec is None and workload_type not in self.WORKLOAD_METHODS:
+            raise ValueError(f"Unknown workload type: {workload_type}")
+        if read_mode not in WorkloadConfig.RANDOM_READ_MODES:
+            raise ValueError(f"Unknown random read mode: {read_mode}")
+        if write_mode not in WorkloadConfig.WRITE_MODES:
+            raise ValueError(f"Unknown write mode: {write_mode}")
+        if listing_layout not in WorkloadConfig.LISTING_LAYOUTS:
+            raise ValueError(f"Unknown listing layout: {listing_layout}")
+        if spec is not None:
+            workload_type = spec.name
+        super().__init__(listing_name(listing_layout, listing_entries)
+                         if workload_type == WorkloadType.LISTING
+                         else self.result_name(workload_type, read_mode, write_mode,
+                                               cold_read_bytes), storage_type)
+        # Нагрузка по спецификации выполняет расписание вместо встроенного метода
+        self._init_schedule(spec)
+        self._iteration_method = ("_scheduled_operation" if spec is not None
+                                  else self.WORKLOAD_METHODS[workload_type])
         self.mount_point = Path(mount_point)
         self.workload_type = workload_type
         self.test_dir = self.mount_point / f"benchmark_{workload_type}"
-        self.test_data = None
+        self.payload_profile = payload_profile
+        self.size_spread = size_spread
+        self.object_size = object_size
+        self.payload_size = 0
         self.test_files = []
+        
+        # Постоянные дескриптор/mmap для pread и mmap режимов - свои у
+        # каждого потока, общий список нужен для закрытия в cleanup
+        self.read_mode = read_mode
+        self.random_file_size = 0
+        self._fd = None
+        self._mmap = None
+        self._handles = []
+        self._handles_lock = threading.Lock()
+        
+        # Режим записи и холодное чтение (рабочий набор больше кэшей)
+        self.write_mode = write_mode
+        self.cold_read_bytes = cold_read_bytes
+        self._read_cursor = itertools.count()
+        
+        # Листинг: число записей и раскладка каталога
+        self.listing_entries = listing_entries
+        self.listing_layout = listing_layout
+
+    @staticmethod
+    def result_name(workload_type: str,
+                    read_mode: str = WorkloadConfig.RANDOM_READ_REOPEN,
+                    write_mode: str = WorkloadConfig.WRITE_BUFFERED,
+                    cold_read_bytes: int = 0) -> str:
+        """Имя результата: режимы, отличные от умолчания, отчитываются отдельно"""
+        if workload_type == "random_io" and read_mode != WorkloadConfig.RANDOM_READ_REOPEN:
+            return f"{workload_type}_{read_mode}"
+        if workload_type in WRITE_WORKLOADS and write_mode != WorkloadConfig.WRITE_BUFFERED:
+            return f"{workload_type}_{write_mode}"
+        if workload_type == "sequential_read" and cold_read_bytes:
+            return f"{workload_type}_cold"
+        return workload_type
+
+    def spawn_worker(self, worker_id: int) -> 'FilesystemBenchmark':
+        worker = super().spawn_worker(worker_id)
+        worker._fd = None
+        worker._mmap = None
+        return worker
+
+    def __copy__(self):
+        """Копия для потока нагрузки (spawn_worker): список дескрипторов общий"""
+        worker = self.__class__.__new__(self.__class__)
+        worker.__dict__.update(self.__dict__)
+        return worker
+
+    def __getstate__(self):
+        # Дескрипторы и mmap не передаются в процесс - у него свой список
+        state = super().__getstate__()
+        state.update(_fd=None, _mmap=None, _handles=[])
+        state.pop('_handles_lock', None)
+        state.pop('_read_cursor', None)
+        return self._schedule_state(state)
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._handles_lock = threading.Lock()
+        # Процессы начинают обход набора с разных мест
+        self._read_cursor = itertools.count(random.randrange(max(1, len(self.test_files))))
+        self._restore_schedule_state()
+
+    def _payload(self, size: int = None) -> memoryview:
+        """Срез общего пула данных (без копирования)"""
+        size = spread_size(size or self.payload_size, self.size_spread)
+        if self.write_mode == WorkloadConfig.WRITE_DIRECT:
+            # O_DIRECT: адрес, смещение и длина кратны размеру блока
+            align = WorkloadConfig.DIRECT_IO_ALIGNMENT
+            size = max(align, (size + align - 1) // align * align)
+            return get_pool(self.payload_profile, size).slice(size, align=align)
+        return get_pool(self.payload_profile, size).slice(size)
+
+    def _write_file(self, file_path: Path, data, write_mode: str = None):
+        """Запись файла в заданном режиме"""
+        write_mode = write_mode or self.write_mode
+        if write_mode == WorkloadConfig.WRITE_DIRECT:
+            fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_DIRECT, 0o644)
+            try:
+                view = memoryview(data)
+                written = 0
+                while written < len(view):
+                    written += os.write(fd, view[written:])
+            finally:
+                os.close(fd)
+            return
+        
+        with open(file_path, 'wb') as f:
+            f.write(data)
+            if write_mode == WorkloadConfig.WRITE_FSYNC:
+                # close() на FUSE только ставит выгрузку в очередь,
+                # fsync ждет, пока данные дойдут до S3
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _check_direct_io(self):
+        """Проверка, что ФС принимает O_DIRECT (FUSE - не всегда)"""
+        probe = self.test_dir / ".direct_io_probe"
+        try:
+            self._write_file(probe, self._payload(WorkloadConfig.DIRECT_IO_ALIGNMENT))
+        except OSError as e:
+            raise RuntimeError(f"O_DIRECT is not supported on {self.mount_point}: {e}") from e
+        finally:
+            if probe.exists():
+                probe.unlink()
 
     def setup(self):
         """Создание тестовой директории"""
         self.test_dir.mkdir(parents=True, exist_ok=True)
         
+        if ((self.workload_type in WRITE_WORKLOADS or self.spec is not None)
+                and self.write_mode == WorkloadConfig.WRITE_DIRECT):
+            self._check_direct_io()
+        
+        if self.spec is not None:
+            self._setup_schedule()
+            return
+        
         # Подготовка данных для sequential/small files
+        # object_size задает размер файлов вместо значения по умолчанию нагрузки
         if self.workload_type in ["sequential_write", "sequential_read"]:
-            self.test_data = os.urandom(WorkloadConfig.SEQUENTIAL_FILE_SIZE)
+            self.payload_size = self.object_size or WorkloadConfig.SEQUENTIAL_FILE_SIZE
+            if self.workload_type == "sequential_read":
+                self._prepare_read_set()
         elif self.workload_type == "small_files":
-            self.test_data = os.urandom(WorkloadConfig.SMALL_FILE_SIZE)
+            self.payload_size = self.object_size or WorkloadConfig.SMALL_FILE_SIZE
         elif self.workload_type == "random_io":
             # Создаем большой файл для random I/O
             big_file = self.test_dir / "random_io_file.dat"
             with open(big_file, 'wb') as f:
-                f.write(os.urandom(10 * 1024 * 1024))  # 10 MB файл
+                f.write(get_pool(self.payload_profile, WorkloadConfig.RANDOM_FILE_SIZE)
+                        .slice(WorkloadConfig.RANDOM_FILE_SIZE))
             self.test_files = [big_file]
+            self.random_file_size = WorkloadConfig.RANDOM_FILE_SIZE
+        elif self.workload_type == "listing":
+            self._populate_listing()
+        
+        # Пул создается заранее, чтобы генерация не попала в замер
+        if self.payload_size:
+            get_pool(self.payload_profile,
+                     int(self.payload_size * (1 + self.size_spread)))
 
     def run_iteration(self) -> float:
         """Выполнение одной итерации в зависимости от типа нагрузки"""
+        return getattr(self, self._iteration_method)()
+
+    # Примитивы для нагрузок по спецификации (см. engine.ScheduledWorkload)
+
+    def _spec_path(self, key: int) -> Path:
+        return self.test_dir / f"obj_{key}.dat"
+
+    def _op_put(self, key: int, size: int) -> float:
+        data = self._payload(size)
+        self._write_file(self._spec_path(key), data)
+        return len(data)
+
+    def _op_get(self, key: int, size: int) -> float:
+        # Чтение удаленного ключа - промах, а не ошибка
+        try:
+            with open(self._spec_path(key), 'rb') as f:
+                return len(f.read())
+        except FileNotFoundError:
+            return 0
+
+    def _op_head(self, key: int, size: int) -> float:
+        try:
+            self._spec_path(key).stat()
+        except FileNotFoundError:
+            pass
+        return 0
+
+    def _op_delete(self, key: int, size: int) -> float:
+        self._spec_path(key).unlink(missing_ok=True)
+        return 0
+
+    def _op_list(self, key: int, size: int) -> float:
+        """Листинг первой страницы каталога (до 1000 записей, как в S3)"""
+        with os.scandir(self.test_dir) as entries:
+            for _ in itertools.islice(entries, 1000):
+                pass
+        return 0
+
+    def _prepare_read_set(self):
+        """Создание набора файлов для чтения (общего для всех потоков)"""
+        count = WorkloadConfig.SEQUENTIAL_FILES
+        if self.cold_read_bytes:
+            # Рабочий набор больше кэшей: файлы пишутся с fsync, чтобы
+            # их страницы были чистыми и могли быть выгружены
+            count = max(count, math.ceil(self.cold_read_bytes / self.payload_size))
+            print(f"  Preparing cold read set: {count} files "
+                  f"({count * self.payload_size / 1024 ** 3:.1f} GB)")
         
-        if self.workload_type == "sequential_write":
-            return self._sequential_write()
-        elif self.workload_type == "sequential_read":
-            return self._sequential_read()
-        elif self.workload_type == "random_io":
-            return self._random_io()
-        elif self.workload_type == "small_files":
-            return self._small_file_create()
-        elif self.workload_type == "metadata_ops":
-            return self._metadata_operation()
-        
-        return 0.0
+        for i in range(count):
+            file_path = self.test_dir / f"seq_{i}.dat"
+            if self.cold_read_bytes:
+                self._write_file(file_path, self._payload(), WorkloadConfig.WRITE_FSYNC)
+                with open(file_path, 'rb') as f:
+                    _drop_cache(f.fileno())
+            else:
+                self._write_file(file_path, self._payload(), WorkloadConfig.WRITE_BUFFERED)
+            self.test_files.append(file_path)
 
     def _sequential_write(self) -> float:
         """Последовательная запись"""
-        file_path = self.test_dir / f"seq_{len(self.test_files)}.dat"
-        with open(file_path, 'wb') as f:
-            f.write(self.test_data)
+        file_path = self.test_dir / self._next_name("seq")
+        data = self._payload()
+        self._write_file(file_path, data)
         self.test_files.append(file_path)
-        return len(self.test_data)
+        return len(data)
 
     def _sequential_read(self) -> float:
         """Последовательное чтение"""
-        # Сначала создаем файлы если их нет
-        if not self.test_files:
-            for i in range(WorkloadConfig.SEQUENTIAL_FILES):
-                file_path = self.test_dir / f"seq_{i}.dat"
-                with open(file_path, 'wb') as f:
-                    f.write(self.test_data)
-                self.test_files.append(file_path)
+        if self.cold_read_bytes:
+            return self._cold_read()
         
         # Читаем случайный файл
         file_path = random.choice(self.test_files)
@@ -74,8 +300,25 @@ class FilesystemBenchmark(BenchmarkBase):
             data = f.read()
         return len(data)
 
+    def _cold_read(self) -> float:
+        """
+        Чтение файлов по кругу: к повторному чтению файла между ними
+        прочитан весь рабочий набор, так что LRU-кэш его уже вытеснил.
+        После чтения страницы файла сразу выгружаются из page cache.
+        """
+        file_path = self.test_files[next(self._read_cursor) % len(self.test_files)]
+        with open(file_path, 'rb') as f:
+            data = f.read()
+            _drop_cache(f.fileno())
+        return len(data)
+
     def _random_io(self) -> float:
         """Случайное чтение блоков"""
+        if self.read_mode == WorkloadConfig.RANDOM_READ_PREAD:
+            return self._random_pread()
+        elif self.read_mode == WorkloadConfig.RANDOM_READ_MMAP:
+            return self._random_mmap()
+        
         file_path = self.test_files[0]
         file_size = file_path.stat().st_size
         
@@ -88,17 +331,44 @@ class FilesystemBenchmark(BenchmarkBase):
         
         return len(data)
 
+    def _random_offset(self) -> int:
+        return random.randint(0, max(0, self.random_file_size - WorkloadConfig.RANDOM_BLOCK_SIZE))
+
+    def _open_random_file(self) -> int:
+        """Дескриптор открывается один раз на поток - open/stat не попадают в замер"""
+        if self._fd is None:
+            self._fd = os.open(self.test_files[0], os.O_RDONLY)
+            with self._handles_lock:
+                self._handles.append(self._fd)
+        return self._fd
+
+    def _random_pread(self) -> float:
+        """Случайное чтение блока через pread по открытому дескриптору"""
+        data = os.pread(self._open_random_file(), WorkloadConfig.RANDOM_BLOCK_SIZE,
+                        self._random_offset())
+        return len(data)
+
+    def _random_mmap(self) -> float:
+        """Случайное чтение блока из отображенного в память файла"""
+        if self._mmap is None:
+            self._mmap = mmap.mmap(self._open_random_file(), 0, access=mmap.ACCESS_READ)
+            with self._handles_lock:
+                self._handles.append(self._mmap)
+        offset = self._random_offset()
+        data = self._mmap[offset:offset + WorkloadConfig.RANDOM_BLOCK_SIZE]
+        return len(data)
+
     def _small_file_create(self) -> float:
         """Создание маленького файла"""
-        file_path = self.test_dir / f"small_{len(self.test_files)}.dat"
-        with open(file_path, 'wb') as f:
-            f.write(self.test_data)
+        file_path = self.test_dir / self._next_name("small")
+        data = self._payload()
+        self._write_file(file_path, data)
         self.test_files.append(file_path)
-        return len(self.test_data)
+        return len(data)
 
     def _metadata_operation(self) -> float:
         """Операции с метаданными (stat, create, delete)"""
-        test_file = self.test_dir / f"meta_{len(self.test_files)}.dat"
+        test_file = self.test_dir / self._next_name("meta")
         
         # Create
         test_file.write_bytes(b"test")
@@ -111,18 +381,57 @@ class FilesystemBenchmark(BenchmarkBase):
         
         return 4  # байты записаны
 
-    def cleanup(self):
-        """Очистка тестовых файлов"""
+    def _populate_listing(self):
+        """Каталог из listing_entries пустых файлов (nested - с подкаталогами)"""
+        if self.listing_layout == WorkloadConfig.LISTING_NESTED:
+            for i in range(0, self.listing_entries, WorkloadConfig.LISTING_FANOUT):
+                (self.test_dir / f"d_{i // WorkloadConfig.LISTING_FANOUT:04d}").mkdir(
+                    exist_ok=True)
+        populate(lambda path: (self.test_dir / path).touch(),
+                 self.listing_entries, self.listing_layout)
+
+    def _listing_walk(self) -> float:
+        """Полный обход каталога через os.scandir (readdir), с подкаталогами"""
+        files = 0
+        pending = [self.test_dir]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    else:
+                        files += 1
+        if files < self.listing_entries:
+            raise RuntimeError(f"Listed {files} of {self.listing_entries} entries")
+        return 0
+
+    def cleanup(self) -> int:
+        """Очистка тестовых файлов; возвращает число удаленных файлов"""
+        # Сначала mmap (добавлены позже своих дескрипторов), потом дескрипторы
+        for handle in reversed(self._handles):
+            if isinstance(handle, mmap.mmap):
+                handle.close()
+            else:
+                os.close(handle)
+        self._handles.clear()
+        self._fd = None
+        self._mmap = None
+        
+        deleted = 0
         try:
             for f in self.test_files:
                 if f.exists():
                     f.unlink()
+                    deleted += 1
             
             if self.test_dir.exists():
-                # Удаляем оставшиеся файлы
-                for f in self.test_dir.iterdir():
-                    if f.is_file():
-                        f.unlink()
+                # Удаляем оставшиеся файлы, в том числе в подкаталогах листинга
+                for root, dirs, files in os.walk(self.test_dir, topdown=False):
+                    deleted += run_parallel(os.unlink, [os.path.join(root, name)
+                                                        for name in files])
+                    for name in dirs:
+                        os.rmdir(os.path.join(root, name))
                 self.test_dir.rmdir()
         except Exception as e:
             print(f"  Cleanup warning: {e}")
+        return deleted
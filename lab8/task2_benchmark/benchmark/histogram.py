@@ -0,0 +1,169 @@
+"""Гистограмма задержек с логарифмическими корзинами (в стиле HdrHistogram)"""
+
+import math
+import numpy as np
+from typing import Dict, List, Optional
+
+# Значения по умолчанию: 3 значащие цифры, от 1 мкс до 1 часа
+DEFAULT_SIGNIFICANT_DIGITS = 3
+DEFAULT_UNIT_MS = 0.001
+DEFAULT_HIGHEST_MS = 3600 * 1000.0
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек фиксированного размера.
+
+    Значения хранятся в целых единицах unit_ms. Каждая степень двойки
+    делится на 2 * 10^significant_digits под-корзин, поэтому любое
+    значение восстанавливается с относительной ошибкой не хуже
+    10^-significant_digits. Память не зависит от числа операций,
+    объединение двух гистограмм - сложение массивов счетчиков.
+    """
+
+    def __init__(self, significant_digits: int = DEFAULT_SIGNIFICANT_DIGITS,
+                 highest_ms: float = DEFAULT_HIGHEST_MS,
+                 unit_ms: float = DEFAULT_UNIT_MS):
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be in range 1..5")
+
+        self.significant_digits = significant_digits
+        self.highest_ms = highest_ms
+        self.unit_ms = unit_ms
+
+        self._sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._sub_bucket_count = 1 << self._sub_bucket_bits
+        self._sub_bucket_half = self._sub_bucket_count >> 1
+        self._sub_bucket_mask = self._sub_bucket_count - 1
+        self._highest_units = max(self._sub_bucket_count, int(highest_ms / unit_ms))
+
+        bucket_count = 1
+        smallest_untrackable = self._sub_bucket_count
+        while smallest_untrackable <= self._highest_units:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+
+        self.counts = np.zeros((bucket_count + 1) * self._sub_bucket_half, dtype=np.int64)
+        self.total_count = 0
+        self.sum_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+    def _index(self, units: int) -> int:
+        """Номер корзины для значения в единицах unit_ms"""
+        bucket = (units | self._sub_bucket_mask).bit_length() - self._sub_bucket_bits
+        return bucket * self._sub_bucket_half + (units >> bucket)
+
+    def _highest_equivalent(self, index: int) -> int:
+        """Наибольшее значение (в единицах), попадающее в корзину index"""
+        if index < self._sub_bucket_count:
+            return index
+        bucket = (index - self._sub_bucket_count) // self._sub_bucket_half + 1
+        sub_bucket = index - bucket * self._sub_bucket_half
+        return (sub_bucket << bucket) + (1 << bucket) - 1
+
+    def record(self, value_ms: float, count: int = 1):
+        """Записать значение задержки (в миллисекундах)"""
+        units = min(int(value_ms / self.unit_ms), self._highest_units)
+        self.counts[self._index(max(units, 0))] += count
+        self.total_count += count
+        self.sum_ms += value_ms * count
+        if value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Добавить значения другой гистограммы с той же конфигурацией"""
+        if len(other.counts) != len(self.counts) or other.unit_ms != self.unit_ms:
+            raise ValueError("Cannot merge histograms with different configuration")
+        self.counts += other.counts
+        self.total_count += other.total_count
+        self.sum_ms += other.sum_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+        return self
+
+    def percentile(self, percentile: float) -> float:
+        """Значение перцентиля в миллисекундах"""
+        if self.total_count == 0:
+            return 0.0
+        if percentile >= 100:
+            return self.max_ms
+
+        rank = max(1, math.ceil(percentile / 100 * self.total_count))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        value_ms = self._highest_equivalent(index) * self.unit_ms
+        return min(max(value_ms, self.min_ms), self.max_ms)
+
+    def bootstrap_percentile(self, percentile: float, resamples: int = 1000,
+                             rng: np.random.Generator = None) -> np.ndarray:
+        """
+        Бутстрэп-распределение перцентиля: resamples раз счетчики корзин
+        пересэмплируются (мультиномиально, с тем же числом значений),
+        и для каждой копии считается перцентиль.
+        """
+        rng = rng or np.random.default_rng()
+        if self.total_count == 0:
+            return np.zeros(resamples)
+        indices = np.nonzero(self.counts)[0]
+        counts = self.counts[indices]
+        values_ms = np.array([self._highest_equivalent(int(i)) for i in indices]) * self.unit_ms
+        values_ms = np.clip(values_ms, self.min_ms, self.max_ms)
+
+        total = int(counts.sum())
+        resampled = rng.multinomial(total, counts / total, size=resamples)
+        rank = max(1, math.ceil(percentile / 100 * total))
+        positions = (np.cumsum(resampled, axis=1) < rank).sum(axis=1)
+        return values_ms[positions]
+
+    def counts_by_edges(self, edges_ms: List[float]) -> List[int]:
+        """
+        Число значений в интервалах [edges[i], edges[i+1]) - для тепловых карт.
+        Значения меньше edges[0] и больше edges[-1] попадают в крайние интервалы.
+        """
+        indices = np.arange(len(self.counts))
+        buckets = np.where(indices < self._sub_bucket_count, 0,
+                           (indices - self._sub_bucket_count) // self._sub_bucket_half + 1)
+        values_ms = ((indices - buckets * self._sub_bucket_half) << buckets) * self.unit_ms
+        positions = np.clip(np.searchsorted(edges_ms, values_ms, side='right') - 1,
+                            0, len(edges_ms) - 2)
+        return np.bincount(positions, weights=self.counts,
+                           minlength=len(edges_ms) - 1).astype(np.int64).tolist()
+
+    @property
+    def mean_ms(self) -> float:
+        return self.sum_ms / self.total_count if self.total_count else 0.0
+
+    def __len__(self):
+        return self.total_count
+
+    def to_dict(self) -> Dict:
+        """Компактное представление (только ненулевые корзины) для JSON"""
+        indices = np.nonzero(self.counts)[0]
+        return {
+            'significant_digits': self.significant_digits,
+            'highest_ms': self.highest_ms,
+            'unit_ms': self.unit_ms,
+            'total_count': self.total_count,
+            'sum_ms': self.sum_ms,
+            'min_ms': self.min_ms if self.total_count else 0.0,
+            'max_ms': self.max_ms,
+            'indices': indices.tolist(),
+            'counts': self.counts[indices].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> 'LatencyHistogram':
+        """Восстановление гистограммы из to_dict()"""
+        if not data:
+            return cls()
+        histogram = cls(significant_digits=data['significant_digits'],
+                        highest_ms=data['highest_ms'],
+                        unit_ms=data['unit_ms'])
+        histogram.counts[data['indices']] = data['counts']
+        histogram.total_count = data['total_count']
+        histogram.sum_ms = data['sum_ms']
+        histogram.min_ms = data['min_ms'] if data['total_count'] else math.inf
+        histogram.max_ms = data['max_ms']
+        return histogram
@@ -0,0 +1,299 @@
+"""История результатов (SQLite) и поиск регрессий между прогонами"""
+
+import json
+import os
+import platform
+import shutil
+import socket
+import sqlite3
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+from .base import BenchmarkResult
+from .histogram import LatencyHistogram
+
+# Параметры сравнения по умолчанию
+DEFAULT_THRESHOLD = 0.05      # допустимое ухудшение, доля
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_RESAMPLES = 2000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    label TEXT,
+    host TEXT,
+    kernel TEXT,
+    endpoint TEXT,
+    version TEXT,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    storage_type TEXT NOT NULL,
+    throughput_mbps REAL,
+    iops REAL,
+    latency_p50_ms REAL,
+    latency_p99_ms REAL,
+    errors INTEGER,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_by_run ON results(run_id);
+CREATE INDEX IF NOT EXISTS results_by_workload ON results(name, storage_type);
+"""
+
+
+def _command_version(command: str) -> Optional[str]:
+    """Первая строка `command --version` (None, если не установлен)"""
+    if not shutil.which(command):
+        return None
+    try:
+        output = subprocess.run([command, '--version'], capture_output=True,
+                                text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    lines = (output.stdout or output.stderr).strip().splitlines()
+    return lines[0] if lines else None
+
+
+def _package_version() -> str:
+    """Версия бенчмарка: git describe каталога пакета"""
+    try:
+        output = subprocess.run(['git', 'describe', '--always', '--dirty'],
+                                cwd=Path(__file__).parent, capture_output=True,
+                                text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return output.stdout.strip() or "unknown"
+
+
+def _mount_info(mount_point: str) -> Optional[Dict]:
+    """Устройство, тип ФС и опции монтирования из /proc/mounts"""
+    target = os.path.realpath(mount_point)
+    try:
+        with open('/proc/mounts') as f:
+            for line in f:
+                device, path, fstype, options = line.split()[:4]
+                if path == target:
+                    return {'device': device, 'fstype': fstype, 'options': options}
+    except OSError:
+        pass
+    return None
+
+
+def environment_fingerprint(endpoint: str = None, mount_points: Dict[str, str] = None) -> Dict:
+    """
+    Описание окружения прогона: хост, ядро, версии клиента и FUSE
+    драйверов, опции монтирования, endpoint. По различиям в отпечатках
+    видно, что поменялось между прогонами (например, обновился s3fs).
+    """
+    import boto3
+    import botocore
+
+    mounts = {}
+    for storage_type, mount_point in (mount_points or {}).items():
+        if mount_point:
+            mounts[storage_type] = {'path': mount_point, **(_mount_info(mount_point) or {})}
+
+    return {
+        'host': socket.gethostname(),
+        'kernel': platform.release(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'boto3': boto3.__version__,
+        'botocore': botocore.__version__,
+        'numpy': np.__version__,
+        's3fs': _command_version('s3fs'),
+        'goofys': _command_version('goofys'),
+        'version': _package_version(),
+        'endpoint': endpoint,
+        'mounts': mounts,
+    }
+
+
+@dataclass
+class StoredRun:
+    """Прогон из истории"""
+    id: int
+    timestamp: str
+    label: Optional[str]
+    fingerprint: Dict
+    results: List[BenchmarkResult]
+
+
+class ResultsDatabase:
+    """
+    История прогонов в SQLite. Только добавление: каждый прогон - строка
+    в runs с отпечатком окружения, каждый результат - строка в results
+    с полным BenchmarkResult в JSON (с гистограммой задержек и окнами
+    throughput, нужными для доверительных интервалов).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path)
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record_run(self, timestamp: str, results: List[BenchmarkResult],
+                   fingerprint: Dict, label: str = None) -> int:
+        """Сохранить прогон; возвращает его номер"""
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO runs (timestamp, created_at, label, host, kernel, endpoint, "
+                "version, fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (timestamp, time.time(), label, fingerprint.get('host'),
+                 fingerprint.get('kernel'), fingerprint.get('endpoint'),
+                 fingerprint.get('version'), json.dumps(fingerprint)))
+            run_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO results (run_id, name, storage_type, throughput_mbps, iops, "
+                "latency_p50_ms, latency_p99_ms, errors, result) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, r.name, r.storage_type, r.throughput_mbps, r.iops,
+                  r.latency_p50_ms, r.latency_p99_ms, r.errors, json.dumps(r.to_dict()))
+                 for r in results])
+        return run_id
+
+    def list_runs(self, limit: int = 20) -> List[Dict]:
+        """Последние прогоны (новые первыми)"""
+        rows = self._connection.execute(
+            "SELECT runs.id, timestamp, label, host, version, endpoint, COUNT(results.id) "
+            "FROM runs LEFT JOIN results ON results.run_id = runs.id "
+            "GROUP BY runs.id ORDER BY runs.id DESC LIMIT ?", (limit,))
+        keys = ('id', 'timestamp', 'label', 'host', 'version', 'endpoint', 'results')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def latest_run_ids(self, count: int = 2) -> List[int]:
+        rows = self._connection.execute("SELECT id FROM runs ORDER BY id DESC LIMIT ?", (count,))
+        return [row[0] for row in rows]
+
+    def load_run(self, run_id: int) -> Optional[StoredRun]:
+        row = self._connection.execute(
+            "SELECT id, timestamp, label, fingerprint FROM runs WHERE id = ?",
+            (run_id,)).fetchone()
+        if row is None:
+            return None
+        results = [BenchmarkResult(**json.loads(data)) for (data,) in self._connection.execute(
+            "SELECT result FROM results WHERE run_id = ? ORDER BY id", (run_id,))]
+        return StoredRun(row[0], row[1], row[2], json.loads(row[3]), results)
+
+
+@dataclass
+class MetricComparison:
+    """Сравнение одной метрики одной нагрузки: изменение и его доверительный интервал"""
+    name: str
+    storage_type: str
+    metric: str
+    baseline: float
+    candidate: float
+    change: float          # относительное изменение (candidate / baseline - 1)
+    ci_low: float
+    ci_high: float
+    bootstrapped: bool     # False - данных для интервала нет, интервал = точке
+    regression: bool
+
+
+def _ratio_interval(baseline: np.ndarray, candidate: np.ndarray,
+                    confidence: float) -> tuple:
+    """Процентильный интервал относительного изменения по бутстрэп-копиям"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        changes = candidate / baseline - 1
+    changes = changes[np.isfinite(changes)]
+    if not len(changes):
+        return 0.0, 0.0
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(changes, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def _bootstrap_mean(values: List[float], resamples: int,
+                    rng: np.random.Generator) -> Optional[np.ndarray]:
+    """Бутстрэп-распределение среднего (None, если значений меньше двух)"""
+    if not values or len(values) < 2:
+        return None
+    values = np.asarray(values, dtype=float)
+    picks = rng.integers(0, len(values), size=(resamples, len(values)))
+    return values[picks].mean(axis=1)
+
+
+def compare_results(baseline: BenchmarkResult, candidate: BenchmarkResult,
+                    threshold: float = DEFAULT_THRESHOLD,
+                    confidence: float = DEFAULT_CONFIDENCE,
+                    resamples: int = DEFAULT_RESAMPLES,
+                    rng: np.random.Generator = None) -> List[MetricComparison]:
+    """
+    Throughput и p99 кандидата против базового прогона.
+
+    Throughput: бутстрэп среднего по окнам временного ряда
+    (throughput_windows). p99: бутстрэп по гистограмме задержек.
+    Регрессия - если весь доверительный интервал хуже порога: throughput
+    ниже более чем на threshold или p99 выше более чем на threshold.
+    Без окон/гистограммы интервал вырождается в точечную оценку.
+    """
+    rng = rng or np.random.default_rng()
+    comparisons = []
+
+    def add(metric, base_value, cand_value, base_samples, cand_samples, worse_if_lower):
+        change = cand_value / base_value - 1 if base_value else 0.0
+        bootstrapped = base_samples is not None and cand_samples is not None
+        low, high = (_ratio_interval(base_samples, cand_samples, confidence)
+                     if bootstrapped else (change, change))
+        regression = high < -threshold if worse_if_lower else low > threshold
+        comparisons.append(MetricComparison(candidate.name, candidate.storage_type, metric,
+                                            base_value, cand_value, change, low, high,
+                                            bootstrapped, regression))
+
+    add('throughput_mbps', baseline.throughput_mbps, candidate.throughput_mbps,
+        _bootstrap_mean(baseline.throughput_windows, resamples, rng),
+        _bootstrap_mean(candidate.throughput_windows, resamples, rng),
+        worse_if_lower=True)
+
+    histograms = [LatencyHistogram.from_dict(r.latency_histogram) for r in (baseline, candidate)]
+    if all(h.total_count for h in histograms):
+        base_samples, cand_samples = (h.bootstrap_percentile(99, resamples, rng)
+                                      for h in histograms)
+    else:
+        base_samples = cand_samples = None
+    add('latency_p99_ms', baseline.latency_p99_ms, candidate.latency_p99_ms,
+        base_samples, cand_samples, worse_if_lower=False)
+    return comparisons
+
+
+def compare_runs(baseline: StoredRun, candidate: StoredRun, **options) -> List[MetricComparison]:
+    """Сравнение всех нагрузок, которые есть в обоих прогонах"""
+    base_results = {(r.name, r.storage_type): r for r in baseline.results}
+    comparisons = []
+    for result in candidate.results:
+        base = base_results.get((result.name, result.storage_type))
+        if base is not None:
+            comparisons.extend(compare_results(base, result, **options))
+    return comparisons
+
+
+def fingerprint_diff(baseline: Dict, candidate: Dict, prefix: str = "") -> List[str]:
+    """Различия отпечатков окружения: строки 'ключ: было -> стало'"""
+    lines = []
+    for key in sorted(set(baseline) | set(candidate)):
+        old, new = baseline.get(key), candidate.get(key)
+        if isinstance(old, dict) and isinstance(new, dict):
+            lines.extend(fingerprint_diff(old, new, f"{prefix}{key}."))
+        elif old != new:
+            lines.append(f"{prefix}{key}: {old} -> {new}")
+    return lines
@@ -0,0 +1,118 @@
+"""Масштабирование листинга: время полного обхода каталога/префикса от числа записей"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List
+import numpy as np
+from .base import BenchmarkBase, BenchmarkResult
+from .workloads import WorkloadConfig
+
+
+def entries_label(entries: int) -> str:
+    """1000 -> 1k, 1000000 -> 1M"""
+    for unit, size in (('M', 1000 ** 2), ('k', 1000)):
+        if entries >= size and entries % size == 0:
+            return f"{entries // size}{unit}"
+    return str(entries)
+
+
+def listing_name(layout: str, entries: int) -> str:
+    """Имя результата: у каждого числа записей своя строка в сравнении хранилищ"""
+    return f"listing_{layout}_{entries_label(entries)}"
+
+
+def listing_paths(entries: int, layout: str) -> Iterator[str]:
+    """Относительные пути записей: flat - все в одном каталоге, nested - по FANOUT"""
+    for i in range(entries):
+        if layout == WorkloadConfig.LISTING_NESTED:
+            yield f"d_{i // WorkloadConfig.LISTING_FANOUT:04d}/f_{i:07d}"
+        else:
+            yield f"f_{i:07d}"
+
+
+def run_parallel(function: Callable, items: Iterable,
+                 concurrency: int = WorkloadConfig.LISTING_SETUP_CONCURRENCY) -> int:
+    """function(item) для всех items в пуле потоков; возвращает число items"""
+    count = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in pool.map(function, items):
+            count += 1
+    return count
+
+
+def populate(create: Callable[[str], None], entries: int, layout: str,
+             concurrency: int = WorkloadConfig.LISTING_SETUP_CONCURRENCY):
+    """Заполнение каталога/префикса пустыми записями (не входит в замер)"""
+    print(f"  Populating {entries} entries ({layout})...")
+    start = time.perf_counter()
+    run_parallel(create, listing_paths(entries, layout), concurrency)
+    elapsed = time.perf_counter() - start
+    print(f"  Populated in {elapsed:.1f} sec ({entries / elapsed:.0f} entries/s)")
+
+
+@dataclass
+class ListingPoint:
+    """Обход каталога из entries записей"""
+    entries: int
+    result: BenchmarkResult
+
+    @property
+    def entries_per_sec(self) -> float:
+        """Скорость листинга: записей в секунду на одном обходе (по медиане)"""
+        walk_ms = self.result.latency_p50_ms
+        return self.entries / walk_ms * 1000 if walk_ms > 0 else 0.0
+
+    def to_dict(self):
+        return {'entries': self.entries, 'entries_per_sec': self.entries_per_sec,
+                'result': self.result.to_dict()}
+
+
+@dataclass
+class ListingScale:
+    """Время обхода от числа записей для одного хранилища и раскладки"""
+    storage_type: str
+    layout: str
+    points: List[ListingPoint] = field(default_factory=list)
+
+    @property
+    def scaling_exponent(self) -> float:
+        """
+        Показатель k в p50 ~ N^k по наклону в логарифмическом масштабе:
+        1 - линейный рост, больше 1 - обход деградирует с размером каталога.
+        0, если точек меньше двух.
+        """
+        points = [p for p in self.points if p.result.latency_p50_ms > 0]
+        if len(points) < 2:
+            return 0.0
+        return float(np.polyfit(np.log([p.entries for p in points]),
+                                np.log([p.result.latency_p50_ms for p in points]), 1)[0])
+
+    def to_dict(self):
+        return {
+            'storage_type': self.storage_type,
+            'layout': self.layout,
+            'points': [p.to_dict() for p in self.points],
+            'scaling_exponent': self.scaling_exponent,
+        }
+
+
+def sweep_listing(make_benchmark: Callable[[int], BenchmarkBase], entries: List[int],
+                  iterations: int, concurrency: int = 1,
+                  layout: str = WorkloadConfig.LISTING_FLAT) -> ListingScale:
+    """
+    Прогон листинга для каждого числа записей: make_benchmark(n) создает
+    бенчмарк, который заполняет каталог n записями в setup(), а каждая
+    итерация - полный обход.
+    """
+    scale = None
+    for count in sorted(entries):
+        benchmark = make_benchmark(count)
+        if scale is None:
+            scale = ListingScale(benchmark.storage_type, layout)
+        result = benchmark.run(iterations=iterations, concurrency=concurrency)
+        point = ListingPoint(count, result)
+        scale.points.append(point)
+        print(f"  {count:>10} entries -> walk p50 {result.latency_p50_ms:.1f} ms, "
+              f"{point.entries_per_sec:.0f} entries/s, errors {result.errors}")
+    return scale
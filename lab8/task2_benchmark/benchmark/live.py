@@ -0,0 +1,303 @@
+"""Живые метрики прогона: счетчики без блокировок, прогресс и endpoint Prometheus/OpenMetrics"""
+
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Границы корзин гистограммы задержек (секунды, как принято в Prometheus):
+# от 1 ms для native S3 до минуты для больших файлов через FUSE
+LATENCY_BUCKETS_SEC = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                       1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Как часто проверять прогресс прогона
+PROGRESS_INTERVAL_SEC = 0.5
+# Шаг вывода прогресса - доля от числа итераций
+PROGRESS_STEP = 0.1
+# Как часто рабочий процесс публикует свои счетчики родителю
+PUBLISH_INTERVAL_SEC = 0.5
+DEFAULT_HOST = '127.0.0.1'
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Раскладка значений ячейки: счетчики, затем корзины (последняя - +Inf)
+OPS, BYTES, ERRORS, LATENCY_SUM, BUCKETS = range(5)
+_BUCKET_EDGES_MS = [edge * 1000 for edge in LATENCY_BUCKETS_SEC]
+
+
+class LiveCell:
+    """
+    Счетчики одного потока нагрузки. Пишет только этот поток, поэтому
+    запись - несколько сложений без блокировок; читатель (endpoint,
+    прогресс) видит значения с точностью до операции. values - список
+    или RawArray общей памяти (ячейка рабочего процесса, см. parallel.py).
+    """
+
+    SIZE = BUCKETS + len(LATENCY_BUCKETS_SEC) + 1
+
+    def __init__(self, values=None):
+        self.values = values if values is not None else [0.0] * self.SIZE
+
+    def record(self, latency_ms: float, bytes_processed: float):
+        values = self.values
+        values[OPS] += 1
+        values[BYTES] += bytes_processed
+        values[LATENCY_SUM] += latency_ms / 1000
+        values[BUCKETS + bisect_left(_BUCKET_EDGES_MS, latency_ms)] += 1
+
+    def record_error(self):
+        self.values[ERRORS] += 1
+
+    def load(self, values: Sequence[float]):
+        """Записать значения целиком (публикация сводки процесса)"""
+        self.values[:] = values
+
+
+class LiveSeries:
+    """Ячейки всех потоков одного хранилища и нагрузки"""
+
+    def __init__(self, storage_type: str, workload: str):
+        self.storage_type = storage_type
+        self.workload = workload
+        self.running = 0
+        self._cells: List[LiveCell] = []
+        self._lock = threading.Lock()
+
+    def cell(self, values=None) -> LiveCell:
+        """Новая ячейка для потока (процесса) нагрузки"""
+        cell = LiveCell(values)
+        with self._lock:
+            self._cells.append(cell)
+        return cell
+
+    def totals(self) -> List[float]:
+        """Сумма значений по всем ячейкам"""
+        totals = [0.0] * LiveCell.SIZE
+        with self._lock:
+            cells = list(self._cells)
+        for cell in cells:
+            for i, value in enumerate(cell.values[:]):
+                totals[i] += value
+        return totals
+
+    def completed(self) -> int:
+        """Завершенные операции, включая ошибки"""
+        totals = self.totals()
+        return int(totals[OPS] + totals[ERRORS])
+
+    def start(self):
+        with self._lock:
+            self.running += 1
+
+    def stop(self):
+        with self._lock:
+            self.running -= 1
+
+
+class LiveMetrics:
+    """Реестр серий: по одной на (хранилище, нагрузку), живет весь запуск"""
+
+    def __init__(self):
+        self._series: Dict[Tuple[str, str], LiveSeries] = {}
+        self._lock = threading.Lock()
+
+    def series(self, storage_type: str, workload: str) -> LiveSeries:
+        key = (storage_type, workload)
+        with self._lock:
+            if key not in self._series:
+                self._series[key] = LiveSeries(storage_type, workload)
+            return self._series[key]
+
+    def render(self, openmetrics: bool = False) -> str:
+        """Текстовый формат Prometheus (или OpenMetrics) для всех серий"""
+        with self._lock:
+            series = list(self._series.values())
+        rows = [(s, _labels(s), s.totals()) for s in series]
+        lines = []
+
+        def family(name: str, kind: str, help_text: str, samples):
+            # В OpenMetrics суффикс _total у счетчика не входит в имя семейства
+            declared = name[:-len('_total')] if openmetrics and kind == 'counter' else name
+            lines.append(f"# HELP {declared} {help_text}")
+            lines.append(f"# TYPE {declared} {kind}")
+            lines.extend(samples)
+
+        for name, index, help_text in (
+                ('s3bench_operations_total', OPS, 'Completed measured operations.'),
+                ('s3bench_bytes_total', BYTES, 'Bytes transferred by measured operations.'),
+                ('s3bench_errors_total', ERRORS, 'Failed measured operations.')):
+            family(name, 'counter', help_text,
+                   [f"{name}{{{labels}}} {_number(totals[index])}"
+                    for _, labels, totals in rows])
+
+        samples = []
+        for _, labels, totals in rows:
+            cumulative = 0.0
+            for edge, count in zip(LATENCY_BUCKETS_SEC + (None,), totals[BUCKETS:]):
+                cumulative += count
+                le = '+Inf' if edge is None else f"{edge:g}"
+                samples.append(f's3bench_latency_seconds_bucket{{{labels},le="{le}"}} '
+                               f'{_number(cumulative)}')
+            samples.append(f"s3bench_latency_seconds_sum{{{labels}}} "
+                           f"{_number(totals[LATENCY_SUM])}")
+            samples.append(f"s3bench_latency_seconds_count{{{labels}}} {_number(cumulative)}")
+        family('s3bench_latency_seconds', 'histogram',
+               'Latency of successful measured operations.', samples)
+
+        family('s3bench_running', 'gauge', 'Runs of this storage and workload in progress.',
+               [f"s3bench_running{{{labels}}} {s.running}" for s, labels, _ in rows])
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(series: LiveSeries) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in
+                    (('storage_type', series.storage_type), ('workload', series.workload)))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# Реестр процесса: бенчмарки пишут в него, endpoint его отдает
+REGISTRY = LiveMetrics()
+
+
+class ProgressReporter:
+    """
+    Вывод прогресса прогона из фонового потока: каждые PROGRESS_STEP от
+    total итераций по счетчикам серии. Сам цикл замера ничего не печатает.
+    """
+
+    def __init__(self, series: LiveSeries, total: int,
+                 interval_sec: float = PROGRESS_INTERVAL_SEC):
+        self.series = series
+        self.total = total
+        self.interval_sec = interval_sec
+        self._base = 0
+        self._reported = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        # Серия общая для повторов одного прогона - считаем от текущего значения
+        self._base = self.series.completed()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_sec):
+            self._report()
+
+    def _report(self):
+        step = max(1, int(self.total * PROGRESS_STEP))
+        done = min(self.series.completed() - self._base, self.total)
+        if done // step > self._reported // step:
+            self._reported = done
+            print(f"  Progress: {done}/{self.total}")
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._report()
+
+
+class LivePublisher:
+    """
+    Публикация счетчиков рабочего процесса: сумма серии его потоков
+    периодически копируется в ячейку общей памяти, которую видит родитель.
+    """
+
+    def __init__(self, series: LiveSeries, target: LiveCell,
+                 interval_sec: float = PUBLISH_INTERVAL_SEC):
+        self.series = series
+        self.target = target
+        self.interval_sec = interval_sec
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_sec):
+            self.target.load(self.series.totals())
+
+    def stop(self):
+        """Остановка и последняя публикация - до отправки результатов родителю"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.target.load(self.series.totals())
+
+
+def progress_reporter(series: LiveSeries, iterations: int,
+                      duration: float = None) -> Optional[ProgressReporter]:
+    """Прогресс для прогона по числу итераций (по времени - не выводится)"""
+    if duration is not None or iterations <= 0:
+        return None
+    return ProgressReporter(series, iterations)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: LiveMetrics = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+        body = self.registry.render(openmetrics).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', OPENMETRICS_CONTENT_TYPE if openmetrics
+                         else PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Опросы Prometheus не должны засорять вывод бенчмарка
+        pass
+
+
+class MetricsServer:
+    """HTTP endpoint /metrics в фоновом потоке"""
+
+    def __init__(self, port: int, host: str = DEFAULT_HOST, registry: LiveMetrics = REGISTRY):
+        self.port = port
+        self.host = host
+        self.registry = registry
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self) -> 'MetricsServer':
+        handler = type('MetricsHandler', (_MetricsHandler,), {'registry': self.registry})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        # Порт 0 - свободный порт, выбранный системой
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
@@ -0,0 +1,72 @@
+"""Поиск точки насыщения: прогон open-loop нагрузки с растущей интенсивностью"""
+
+from dataclasses import dataclass, field, asdict
+from typing import List
+from .arrival import ArrivalSchedule
+from .base import BenchmarkBase, BenchmarkResult
+
+# Точка считается насыщенной, если система не успевает за заданной
+# интенсивностью или p99 вырос во столько раз относительно первой точки
+THROUGHPUT_SHORTFALL = 0.9
+P99_BREAKDOWN_FACTOR = 5.0
+
+
+@dataclass
+class LoadSweep:
+    """Результат прогона по шкале интенсивностей"""
+    name: str
+    storage_type: str
+    arrival: str
+    points: List[BenchmarkResult] = field(default_factory=list)
+    saturation_rate: float = 0.0
+    max_sustained_iops: float = 0.0
+
+    def to_dict(self):
+        data = asdict(self)
+        data['points'] = [p.to_dict() for p in self.points]
+        return data
+
+
+def is_saturated(point: BenchmarkResult, baseline_p99_ms: float) -> bool:
+    """Система не держит заданную нагрузку"""
+    if point.iterations and point.errors > point.iterations * 0.01:
+        return True
+    if point.iops < point.target_rate * THROUGHPUT_SHORTFALL:
+        return True
+    return baseline_p99_ms > 0 and point.latency_p99_ms > baseline_p99_ms * P99_BREAKDOWN_FACTOR
+
+
+def sweep_offered_load(benchmark: BenchmarkBase, rates: List[float],
+                       step_duration_sec: float = 10.0, concurrency: int = 1,
+                       arrival: str = ArrivalSchedule.FIXED,
+                       stop_after_saturation: bool = True) -> LoadSweep:
+    """
+    Прогон бенчмарка на каждой интенсивности из rates (ops/s) по
+    step_duration_sec секунд. saturation_rate - первая интенсивность,
+    на которой задержки "ломаются", max_sustained_iops - лучший
+    достигнутый IOPS до нее.
+    """
+    sweep = LoadSweep(name=benchmark.name, storage_type=benchmark.storage_type,
+                      arrival=arrival)
+    baseline_p99 = 0.0
+
+    for rate in sorted(rates):
+        iterations = max(1, int(rate * step_duration_sec))
+        point = benchmark.run(iterations=iterations, concurrency=concurrency,
+                              rate=rate, arrival=arrival)
+        sweep.points.append(point)
+
+        if not baseline_p99:
+            baseline_p99 = point.latency_p99_ms
+
+        print(f"  offered {rate:>10.1f} ops/s -> achieved {point.iops:>10.1f} ops/s, "
+              f"p99 {point.latency_p99_ms:.2f} ms")
+
+        if is_saturated(point, baseline_p99):
+            sweep.saturation_rate = sweep.saturation_rate or rate
+            if stop_after_saturation:
+                break
+        else:
+            sweep.max_sustained_iops = max(sweep.max_sustained_iops, point.iops)
+
+    return sweep
@@ -0,0 +1,169 @@
+"""Матрица прогонов: все сочетания параметров с кэшем результатов для продолжения"""
+
+import hashlib
+import itertools
+import json
+import os
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from .base import BenchmarkResult
+from .workloads import WorkloadType
+
+# Версия формата ячейки: входит в хэш, смена сбрасывает кэш
+CELL_VERSION = 1
+
+# Нагрузки, у которых есть размер объекта / размер части multipart
+SIZED_WORKLOADS = (
+    WorkloadType.SEQUENTIAL_WRITE,
+    WorkloadType.SEQUENTIAL_READ,
+    WorkloadType.SMALL_FILES,
+    WorkloadType.MULTIPART_UPLOAD,
+    WorkloadType.PARALLEL_READ,
+)
+PART_SIZED_WORKLOADS = (WorkloadType.MULTIPART_UPLOAD,)
+
+
+def format_size(size: int) -> str:
+    """Короткая запись размера: 4KB, 1MB, 1.5GB"""
+    for unit, scale in (('GB', 1024 ** 3), ('MB', 1024 ** 2), ('KB', 1024)):
+        if size >= scale:
+            return f"{size / scale:g}{unit}"
+    return f"{size}B"
+
+
+@dataclass(frozen=True)
+class MatrixCell:
+    """Одна ячейка матрицы; None - значение по умолчанию нагрузки"""
+    storage_type: str
+    workload: str
+    concurrency: int
+    object_size: Optional[int] = None
+    part_size: Optional[int] = None
+
+    @property
+    def label(self) -> str:
+        """Имя результата в отчете (хранилище в имя не входит - по нему сравнение)"""
+        parts = [self.workload]
+        if self.object_size:
+            parts.append(format_size(self.object_size))
+        parts.append(f"c{self.concurrency}")
+        if self.part_size:
+            parts.append(f"part{format_size(self.part_size)}")
+        return "_".join(parts)
+
+    def parameters(self) -> Dict:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+def expand_matrix(storage_types: List[str], workloads: List[str],
+                  object_sizes: List[Optional[int]], concurrency: List[int],
+                  part_sizes: List[Optional[int]]) -> List[MatrixCell]:
+    """
+    Декартово произведение параметров. Параметры, которые нагрузка не
+    использует, сворачиваются в None, поэтому дубликаты не прогоняются.
+    Нагрузки только для native S3 на ФС пропускаются.
+    """
+    cells = []
+    seen = set()
+    for storage_type, workload, size, level, part_size in itertools.product(
+            storage_types, workloads, object_sizes, concurrency, part_sizes):
+        if storage_type != 'native_s3' and workload in WorkloadType.NATIVE_S3_ONLY:
+            continue
+        cell = MatrixCell(
+            storage_type=storage_type,
+            workload=workload,
+            concurrency=level,
+            object_size=size if workload in SIZED_WORKLOADS else None,
+            part_size=part_size if workload in PART_SIZED_WORKLOADS else None,
+        )
+        if cell not in seen:
+            seen.add(cell)
+            cells.append(cell)
+    return cells
+
+
+def cell_hash(parameters: Dict) -> str:
+    """Хэш содержимого параметров (порядок ключей не важен)"""
+    canonical = json.dumps(parameters, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Каталог с результатами ячеек: <хэш>.json с параметрами и результатом.
+    Запись атомарна (временный файл + rename), поэтому обрыв прогона не
+    оставляет поврежденных записей.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> Optional[BenchmarkResult]:
+        try:
+            with open(self.path(key), encoding='utf-8') as f:
+                return BenchmarkResult(**json.load(f)['result'])
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"⚠️  Ignoring unreadable cache entry {key}: {e}")
+            return None
+
+    def store(self, key: str, parameters: Dict, result: BenchmarkResult):
+        path = self.path(key)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'parameters': parameters, 'result': result.to_dict()},
+                      f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+
+def run_matrix(cells: List[MatrixCell],
+               run_cell: Callable[[MatrixCell], Optional[BenchmarkResult]],
+               cache: ResultCache, context: Dict = None
+               ) -> List[Tuple[MatrixCell, BenchmarkResult]]:
+    """
+    Прогон всех ячеек с пропуском уже посчитанных.
+
+    context - общие для всех ячеек параметры (итерации, endpoint, профиль
+    данных...), они входят в хэш вместе с параметрами ячейки. В кэш
+    попадают только результаты без ошибок: ячейка, прерванная падением
+    хранилища, при повторном запуске выполняется заново.
+    """
+    context = context or {}
+    results = []
+    skipped = 0
+
+    for index, cell in enumerate(cells, 1):
+        parameters = {'version': CELL_VERSION, **context, **cell.parameters()}
+        key = cell_hash(parameters)
+        result = cache.load(key)
+        if result is not None:
+            skipped += 1
+            print(f"[{index}/{len(cells)}] ⏭  {cell.storage_type} / {cell.label} (cached {key})")
+            results.append((cell, result))
+            continue
+
+        print(f"\n[{index}/{len(cells)}] Running {cell.storage_type} / {cell.label}...")
+        print("-" * 80)
+        result = run_cell(cell)
+        if result is None:
+            continue
+        result.name = cell.label
+        if result.errors:
+            print(f"⚠️  {result.errors} errors - result not cached, cell will be re-run")
+        else:
+            cache.store(key, parameters, result)
+        results.append((cell, result))
+        print(f"✅ Completed: {result.throughput_mbps:.2f} MB/s, "
+              f"{result.iops:.2f} IOPS, {result.latency_avg_ms:.2f}ms avg latency")
+
+    print(f"\nMatrix: {len(cells)} cells, {skipped} from cache, "
+          f"{len(results) - skipped} run, {len(cells) - len(results)} failed")
+    return results
@@ -5,6 +5,77 @@ from pathlib import Path
 from typing import List, Dict
 from datetime import datetime
 from .base import BenchmarkResult
+from .histogram import LatencyHistogram
+from .listing import ListingScale
+from .loadsweep import LoadSweep
+from .repetition import significantly_better
+from .resources import cpu_bound
+from .tuning import TuningResult
+
+
+def _phase_lines(http_phases: Dict) -> List[str]:
+    """Строки отчета с фазами HTTP запросов (phases.py)"""
+    requests = http_phases['requests']
+    new, reused = http_phases['connections_new'], http_phases['connections_reused']
+    lines = [
+        f"    HTTP requests:   {requests:>10} ({http_phases['retries']} retries, "
+        f"connections {new} new / {reused} reused)",
+        f"      {'Phase':10} {'count':>8} {'avg':>9} {'p50':>9} {'p99':>9} {'per req':>9}",
+    ]
+    for phase, data in http_phases['phases'].items():
+        histogram = LatencyHistogram.from_dict(data)
+        lines.append(f"      {phase:10} {histogram.total_count:>8} "
+                     f"{histogram.mean_ms:>7.2f}ms {histogram.percentile(50):>7.2f}ms "
+                     f"{histogram.percentile(99):>7.2f}ms {histogram.sum_ms / requests:>7.2f}ms")
+    return lines
+
+
+def _resource_lines(resources: Dict, processes: int = 1) -> List[str]:
+    """Строки отчета с ресурсами клиента, хоста и FUSE демона (resources.py)"""
+    lines = [
+        f"    Client CPU:      {resources['cpu_cores']:>10.2f} cores "
+        f"(max {resources['cpu_cores_max']:.2f} of {resources['cpu_count']}), "
+        f"RSS max {resources['rss_max_mb']:.0f} MB",
+        f"    MB/s per core:   {resources['mbps_per_cpu_core']:>10.2f}",
+        f"    Host network:    {resources['net_rx_mb']:>10.1f} MB in / "
+        f"{resources['net_tx_mb']:.1f} MB out, "
+        f"disk {resources['disk_read_mb']:.1f} MB read / {resources['disk_write_mb']:.1f} MB written",
+    ]
+    if resources['daemon_pids']:
+        lines.append(f"    FUSE daemon:     {resources['daemon_cpu_cores']:>10.2f} cores, "
+                     f"RSS max {resources['daemon_rss_max_mb']:.0f} MB, "
+                     f"{resources['mbps_per_total_core']:.2f} MB/s per core incl. daemon")
+    if cpu_bound(resources, processes):
+        lines.append("    ⚠️  Client is CPU-bound: the result may be limited by the "
+                     "benchmark itself" + (" (try --processes)" if processes == 1 else ""))
+    return lines
+
+
+def _connections_opened(result: BenchmarkResult):
+    """Число открытых за прогон соединений ('-', если фазы не записывались)"""
+    return result.http_phases['connections_new'] if result.http_phases else '-'
+
+
+def _pool_plateau_lines(tuning: TuningResult) -> List[str]:
+    """Где throughput перестает расти с размером пула и сколько соединений открыто"""
+    lines = []
+    for point in tuning.plateau('max_pool_connections'):
+        others = ", ".join(f"{n}={v}" for n, v in point.parameters.items()
+                           if n != 'max_pool_connections')
+        pool = point.parameters['max_pool_connections']
+        lines.append(f"    Plateau ({others or 'all'}): pool {pool} -> "
+                     f"{point.result.throughput_mbps:.2f} MB/s, "
+                     f"{_connections_opened(point.result)} connections opened")
+    # Пул меньше числа одновременных запросов: urllib3 открывает лишние
+    # соединения и закрывает их после запроса - на каждом запросе новое TCP/TLS
+    for point in tuning.points:
+        opened = _connections_opened(point.result)
+        pool = point.parameters['max_pool_connections']
+        if opened != '-' and opened > pool:
+            lines.append(f"    ⚠️  Pool exhausted at pool {pool} "
+                         f"({', '.join(f'{n}={v}' for n, v in point.parameters.items() if n != 'max_pool_connections')}): "
+                         f"{opened} connections opened, p99 {point.result.latency_p99_ms:.2f} ms")
+    return lines
 
 
 class MetricsCollector:
@@ -12,12 +83,31 @@ class MetricsCollector:
     
     def __init__(self):
         self.results: List[BenchmarkResult] = []
+        self.load_sweeps: List[LoadSweep] = []
+        self.tunings: List[TuningResult] = []
+        self.listing_scales: List[ListingScale] = []
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     def add_result(self, result: BenchmarkResult):
         """Добавить результат бенчмарка"""
         self.results.append(result)
     
+    def add_load_sweep(self, sweep: LoadSweep):
+        """Добавить результат поиска точки насыщения"""
+        self.load_sweeps.append(sweep)
+    
+    def add_tuning(self, tuning: TuningResult):
+        """Добавить результат перебора параметров передачи"""
+        self.tunings.append(tuning)
+    
+    def add_listing_scale(self, scale: ListingScale):
+        """Добавить время листинга от числа записей"""
+        self.listing_scales.append(scale)
+    
+    def timeseries_file(self, output_dir: Path) -> Path:
+        """Путь к JSONL-файлу временного ряда этого запуска"""
+        return output_dir / f"benchmark_timeseries_{self.timestamp}.jsonl"
+    
     def save_raw_data(self, output_dir: Path):
         """Сохранить сырые данные в JSON"""
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -26,6 +116,14 @@ class MetricsCollector:
             'timestamp': self.timestamp,
             'results': [r.to_dict() for r in self.results]
         }
+        if self.timeseries_file(output_dir).exists():
+            data['timeseries_file'] = self.timeseries_file(output_dir).name
+        if self.load_sweeps:
+            data['load_sweeps'] = [s.to_dict() for s in self.load_sweeps]
+        if self.tunings:
+            data['tunings'] = [t.to_dict() for t in self.tunings]
+        if self.listing_scales:
+            data['listing_scales'] = [s.to_dict() for s in self.listing_scales]
         
         output_file = output_dir / f"benchmark_raw_{self.timestamp}.json"
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -61,13 +159,49 @@ class MetricsCollector:
             for result in results:
                 report_lines.append(f"\n  Storage: {result.storage_type}")
                 report_lines.append(f"  {'─' * 70}")
-                report_lines.append(f"    Throughput:      {result.throughput_mbps:>10.2f} MB/s")
+                if result.repeats > 1:
+                    report_lines.append(f"    Throughput:      {result.throughput_mbps:>10.2f} "
+                                        f"± {result.throughput_ci_mbps:.2f} MB/s (95% CI)")
+                else:
+                    report_lines.append(f"    Throughput:      {result.throughput_mbps:>10.2f} MB/s")
                 report_lines.append(f"    IOPS:            {result.iops:>10.2f} ops/s")
                 report_lines.append(f"    Latency (avg):   {result.latency_avg_ms:>10.2f} ms")
+                report_lines.append(f"    Latency (p50):   {result.latency_p50_ms:>10.2f} ms")
+                report_lines.append(f"    Latency (p90):   {result.latency_p90_ms:>10.2f} ms")
                 report_lines.append(f"    Latency (p95):   {result.latency_p95_ms:>10.2f} ms")
-                report_lines.append(f"    Latency (p99):   {result.latency_p99_ms:>10.2f} ms")
+                if result.repeats > 1:
+                    report_lines.append(f"    Latency (p99):   {result.latency_p99_ms:>10.2f} "
+                                        f"± {result.latency_p99_ci_ms:.2f} ms (95% CI)")
+                else:
+                    report_lines.append(f"    Latency (p99):   {result.latency_p99_ms:>10.2f} ms")
+                report_lines.append(f"    Latency (p99.9): {result.latency_p999_ms:>10.2f} ms")
+                report_lines.append(f"    Latency (max):   {result.latency_max_ms:>10.2f} ms")
                 report_lines.append(f"    Total time:      {result.total_time_sec:>10.2f} sec")
+                report_lines.append(f"    Concurrency:     {result.concurrency:>10}")
+                report_lines.append(f"    Processes:       {result.processes:>10}")
+                if result.nodes > 1:
+                    report_lines.append(f"    Nodes:           {result.nodes:>10}")
                 report_lines.append(f"    Errors:          {result.errors:>10}")
+                if result.repeats > 1:
+                    report_lines.append(f"    Repeats:         {result.repeats:>10}"
+                                        f"{f' ({result.outlier_runs} outlier runs excluded)' if result.outlier_runs else ''}")
+                    for i, (mbps, p99) in enumerate(zip(result.run_throughputs,
+                                                         result.run_latency_p99s), 1):
+                        flag = "  ← outlier" if result.run_outliers[i - 1] else ""
+                        report_lines.append(f"      #{i:<3} {mbps:10.2f} MB/s  p99 {p99:8.2f} ms{flag}")
+                if result.warmup_iterations:
+                    report_lines.append(f"    Warmup:          {result.warmup_iterations:>10} ops "
+                                        f"({result.warmup_sec:.2f} sec, not measured)")
+                if result.transient_sec:
+                    report_lines.append(f"    Transient:       {result.transient_iterations:>10} ops "
+                                        f"({result.transient_sec:.2f} sec before steady state, excluded)")
+                if result.cleanup_objects:
+                    report_lines.append(f"    Cleanup:         {result.cleanup_objects_per_sec:>10.2f} objects/s "
+                                        f"({result.cleanup_objects} in {result.cleanup_time_sec:.2f} sec)")
+                if result.http_phases and result.http_phases['requests']:
+                    report_lines.extend(_phase_lines(result.http_phases))
+                if result.resources:
+                    report_lines.extend(_resource_lines(result.resources, result.processes))
             
             # Сравнение
             if len(results) > 1:
@@ -82,6 +216,19 @@ class MetricsCollector:
                         ratio = (r.throughput_mbps / best.throughput_mbps) * 100
                         report_lines.append(f"    {r.storage_type:15} {r.throughput_mbps:8.2f} MB/s ({ratio:5.1f}%)")
         
+        if self.load_sweeps:
+            report_lines.extend(self._load_sweep_report())
+        
+        if self.tunings:
+            report_lines.extend(self._tuning_report())
+        
+        if self.listing_scales:
+            report_lines.extend(self._listing_report())
+        
+        visibility = [r for r in self.results if r.name.startswith('visibility_')]
+        if visibility:
+            report_lines.extend(self._visibility_report(visibility))
+        
         # Рекомендации
         report_lines.append(f"\n{'=' * 80}")
         report_lines.append("RECOMMENDATIONS")
@@ -106,19 +253,118 @@ class MetricsCollector:
         
         return report_text
     
+    def _load_sweep_report(self) -> List[str]:
+        """Таблицы open-loop прогонов и точки насыщения"""
+        lines = [f"\n{'=' * 80}", "SATURATION POINTS (open-loop)", '=' * 80]
+        
+        for sweep in self.load_sweeps:
+            lines.append(f"\n  {sweep.name} / {sweep.storage_type} ({sweep.arrival} arrivals)")
+            lines.append(f"  {'─' * 70}")
+            lines.append(f"    {'Offered':>12} {'Achieved':>12} {'p50 ms':>10} "
+                         f"{'p99 ms':>10} {'p99.9 ms':>10}")
+            for p in sweep.points:
+                lines.append(f"    {p.target_rate:>12.1f} {p.iops:>12.1f} "
+                             f"{p.latency_p50_ms:>10.2f} {p.latency_p99_ms:>10.2f} "
+                             f"{p.latency_p999_ms:>10.2f}")
+            if sweep.saturation_rate:
+                lines.append(f"    Saturation at:   {sweep.saturation_rate:>10.1f} ops/s")
+            else:
+                lines.append(f"    Saturation at:   not reached")
+            lines.append(f"    Max sustained:   {sweep.max_sustained_iops:>10.1f} ops/s")
+        
+        return lines
+    
+    def _listing_report(self) -> List[str]:
+        """Время полного обхода каталога от числа записей по хранилищам"""
+        lines = [f"\n{'=' * 80}", "LISTING SCALING (full walk)", '=' * 80]
+        
+        for scale in self.listing_scales:
+            lines.append(f"\n  listing_{scale.layout} / {scale.storage_type}")
+            lines.append(f"  {'─' * 70}")
+            lines.append(f"    {'Entries':>10} {'p50 ms':>12} {'p99 ms':>12} "
+                         f"{'Entries/s':>12} {'Errors':>7}")
+            for point in scale.points:
+                r = point.result
+                lines.append(f"    {point.entries:>10} {r.latency_p50_ms:>12.1f} "
+                             f"{r.latency_p99_ms:>12.1f} {point.entries_per_sec:>12.0f} "
+                             f"{r.errors:>7}")
+            if len(scale.points) > 1:
+                exponent = scale.scaling_exponent
+                trend = ("superlinear" if exponent > 1.2
+                         else "sublinear" if exponent < 0.8 else "linear")
+                lines.append(f"    Scaling:         p50 ~ N^{exponent:.2f} ({trend})")
+        
+        return lines
+    
+    def _visibility_report(self, results: List[BenchmarkResult]) -> List[str]:
+        """Задержка видимости записи по другому пути: перцентили по точкам монтирования"""
+        lines = [f"\n{'=' * 80}", "VISIBILITY LAG (write completed -> visible via other path)",
+                 '=' * 80, "",
+                 f"    {'Storage':<10} {'Direction':<10} {'p50 ms':>10} {'p90 ms':>10} "
+                 f"{'p99 ms':>10} {'max ms':>10} {'Timeouts':>9}"]
+        for r in sorted(results, key=lambda r: (r.storage_type, r.name)):
+            lines.append(f"    {r.storage_type:<10} {r.name[len('visibility_'):]:<10} "
+                         f"{r.latency_p50_ms:>10.1f} {r.latency_p90_ms:>10.1f} "
+                         f"{r.latency_p99_ms:>10.1f} {r.latency_max_ms:>10.1f} {r.errors:>9}")
+        lines.append("    Resolution: polling interval (--visibility-poll-ms); "
+                     "timeouts are not in percentiles")
+        return lines
+    
+    def _tuning_report(self) -> List[str]:
+        """Таблицы перебора параметров клиента и лучшие конфигурации"""
+        lines = [f"\n{'=' * 80}", "CLIENT TUNING", '=' * 80]
+        
+        for tuning in self.tunings:
+            if not tuning.points:
+                continue
+            names = list(tuning.points[0].parameters)
+            lines.append(f"\n  {tuning.name} / {tuning.storage_type}")
+            lines.append(f"  {'─' * 70}")
+            lines.append("    " + " ".join(f"{n:>16}" for n in names)
+                         + f" {'MB/s':>10} {'p99 ms':>10} {'Errors':>7} {'Conns':>7}")
+            for point in tuning.points:
+                r = point.result
+                lines.append("    " + " ".join(f"{_format_parameter(n, point.parameters[n]):>16}"
+                                               for n in names)
+                             + f" {r.throughput_mbps:>10.2f} {r.latency_p99_ms:>10.2f}"
+                             f" {r.errors:>7} {_connections_opened(r):>7}")
+            best = tuning.best
+            lines.append(f"    Best: " + ", ".join(
+                f"{n}={_format_parameter(n, v)}" for n, v in best.parameters.items())
+                         + f" ({best.result.throughput_mbps:.2f} MB/s)")
+            if 'max_pool_connections' in names:
+                lines.extend(_pool_plateau_lines(tuning))
+        
+        return lines
+    
     def _generate_recommendations(self, workloads: Dict) -> List[str]:
         """Генерация рекомендаций на основе результатов"""
         lines = []
         
         # Находим лучшее решение для каждой нагрузки
         for workload_name, results in workloads.items():
-            if not results:
+            # Для видимости важна задержка, а не MB/s - она в VISIBILITY LAG
+            if not results or workload_name.startswith('visibility_'):
                 continue
             
-            best = max(results, key=lambda x: x.throughput_mbps)
+            ranked = sorted(results, key=lambda x: x.throughput_mbps, reverse=True)
+            best = ranked[0]
             
             lines.append(f"• {workload_name}:")
-            lines.append(f"    Best: {best.storage_type} ({best.throughput_mbps:.2f} MB/s)")
+            # Победитель - только если он значимо быстрее следующего
+            significant = (significantly_better(best, ranked[1])
+                           if len(ranked) > 1 else True)
+            if significant is None:
+                lines.append(f"    Fastest: {best.storage_type} ({best.throughput_mbps:.2f} MB/s, "
+                             f"single run - use --repeat to test significance)")
+            elif significant:
+                lines.append(f"    Best: {best.storage_type} ({best.throughput_mbps:.2f} MB/s)")
+            else:
+                tied = [r.storage_type for r in ranked[1:]
+                        if significantly_better(best, r) is False]
+                lines.append(f"    No significant winner: {best.storage_type} "
+                             f"({best.throughput_mbps:.2f} ± {best.throughput_ci_mbps:.2f} MB/s) "
+                             f"is within noise of {', '.join(tied)}")
             
             # Специфичные рекомендации
             if 'sequential' in workload_name.lower():
@@ -147,3 +393,10 @@ class MetricsCollector:
     def get_results_by_storage(self, storage_type: str) -> List[BenchmarkResult]:
         """Получить результаты для конкретного типа хранилища"""
         return [r for r in self.results if r.storage_type == storage_type]
+
+
+def _format_parameter(name: str, value) -> str:
+    """Размеры в байтах показываем в MB"""
+    if name.endswith('size') and isinstance(value, int) and value >= 1024 * 1024:
+        return f"{value // (1024 * 1024)} MB"
+    return str(value)
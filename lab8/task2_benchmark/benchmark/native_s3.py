@@ -3,30 +3,167 @@
 import os
 import io
 import random
+import threading
 import boto3
+from botocore.exceptions import ClientError
 from .base import BenchmarkBase
-from .workloads import WorkloadConfig
+from .clients import DEFAULT_MAX_POOL_CONNECTIONS, client_config
+from .engine import ScheduledWorkload
+from .listing import listing_name, populate
+from .payload import RANDOM, PayloadReader, get_pool, spread_size
+from .phases import instrument_client
+from .transfer import BulkDeleter, MultipartUploader, RangedDownloader
+from .spec import WorkloadSpec, mixed_spec
+from .workloads import WorkloadConfig, WorkloadType
 
+# Коды ответа S3 для отсутствующего ключа
+_NOT_FOUND_CODES = ("NoSuchKey", "404", "NotFound")
 
-class NativeS3Benchmark(BenchmarkBase):
+
+def is_not_found(error: ClientError) -> bool:
+    return error.response.get('Error', {}).get('Code') in _NOT_FOUND_CODES
+
+
+class NativeS3Benchmark(ScheduledWorkload, BenchmarkBase):
     """Бенчмарк для нативного S3 API через boto3"""
     
+    # Метод итерации для каждой встроенной нагрузки
+    WORKLOAD_METHODS = {
+        "sequential_write": "_sequential_write",
+        "sequential_read": "_sequential_read",
+        "random_io": "_random_io",
+        "small_files": "_small_file_create",
+        "metadata_ops": "_metadata_operation",
+        "multipart_upload": "_multipart_upload",
+        "parallel_read": "_parallel_read",
+        "listing": "_listing_walk",
+    }
+    
     def __init__(self, bucket_name: str, workload_type: str, 
                  endpoint_url: str = None, access_key: str = None, 
-                 secret_key: str = None):
-        super().__init__(workload_type, "native_s3")
+                 secret_key: str = None,
+                 part_size: int = WorkloadConfig.MULTIPART_PART_SIZE,
+                 part_concurrency: int = WorkloadConfig.MULTIPART_CONCURRENCY,
+                 object_size: int = None,
+                 range_size: int = WorkloadConfig.PARALLEL_READ_RANGE_SIZE,
+                 range_concurrency: int = WorkloadConfig.PARALLEL_READ_CONCURRENCY,
+                 delete_concurrency: int = WorkloadConfig.DELETE_CONCURRENCY,
+                 max_pool_connections: int = None,
+                 payload_profile: str = RANDOM, size_spread: float = 0.0,
+                 spec: WorkloadSpec = None, trace_phases: bool = True,
+                 client_profile: str = 'default', client_options: dict = None,
+                 shared_client: bool = False,
+                 listing_entries: int = WorkloadConfig.LISTING_ENTRIES,
+                 listing_layout: str = WorkloadConfig.LISTING_FLAT):
+        if spec is None and workload_type == WorkloadType.MIXED:
+            spec = mixed_spec()
+        if spec is not None:
+            workload_type = spec.name
+        elif workload_type not in self.WORKLOAD_METHODS:
+            raise ValueError(f"Unknown workload type: {workload_type}")
+        if listing_layout not in WorkloadConfig.LISTING_LAYOUTS:
+            raise ValueError(f"Unknown listing layout: {listing_layout}")
+        super().__init__(listing_name(listing_layout, listing_entries)
+                         if workload_type == WorkloadType.LISTING else workload_type,
+                         "native_s3")
+        # Нагрузка по спецификации выполняет расписание вместо встроенного метода
+        self._init_schedule(spec)
+        self._iteration_method = ("_scheduled_operation" if spec is not None
+                                  else self.WORKLOAD_METHODS[workload_type])
         self.bucket_name = bucket_name
         self.workload_type = workload_type
-        self.test_data = None
+        self.payload_profile = payload_profile
+        self.size_spread = size_spread
+        self.payload_size = 0
         self.test_keys = []
+        self.endpoint_url = endpoint_url
+        self.access_key = access_key or os.getenv('AWS_ACCESS_KEY_ID', 'minioadmin')
+        self.secret_key = secret_key or os.getenv('AWS_SECRET_ACCESS_KEY', 'minioadmin123')
+        
+        # Параметры multipart upload и parallel read
+        self.part_size = part_size
+        self.part_concurrency = part_concurrency
+        self.object_size = object_size
+        self.range_size = range_size
+        self.range_concurrency = range_concurrency
+        self.delete_concurrency = delete_concurrency
+        self.max_pool_connections = max_pool_connections or max(
+            DEFAULT_MAX_POOL_CONNECTIONS, part_concurrency, range_concurrency,
+            delete_concurrency)
+        self._uploader = None
+        self._downloader = None
+        self._download_buffer = None
+        # Все созданные пулы потоков (общий список), закрываются в cleanup
+        self._transfers = []
+        self._transfers_lock = threading.Lock()
+        # Фазы HTTP запросов (phases.py): у каждого клиента своя статистика
+        self.trace_phases = trace_phases
+        # Конфигурация клиента (clients.py); shared_client - один клиент и пул
+        # соединений на все потоки, как в приложении, иначе у потока свой
+        self.client_profile = client_profile
+        self.client_options = client_options or {}
+        self.shared_client = shared_client
+        self.client_config = client_config(client_profile, self.max_pool_connections,
+                                           **self.client_options)
+        # Листинг: число объектов и раскладка префикса
+        self.listing_entries = listing_entries
+        self.listing_layout = listing_layout
         
         # Инициализация S3 клиента
-        self.s3_client = boto3.client(
+        self.s3_client = self._create_client()
+
+    def _create_client(self):
+        """Создание boto3 клиента (с замером фаз запросов, если включен)"""
+        client = boto3.client(
             's3',
-            endpoint_url=endpoint_url,
-            aws_access_key_id=access_key or os.getenv('AWS_ACCESS_KEY_ID', 'minioadmin'),
-            aws_secret_access_key=secret_key or os.getenv('AWS_SECRET_ACCESS_KEY', 'minioadmin123')
+            endpoint_url=self.endpoint_url,
+            aws_access_key_id=self.access_key,
+            aws_secret_access_key=self.secret_key,
+            config=self.client_config
         )
+        self.phase_stats = instrument_client(client) if self.trace_phases else None
+        return client
+
+    def __getstate__(self):
+        # boto3 клиент и пулы потоков не сериализуются - каждый процесс создает свои
+        state = super().__getstate__()
+        state.pop('s3_client', None)
+        state['_uploader'] = None
+        state['_downloader'] = None
+        state['_download_buffer'] = None
+        state['_transfers'] = []
+        state.pop('_transfers_lock', None)
+        return self._schedule_state(state)
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._transfers_lock = threading.Lock()
+        self.s3_client = self._create_client()
+        self._restore_schedule_state()
+
+    def _payload(self, size: int = None) -> memoryview:
+        """Срез общего пула данных (без копирования)"""
+        size = spread_size(size or self.payload_size, self.size_spread)
+        return get_pool(self.payload_profile, size).slice(size)
+
+    def __copy__(self):
+        """
+        Копия для потока нагрузки (spawn_worker): свой или общий клиент,
+        список пулов передачи общий - cleanup() закрывает пулы всех потоков
+        """
+        worker = self.__class__.__new__(self.__class__)
+        worker.__dict__.update(self.__dict__)
+        if not self.shared_client:
+            worker.s3_client = worker._create_client()
+        return worker
+
+    def spawn_worker(self, worker_id: int) -> 'NativeS3Benchmark':
+        worker = super().spawn_worker(worker_id)
+        # У каждого потока нагрузки свои пулы передачи и буфер загрузки
+        worker._uploader = None
+        worker._downloader = None
+        worker._download_buffer = None
+        return worker
 
     def setup(self):
         """Подготовка данных и bucket"""
@@ -36,62 +173,125 @@ class NativeS3Benchmark(BenchmarkBase):
         except:
             self.s3_client.create_bucket(Bucket=self.bucket_name)
         
+        if self.spec is not None:
+            self._setup_schedule()
+            return
+        
         # Подготовка данных
+        # object_size задает размер объектов вместо значения по умолчанию нагрузки
         if self.workload_type in ["sequential_write", "sequential_read"]:
-            self.test_data = os.urandom(WorkloadConfig.SEQUENTIAL_FILE_SIZE)
+            self.payload_size = self.object_size or WorkloadConfig.SEQUENTIAL_FILE_SIZE
+            if self.workload_type == "sequential_read":
+                self._prepare_read_set()
         elif self.workload_type == "small_files":
-            self.test_data = os.urandom(WorkloadConfig.SMALL_FILE_SIZE)
+            self.payload_size = self.object_size or WorkloadConfig.SMALL_FILE_SIZE
         elif self.workload_type == "random_io":
             # Создаем большой объект для random read
-            big_data = os.urandom(10 * 1024 * 1024)  # 10 MB
             key = f"benchmark/random_io_file.dat"
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=key,
-                Body=big_data
+                Body=PayloadReader(self._payload(WorkloadConfig.RANDOM_FILE_SIZE))
             )
             self.test_keys = [key]
+        elif self.workload_type == "multipart_upload":
+            self.object_size = self.object_size or WorkloadConfig.LARGE_OBJECT_SIZE
+            self.payload_size = self.object_size
+        elif self.workload_type == "parallel_read":
+            self.object_size = self.object_size or WorkloadConfig.LARGE_OBJECT_SIZE
+            # Один большой объект, загружаем его multipart-ом
+            key = "benchmark/parallel_read_file.dat"
+            uploader = MultipartUploader(self.s3_client, self.bucket_name,
+                                         self.part_size, self.part_concurrency)
+            try:
+                uploader.upload(key, get_pool(self.payload_profile, self.object_size)
+                                .slice(self.object_size))
+            finally:
+                uploader.close()
+            self.test_keys = [key]
+        elif self.workload_type == "listing":
+            # Пустые объекты; столько потоков, сколько соединений в пуле клиента
+            populate(lambda path: self.s3_client.put_object(
+                         Bucket=self.bucket_name, Key=self._listing_prefix + path, Body=b""),
+                     self.listing_entries, self.listing_layout, self.max_pool_connections)
+        
+        # Пул создается заранее, чтобы генерация не попала в замер
+        if self.payload_size:
+            get_pool(self.payload_profile,
+                     int(self.payload_size * (1 + self.size_spread)))
 
     def run_iteration(self) -> float:
         """Выполнение итерации"""
-        
-        if self.workload_type == "sequential_write":
-            return self._sequential_write()
-        elif self.workload_type == "sequential_read":
-            return self._sequential_read()
-        elif self.workload_type == "random_io":
-            return self._random_io()
-        elif self.workload_type == "small_files":
-            return self._small_file_create()
-        elif self.workload_type == "metadata_ops":
-            return self._metadata_operation()
-        
-        return 0.0
+        return getattr(self, self._iteration_method)()
+
+    # Примитивы для нагрузок по спецификации (см. engine.ScheduledWorkload)
+
+    def _spec_key(self, key: int) -> str:
+        return f"benchmark/{self.spec.name}/obj_{key}.dat"
+
+    def _op_put(self, key: int, size: int) -> float:
+        data = self._payload(size)
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=self._spec_key(key),
+            Body=PayloadReader(data)
+        )
+        return len(data)
+
+    def _op_get(self, key: int, size: int) -> float:
+        # Чтение удаленного ключа - промах, а не ошибка
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name,
+                                                 Key=self._spec_key(key))
+        except ClientError as e:
+            if is_not_found(e):
+                return 0
+            raise
+        return len(response['Body'].read())
+
+    def _op_head(self, key: int, size: int) -> float:
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=self._spec_key(key))
+        except ClientError as e:
+            if not is_not_found(e):
+                raise
+        return 0
+
+    def _op_delete(self, key: int, size: int) -> float:
+        self.s3_client.delete_object(Bucket=self.bucket_name, Key=self._spec_key(key))
+        return 0
+
+    def _op_list(self, key: int, size: int) -> float:
+        """Листинг первой страницы префикса нагрузки (до 1000 ключей)"""
+        self.s3_client.list_objects_v2(Bucket=self.bucket_name,
+                                       Prefix=f"benchmark/{self.spec.name}/")
+        return 0
+
+    def _prepare_read_set(self):
+        """Загрузка набора объектов для чтения (общего для всех потоков)"""
+        for i in range(min(100, WorkloadConfig.SEQUENTIAL_FILES)):
+            key = f"benchmark/seq_{i}.dat"
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=PayloadReader(self._payload())
+            )
+            self.test_keys.append(key)
 
     def _sequential_write(self) -> float:
         """Последовательная запись объекта"""
-        key = f"benchmark/seq_{len(self.test_keys)}.dat"
+        key = "benchmark/" + self._next_name("seq")
+        data = self._payload()
         self.s3_client.put_object(
             Bucket=self.bucket_name,
             Key=key,
-            Body=self.test_data
+            Body=PayloadReader(data)
         )
         self.test_keys.append(key)
-        return len(self.test_data)
+        return len(data)
 
     def _sequential_read(self) -> float:
         """Последовательное чтение объекта"""
-        # Создаем объекты если их нет
-        if not self.test_keys:
-            for i in range(min(100, WorkloadConfig.SEQUENTIAL_FILES)):
-                key = f"benchmark/seq_{i}.dat"
-                self.s3_client.put_object(
-                    Bucket=self.bucket_name,
-                    Key=key,
-                    Body=self.test_data
-                )
-                self.test_keys.append(key)
-        
         # Читаем случайный объект
         key = random.choice(self.test_keys)
         response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
@@ -121,18 +321,19 @@ class NativeS3Benchmark(BenchmarkBase):
 
     def _small_file_create(self) -> float:
         """Создание маленького объекта"""
-        key = f"benchmark/small_{len(self.test_keys)}.dat"
+        key = "benchmark/" + self._next_name("small")
+        data = self._payload()
         self.s3_client.put_object(
             Bucket=self.bucket_name,
             Key=key,
-            Body=self.test_data
+            Body=PayloadReader(data)
         )
         self.test_keys.append(key)
-        return len(self.test_data)
+        return len(data)
 
     def _metadata_operation(self) -> float:
         """Операции с метаданными"""
-        key = f"benchmark/meta_{len(self.test_keys)}.dat"
+        key = "benchmark/" + self._next_name("meta")
         
         # Create (PUT)
         self.s3_client.put_object(
@@ -149,30 +350,73 @@ class NativeS3Benchmark(BenchmarkBase):
         
         return 4
 
-    def cleanup(self):
-        """Очистка созданных объектов"""
+    def _multipart_upload(self) -> float:
+        """Multipart-загрузка большого объекта с параллельной отправкой частей"""
+        if self._uploader is None:
+            self._uploader = MultipartUploader(self.s3_client, self.bucket_name,
+                                               self.part_size, self.part_concurrency)
+            with self._transfers_lock:
+                self._transfers.append(self._uploader)
+        
+        key = "benchmark/" + self._next_name("mpu")
+        uploaded = self._uploader.upload(key, self._payload())
+        self.test_keys.append(key)
+        return uploaded
+
+    def _parallel_read(self) -> float:
+        """Загрузка большого объекта параллельными Range GET запросами"""
+        if self._downloader is None:
+            self._downloader = RangedDownloader(self.s3_client, self.bucket_name,
+                                                self.range_size, self.range_concurrency)
+            with self._transfers_lock:
+                self._transfers.append(self._downloader)
+            # Буфер выделяется один раз на поток и переиспользуется
+            self._download_buffer = bytearray(self.object_size)
+        
+        return self._downloader.download(self.test_keys[0], self._download_buffer,
+                                         self.object_size)
+
+    @property
+    def _listing_prefix(self) -> str:
+        return f"benchmark/{self.name}/"
+
+    def _listing_walk(self) -> float:
+        """
+        Полный обход префикса постраничным ListObjectsV2 с разделителем '/':
+        подпрефиксы (CommonPrefixes) обходятся так же, как подкаталоги на ФС.
+        """
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        keys = 0
+        pending = [self._listing_prefix]
+        while pending:
+            for page in paginator.paginate(
+                    Bucket=self.bucket_name, Prefix=pending.pop(), Delimiter='/',
+                    PaginationConfig={'PageSize': WorkloadConfig.LISTING_PAGE_SIZE}):
+                keys += len(page.get('Contents', []))
+                pending.extend(p['Prefix'] for p in page.get('CommonPrefixes', []))
+        if keys < self.listing_entries:
+            raise RuntimeError(f"Listed {keys} of {self.listing_entries} keys")
+        return 0
+
+    def cleanup(self) -> int:
+        """Очистка созданных объектов; возвращает число удаленных"""
+        for transfer in self._transfers:
+            transfer.close()
+        self._transfers.clear()
+        self._uploader = None
+        self._downloader = None
+        self._download_buffer = None
+        
+        # Все тестовые объекты лежат под префиксом benchmark/ - обходим
+        # его постранично и удаляем пакетами по 1000 ключей
+        deleter = BulkDeleter(self.s3_client, self.bucket_name, self.delete_concurrency)
         try:
-            # Удаляем все тестовые объекты
-            for key in self.test_keys:
-                try:
-                    self.s3_client.delete_object(Bucket=self.bucket_name, Key=key)
-                except:
-                    pass
-            
-            # Очищаем префикс benchmark/
-            try:
-                response = self.s3_client.list_objects_v2(
-                    Bucket=self.bucket_name,
-                    Prefix='benchmark/'
-                )
-                
-                if 'Contents' in response:
-                    for obj in response['Contents']:
-                        self.s3_client.delete_object(
-                            Bucket=self.bucket_name,
-                            Key=obj['Key']
-                        )
-            except Exception as e:
-                print(f"  Cleanup warning: {e}")
+            deleter.delete_prefix('benchmark/')
+            self.test_keys = []
         except Exception as e:
             print(f"  Cleanup error: {e}")
+        if deleter.failed:
+            print(f"  Cleanup warning: {deleter.failed} objects were not deleted "
+                  f"({deleter.last_error})")
+        # Удаленное до ошибки листинга тоже считается
+        return deleter.deleted
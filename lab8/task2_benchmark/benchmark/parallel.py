@@ -0,0 +1,258 @@
+"""Многопроцессный запуск бенчмарков (обход GIL и CPU-лимита клиента)"""
+
+import os
+import queue
+import threading
+import time
+import multiprocessing as mp
+from .arrival import ArrivalSchedule
+from .base import BenchmarkBase, BenchmarkResult
+from .histogram import LatencyHistogram
+from .live import REGISTRY, LiveCell, LivePublisher, LiveSeries, progress_reporter
+from .steady import trim_transient
+from .timeseries import TimeSeriesSampler
+
+# Сколько ждать, пока все процессы дойдут до общего старта (плюс прогрев)
+START_TIMEOUT_SEC = 300
+# Сколько ждать сообщений об ошибках процессов, сорвавших старт
+FAILURE_WAIT_SEC = 10
+
+
+def _process_main(benchmark: BenchmarkBase, process_index: int, iterations: int,
+                  concurrency: int, schedule: ArrivalSchedule, window_sec: float,
+                  barrier, results, duration: float = None, warmup: int = 0,
+                  warmup_sec: float = None, keep_histograms: bool = False,
+                  live_values=None, processes: int = 1):
+    """Точка входа рабочего процесса"""
+    worker = sampler = publisher = None
+
+    def start():
+        # Прогрев у каждого процесса свой, общий старт - после прогрева всех
+        barrier.wait(START_TIMEOUT_SEC + (warmup_sec or 0))
+        if worker.phase_stats:
+            worker.phase_stats.start()
+        if sampler:
+            sampler.start(background=False)
+        if publisher:
+            publisher.start()
+
+    try:
+        # Бенчмарк пришел через pickle - у процесса свой boto3 клиент
+        worker = benchmark.spawn_worker(process_index)
+        worker.partition(process_index, processes)
+        # Окна временного ряда копятся в процессе и отправляются родителю в конце
+        sampler = (TimeSeriesSampler(window_sec=window_sec, keep_histograms=keep_histograms)
+                   if window_sec else None)
+        # Живые метрики потоков процесса публикуются в ячейку родителя
+        live = LiveSeries(benchmark.storage_type, benchmark.name)
+        publisher = (LivePublisher(live, LiveCell(live_values))
+                     if live_values is not None else None)
+
+        if concurrency > 1:
+            total_bytes, _ = worker._run_concurrent(iterations, concurrency, schedule,
+                                                    sampler, duration, warmup,
+                                                    warmup_sec, on_ready=start, live=live)
+        else:
+            warmup_start = time.perf_counter()
+            warmed = worker._warmup(warmup, warmup_sec)
+            worker.warmup_stats = (warmed, time.perf_counter() - warmup_start)
+            start()
+            worker.recorder = sampler.recorder() if sampler else None
+            worker.live = live.cell()
+            total_bytes = worker._run_loop(iterations, schedule=schedule,
+                                           duration=duration)
+        if publisher:
+            publisher.stop()
+        if worker.phase_stats:
+            worker.phase_stats.stop()
+        windows = sampler.drain() if sampler else {}
+        results.put((process_index, worker.histogram, total_bytes, worker.errors,
+                     windows, worker.warmup_stats, worker.phase_stats, None))
+    except Exception as e:
+        # Остальные не ждут у барьера до таймаута (после старта - ни на что не влияет)
+        barrier.abort()
+        results.put((process_index, None, 0, 0, {}, (0, 0.0), None,
+                     f"{type(e).__name__}: {e}"))
+
+
+def _wait_start(barrier, workers: list, timeout: float):
+    """
+    Общий старт в родителе. Процесс, завершившийся до старта без
+    barrier.abort() (например, убитый), ломает барьер сразу, а не по таймауту.
+    """
+    started = threading.Event()
+
+    def watch():
+        while not started.wait(1):
+            if any(proc.exitcode is not None for proc in workers):
+                barrier.abort()
+                return
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    try:
+        barrier.wait(timeout)
+    finally:
+        started.set()
+        watcher.join()
+
+
+def _start_failures(results, workers: list) -> str:
+    """Причина сорванного старта: ошибки из очереди результатов или коды выхода"""
+    failures, reported = [], set()
+    deadline = time.monotonic() + FAILURE_WAIT_SEC
+    while time.monotonic() < deadline:
+        try:
+            index, *_, failure = results.get(timeout=0.2)
+        except queue.Empty:
+            if not any(proc.is_alive() for proc in workers):
+                break
+            continue
+        reported.add(index)
+        if failure:
+            failures.append(f"process {index}: {failure}")
+    failures += [f"process {i}: exit code {proc.exitcode}" for i, proc in enumerate(workers)
+                 if i not in reported and proc.exitcode not in (None, 0)]
+    # Процессы, которые только ждали у барьера, - следствие, а не причина
+    causes = [f for f in failures if 'BrokenBarrierError' not in f] or failures
+    return "; ".join(causes) or "start barrier is broken"
+
+
+def run_multiprocess(benchmark: BenchmarkBase, iterations: int = 100,
+                     processes: int = None, concurrency: int = 1,
+                     rate: float = None,
+                     arrival: str = ArrivalSchedule.FIXED,
+                     sampler: TimeSeriesSampler = None,
+                     duration: float = None, warmup: int = 0,
+                     warmup_sec: float = None,
+                     steady_state: bool = False) -> BenchmarkResult:
+    """
+    Запуск бенчмарка в processes процессах (по умолчанию - по числу ядер).
+
+    setup() и cleanup() выполняются один раз в родительском процессе,
+    итерации делятся между процессами, внутри процесса - между
+    concurrency потоками. Все процессы стартуют по общему барьеру.
+    rate/arrival - open-loop режим, duration - остановка по времени,
+    warmup/warmup_sec/steady_state - как в BenchmarkBase.run() (прогрев
+    в каждом процессе до общего старта).
+    Окна sampler собираются из процессов и записываются после прогона,
+    живые метрики процессы публикуют в REGISTRY родителя через общую память.
+    """
+    processes = processes or os.cpu_count() or 1
+    print(f"[{benchmark.storage_type}] Запуск {benchmark.name} "
+          f"({processes} processes x {concurrency} threads)...")
+
+    benchmark.setup()
+    benchmark.histogram = LatencyHistogram()
+    benchmark.errors = 0
+    if benchmark.phase_stats:
+        # Статистику фаз собирают процессы, у родителя только сумма
+        benchmark.phase_stats.stop()
+        benchmark.phase_stats.reset()
+
+    # spawn: дочерние процессы не наследуют сокеты и пулы соединений родителя
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(processes + 1)
+    results = ctx.Queue()
+    schedule = ArrivalSchedule(rate, arrival) if rate else None
+    shares = [iterations // processes + (1 if i < iterations % processes else 0)
+              for i in range(processes)]
+    warmup_shares = [warmup // processes + (1 if i < warmup % processes else 0)
+                     for i in range(processes)]
+    live = REGISTRY.series(benchmark.storage_type, benchmark.name)
+    live_values = [ctx.RawArray('d', LiveCell.SIZE) for _ in range(processes)]
+    for values in live_values:
+        live.cell(values)
+    progress = progress_reporter(live, iterations, duration)
+
+    workers = [
+        ctx.Process(target=_process_main,
+                    args=(benchmark, i, shares[i], concurrency,
+                          schedule.split(processes, i) if schedule else None,
+                          sampler.window_sec if sampler else None,
+                          barrier, results, duration, warmup_shares[i], warmup_sec,
+                          sampler.keep_histograms if sampler else False,
+                          live_values[i], processes),
+                    daemon=True)
+        for i in range(processes)
+    ]
+    for proc in workers:
+        proc.start()
+    # Ресурсы снимает родитель: свой процесс и все рабочие
+    resources = benchmark.resource_sampler([os.getpid()] + [proc.pid for proc in workers])
+
+    total_bytes = 0.0
+    warmed, warmup_time = 0, 0.0
+    live.start()
+    try:
+        try:
+            _wait_start(barrier, workers, START_TIMEOUT_SEC + (warmup_sec or 0))
+        except threading.BrokenBarrierError:
+            raise RuntimeError(f"Processes failed before start: "
+                               f"{_start_failures(results, workers)}") from None
+        if resources:
+            resources.start()
+        if progress:
+            progress.start()
+        start_time = time.perf_counter()
+        if sampler:
+            sampler.start(start_time, background=False)
+
+        pending = processes
+        while pending:
+            alive = any(proc.is_alive() for proc in workers)
+            try:
+                (index, histogram, bytes_processed, errors,
+                 windows, warmup_stats, phase_stats, failure) = results.get(timeout=1)
+            except queue.Empty:
+                if not alive:
+                    # Процессы завершились, не прислав результат
+                    benchmark.errors += pending
+                    break
+                continue
+
+            pending -= 1
+            if failure:
+                print(f"  Error in process {index}: {failure}")
+                benchmark.errors += 1
+            if histogram is not None:
+                benchmark.histogram.merge(histogram)
+            if sampler:
+                sampler.add_windows(windows)
+            total_bytes += bytes_processed
+            benchmark.errors += errors
+            warmed += warmup_stats[0]
+            if phase_stats is not None and benchmark.phase_stats is not None:
+                benchmark.phase_stats.merge(phase_stats)
+            warmup_time = max(warmup_time, warmup_stats[1])
+
+        total_time = time.perf_counter() - start_time
+        if sampler:
+            sampler.stop()
+    finally:
+        if progress:
+            progress.stop()
+        live.stop()
+        if resources:
+            resources.stop()
+        for proc in workers:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        benchmark.timed_cleanup()
+    benchmark.warmup_stats = (warmed, warmup_time)
+
+    if duration is not None:
+        iterations = benchmark.histogram.total_count + benchmark.errors
+    result = benchmark._calculate_results(total_bytes, total_time, iterations,
+                                          concurrency, processes)
+    if schedule:
+        result.target_rate = schedule.rate
+        result.arrival = schedule.arrival
+    if resources:
+        result.resources = resources.summary(result.throughput_mbps)
+    if sampler:
+        result.throughput_windows = sampler.throughput_windows()
+        if steady_state:
+            result = trim_transient(result, sampler)
+    return result
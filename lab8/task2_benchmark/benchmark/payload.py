@@ -0,0 +1,149 @@
+"""Общий пул тестовых данных с выбираемым профилем энтропии"""
+
+import io
+import mmap
+import os
+import random
+import threading
+import numpy as np
+
+# Профили данных
+RANDOM = "random"  # несжимаемые случайные байты
+TEXT = "text"      # похоже на текст: сжимается примерно вдвое
+ZERO = "zero"      # нули: идеально сжимается и дедуплицируется
+PROFILES = (RANDOM, TEXT, ZERO)
+
+# Минимальный размер пула и запас сверх самого большого запроса,
+# чтобы даже крупные срезы брались с разных смещений
+POOL_SIZE = 64 * 1024 * 1024
+POOL_SLACK = 16 * 1024 * 1024
+
+# Частоты символов английского текста (на 1000 символов), пробел и перевод строки
+_TEXT_FREQUENCIES = {
+    ' ': 180, 'e': 102, 't': 75, 'a': 65, 'o': 62, 'i': 57, 'n': 57, 's': 53,
+    'h': 50, 'r': 49, 'd': 35, 'l': 33, 'u': 23, 'c': 22, 'm': 20, 'w': 19,
+    'f': 18, 'g': 16, 'y': 16, 'p': 15, 'b': 12, '\n': 10, ',': 9, '.': 8,
+    'v': 8, 'k': 6, 'j': 1, 'x': 1, 'q': 1, 'z': 1,
+}
+
+
+def _text_table() -> np.ndarray:
+    """Таблица 256 байт: случайный байт -> символ с частотой как в тексте"""
+    total = sum(_TEXT_FREQUENCIES.values())
+    table = []
+    for char, freq in _TEXT_FREQUENCIES.items():
+        table.extend([ord(char)] * max(1, round(freq * 256 / total)))
+    table = (table * 2)[:256]
+    return np.array(table, dtype=np.uint8)
+
+
+def generate(size: int, profile: str = RANDOM) -> bytes:
+    """Сгенерировать size байт данных профиля profile"""
+    if profile == RANDOM:
+        return os.urandom(size)
+    if profile == ZERO:
+        return bytes(size)
+    if profile == TEXT:
+        indices = np.frombuffer(os.urandom(size), dtype=np.uint8)
+        return _text_table()[indices].tobytes()
+    raise ValueError(f"Unknown payload profile: {profile}")
+
+
+class PayloadPool:
+    """
+    Большой буфер, сгенерированный один раз. Итерации получают из него
+    memoryview-срезы со случайным смещением - без копирования и выделения
+    памяти на каждую запись. Буфер выровнен по странице (анонимный mmap),
+    поэтому выровненные срезы годятся для O_DIRECT.
+    """
+
+    def __init__(self, size: int = POOL_SIZE, profile: str = RANDOM):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown payload profile: {profile}")
+        self.size = size
+        self.profile = profile
+        self._buffer = mmap.mmap(-1, size)
+        if profile != ZERO:  # анонимный mmap уже заполнен нулями
+            self._buffer.write(generate(size, profile))
+        self._view = memoryview(self._buffer)
+
+    def slice(self, size: int, offset: int = None, align: int = 1) -> memoryview:
+        """Срез size байт со случайного (или заданного) смещения, кратного align"""
+        if size > self.size:
+            raise ValueError(f"Payload of {size} bytes does not fit the pool ({self.size} bytes)")
+        if offset is None:
+            offset = random.randrange(0, self.size - size + 1, align)
+        return self._view[offset:offset + size]
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(profile: str = RANDOM, min_size: int = 0) -> PayloadPool:
+    """
+    Общий для процесса пул профиля profile размером не меньше min_size.
+    Пул создается при первом обращении и пересоздается, только если нужен больший.
+    """
+    pool = _pools.get(profile)
+    if pool is None or pool.size < min_size:
+        with _pools_lock:
+            pool = _pools.get(profile)
+            if pool is None or pool.size < min_size:
+                pool = PayloadPool(max(POOL_SIZE, min_size + POOL_SLACK), profile)
+                _pools[profile] = pool
+    return pool
+
+
+def spread_size(size: int, spread: float = 0.0) -> int:
+    """Случайный размер в диапазоне size * (1 ± spread)"""
+    if spread <= 0:
+        return size
+    low = max(1, int(size * (1 - spread)))
+    return random.randint(low, int(size * (1 + spread)))
+
+
+class PayloadReader(io.RawIOBase):
+    """
+    Файлоподобная обертка над memoryview для boto3: Body не принимает
+    memoryview напрямую, а bytes(view) скопировал бы весь объект.
+    Данные отдаются блоками по мере отправки, seek нужен botocore для
+    подсчета контрольной суммы и повторов.
+    """
+
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view
+        self._position = 0
+
+    def __len__(self):
+        return len(self._view)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = min(len(buffer), len(self._view) - self._position)
+        if count <= 0:
+            return 0
+        buffer[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        self._position = max(0, position)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
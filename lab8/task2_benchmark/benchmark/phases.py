@@ -0,0 +1,275 @@
+"""Фазы HTTP запросов boto3: подпись, соединение, отправка, ожидание ответа, передача"""
+
+import threading
+import time
+from typing import Dict, Optional
+from botocore.awsrequest import (
+    AWSHTTPConnection, AWSHTTPConnectionPool,
+    AWSHTTPSConnection, AWSHTTPSConnectionPool
+)
+from botocore.response import StreamingBody
+from .histogram import LatencyHistogram
+
+# Фазы одного API вызова:
+#   serialize - проверка и сериализация параметров
+#   sign      - подпись запроса (SigV4) и подготовка HTTP запроса
+#   connect   - установка TCP/TLS соединения (только новые соединения)
+#   send      - отправка запроса с телом
+#   ttfb      - ожидание заголовков ответа (время сервера)
+#   response  - чтение тела (кроме потокового) и разбор ответа
+#   transfer  - чтение потокового тела (GetObject)
+PHASES = ('serialize', 'sign', 'connect', 'send', 'ttfb', 'response', 'transfer')
+
+# Текущий API вызов потока: botocore выполняет запрос целиком в вызывающем потоке
+_local = threading.local()
+
+# Предупреждение о недоступной замене пула выводится один раз на процесс
+_pool_swap_warned = False
+
+
+class PhaseStats:
+    """
+    Гистограммы фаз, повторы и переиспользование соединений одного клиента.
+    Записывается из всех потоков клиента, поэтому под блокировкой.
+    Пока не вызван start(), ничего не записывается (setup, прогрев, cleanup).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.histograms = {phase: LatencyHistogram() for phase in PHASES}
+        self.requests = 0
+        self.retries = 0
+        self.connections_new = 0
+        self.connections_reused = 0
+
+    def start(self):
+        """Начало замера: сбросить накопленное и включить запись"""
+        with self._lock:
+            self.reset()
+            self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def record(self, phase: str, duration_ms: float):
+        if self.enabled:
+            with self._lock:
+                self.histograms[phase].record(max(duration_ms, 0.0))
+
+    def count(self, requests: int = 0, retries: int = 0, new: int = 0, reused: int = 0):
+        if self.enabled:
+            with self._lock:
+                self.requests += requests
+                self.retries += retries
+                self.connections_new += new
+                self.connections_reused += reused
+
+    def merge(self, other: 'PhaseStats'):
+        """Добавить статистику другого клиента (другого процесса)"""
+        with self._lock:
+            for phase, histogram in other.histograms.items():
+                self.histograms[phase].merge(histogram)
+            self.requests += other.requests
+            self.retries += other.retries
+            self.connections_new += other.connections_new
+            self.connections_reused += other.connections_reused
+        return self
+
+    def to_dict(self) -> Dict:
+        """Представление для BenchmarkResult.http_phases"""
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'connections_new': self.connections_new,
+            'connections_reused': self.connections_reused,
+            'phases': {phase: histogram.to_dict()
+                       for phase, histogram in self.histograms.items()
+                       if histogram.total_count},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> 'PhaseStats':
+        """Восстановление из to_dict() (для объединения повторов)"""
+        stats = cls()
+        if data:
+            for phase, histogram in data.get('phases', {}).items():
+                stats.histograms[phase] = LatencyHistogram.from_dict(histogram)
+            stats.requests = data.get('requests', 0)
+            stats.retries = data.get('retries', 0)
+            stats.connections_new = data.get('connections_new', 0)
+            stats.connections_reused = data.get('connections_reused', 0)
+        return stats
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_lock', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class _Call:
+    """Отметки времени текущего API вызова потока"""
+
+    def __init__(self, stats: PhaseStats):
+        self.stats = stats
+        self.started = time.perf_counter()
+        self.sign_started = None
+        self.send_started = None
+        self.headers_at = None
+        self.attempts = 0
+        self.connect_ms = 0.0
+
+
+class _TimedConnectionMixin:
+    """Замер установки соединения и ожидания ответа на уровне HTTP соединения"""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            call = getattr(_local, 'call', None)
+            if call is not None:
+                call.connect_ms += (time.perf_counter() - start) * 1000
+
+    def getresponse(self, *args, **kwargs):
+        call = getattr(_local, 'call', None)
+        sent_at = time.perf_counter()
+        if call is not None and call.send_started is not None:
+            stats = call.stats
+            if call.connect_ms:
+                stats.record('connect', call.connect_ms)
+            stats.record('send', (sent_at - call.send_started) * 1000 - call.connect_ms)
+            stats.count(new=1 if call.connect_ms else 0, reused=0 if call.connect_ms else 1)
+        response = super().getresponse(*args, **kwargs)
+        if call is not None:
+            call.headers_at = time.perf_counter()
+            call.stats.record('ttfb', (call.headers_at - sent_at) * 1000)
+        return response
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, AWSHTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, AWSHTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(AWSHTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(AWSHTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+def _timed_body(body: StreamingBody, stats: PhaseStats, length: Optional[int]):
+    """
+    Замер чтения потокового тела: время всех read/readinto до конца тела
+    записывается одной фазой transfer.
+    """
+    spent = [0.0, False]
+
+    def finish(done: bool):
+        if done and not spent[1]:
+            spent[1] = True
+            stats.record('transfer', spent[0] * 1000)
+
+    def wrap(method, empty):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            spent[0] += time.perf_counter() - start
+            finish(result == empty or not args or args[0] is None
+                   or (length is not None and body.tell() >= length))
+            return result
+        return timed
+
+    body.read = wrap(body.read, b'')
+    body.readinto = wrap(body.readinto, 0)
+
+
+def instrument_client(client) -> PhaseStats:
+    """
+    Подключить замер фаз к boto3 клиенту: обработчики событий botocore
+    (сериализация, подпись, отправка, ответ) и классы HTTP соединений
+    пула клиента (установка соединения, ожидание ответа).
+    Возвращает статистику, в которую пишут все потоки клиента.
+    """
+    stats = PhaseStats()
+    events = client.meta.events
+
+    def before_parameter_build(**kwargs):
+        _local.call = _Call(stats)
+
+    def before_call(**kwargs):
+        call = getattr(_local, 'call', None)
+        if call is not None:
+            stats.record('serialize', (time.perf_counter() - call.started) * 1000)
+
+    def before_sign(**kwargs):
+        call = getattr(_local, 'call', None)
+        if call is not None:
+            call.sign_started = time.perf_counter()
+
+    def before_send(**kwargs):
+        # Вызывается перед каждой попыткой; возвращать ничего нельзя -
+        # ответ обработчика заменяет HTTP запрос
+        call = getattr(_local, 'call', None)
+        if call is not None:
+            call.send_started = time.perf_counter()
+            if call.sign_started is not None:
+                stats.record('sign', (call.send_started - call.sign_started) * 1000)
+            call.attempts += 1
+            call.connect_ms = 0.0
+
+    def after_call(parsed=None, **kwargs):
+        call = getattr(_local, 'call', None)
+        _local.call = None
+        if call is None:
+            return
+        if call.headers_at is not None:
+            stats.record('response', (time.perf_counter() - call.headers_at) * 1000)
+        stats.count(requests=1, retries=max(call.attempts - 1, 0))
+        body = parsed.get('Body') if isinstance(parsed, dict) else None
+        if isinstance(body, StreamingBody) and stats.enabled:
+            _timed_body(body, stats, parsed.get('ContentLength'))
+
+    def after_call_error(**kwargs):
+        call = getattr(_local, 'call', None)
+        _local.call = None
+        if call is not None:
+            stats.count(requests=1, retries=max(call.attempts - 1, 0))
+
+    events.register('before-parameter-build.s3', before_parameter_build)
+    events.register('before-call.s3', before_call)
+    events.register('before-sign.s3', before_sign)
+    events.register('before-send.s3', before_send)
+    events.register('after-call.s3', after_call)
+    events.register('after-call-error.s3', after_call_error)
+
+    # Пул соединений создается лениво, поэтому замена классов действует
+    # на все соединения клиента (http_session - внутренний объект botocore).
+    # Если в другой версии botocore этих атрибутов нет, остаются фазы из
+    # обработчиков событий (serialize, sign, transfer, повторы);
+    # connect/send/ttfb/response и счетчики соединений пусты
+    pool_classes = {'http': _TimedHTTPConnectionPool, 'https': _TimedHTTPSConnectionPool}
+    try:
+        session = client._endpoint.http_session
+        session._manager.pool_classes_by_scheme = pool_classes
+        session._pool_classes_by_scheme = pool_classes
+    except AttributeError as e:
+        global _pool_swap_warned
+        if not _pool_swap_warned:
+            _pool_swap_warned = True
+            print(f"⚠️  Connection phases are not traced with this botocore ({e}); "
+                  f"connect/send/ttfb/response and connection reuse are not reported")
+    return stats
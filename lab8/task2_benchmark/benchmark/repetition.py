@@ -0,0 +1,174 @@
+"""Повторение прогона до нужной точности: доверительные интервалы и выбросы"""
+
+import math
+from dataclasses import replace
+from typing import Callable, List, Optional
+import numpy as np
+from .base import BenchmarkResult
+from .histogram import LatencyHistogram
+from .phases import PhaseStats
+from .resources import merge_resources
+
+# Значения по умолчанию: от 3 до 10 повторов, полуширина интервала <= 5% среднего
+DEFAULT_MIN_REPEATS = 3
+DEFAULT_MAX_REPEATS = 10
+DEFAULT_TARGET_CI = 0.05
+
+# Порог модифицированного z-score для выбросов (Iglewicz & Hoaglin);
+# на меньшем числе прогонов MAD слишком шумная
+OUTLIER_Z = 3.5
+OUTLIER_MIN_RUNS = 5
+
+# Квантили t-распределения t(0.975, df) для 95% интервала
+_T_975 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+          8: 2.306, 9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 30: 2.042}
+
+
+def t_critical(df: int) -> float:
+    """Квантиль t(0.975) для df степеней свободы (ближайший меньший табличный)"""
+    if df < 1:
+        return math.inf
+    if df > 30:
+        return 1.960
+    return _T_975[max(k for k in _T_975 if k <= df)]
+
+
+def confidence_interval(values: List[float]) -> float:
+    """Полуширина 95% интервала для среднего (t-распределение)"""
+    if len(values) < 2:
+        return math.inf
+    return t_critical(len(values) - 1) * float(np.std(values, ddof=1)) / math.sqrt(len(values))
+
+
+def outlier_mask(values: List[float]) -> np.ndarray:
+    """
+    Выбросы по модифицированному z-score: 0.6745 * |x - медиана| / MAD.
+    Устойчив к самим выбросам, в отличие от среднего и стандартного отклонения.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) < OUTLIER_MIN_RUNS:
+        return np.zeros(len(values), dtype=bool)
+    median = np.median(values)
+    mad = np.median(np.abs(values - median))
+    if mad == 0:
+        return np.zeros(len(values), dtype=bool)
+    return 0.6745 * np.abs(values - median) / mad > OUTLIER_Z
+
+
+def aggregate_runs(runs: List[BenchmarkResult]) -> BenchmarkResult:
+    """
+    Сводный результат повторов: средние по прогонам без выбросов
+    (по throughput или p99), полуширины 95% интервалов, объединенная
+    гистограмма задержек и окна всех прогонов.
+    """
+    outliers = (outlier_mask([r.throughput_mbps for r in runs])
+                | outlier_mask([r.latency_p99_ms for r in runs]))
+    kept = [r for r, bad in zip(runs, outliers) if not bad] or runs
+
+    def mean(attr):
+        return float(np.mean([getattr(r, attr) for r in kept]))
+
+    histogram = LatencyHistogram()
+    phases = PhaseStats()
+    windows = []
+    for r in kept:
+        histogram.merge(LatencyHistogram.from_dict(r.latency_histogram))
+        phases.merge(PhaseStats.from_dict(r.http_phases))
+        windows.extend(r.throughput_windows or [])
+
+    throughputs = [r.throughput_mbps for r in kept]
+    p99s = [r.latency_p99_ms for r in kept]
+    return replace(
+        kept[0],
+        throughput_mbps=mean('throughput_mbps'),
+        iops=mean('iops'),
+        latency_avg_ms=mean('latency_avg_ms'),
+        latency_p50_ms=mean('latency_p50_ms'),
+        latency_p90_ms=mean('latency_p90_ms'),
+        latency_p95_ms=mean('latency_p95_ms'),
+        latency_p99_ms=mean('latency_p99_ms'),
+        latency_p999_ms=mean('latency_p999_ms'),
+        latency_max_ms=max(r.latency_max_ms for r in kept),
+        errors=sum(r.errors for r in runs),
+        total_time_sec=sum(r.total_time_sec for r in kept),
+        iterations=sum(r.iterations for r in kept),
+        cleanup_objects=sum(r.cleanup_objects for r in kept),
+        cleanup_time_sec=sum(r.cleanup_time_sec for r in kept),
+        cleanup_objects_per_sec=mean('cleanup_objects_per_sec'),
+        warmup_iterations=sum(r.warmup_iterations for r in kept),
+        warmup_sec=sum(r.warmup_sec for r in kept),
+        transient_iterations=sum(r.transient_iterations for r in kept),
+        transient_sec=sum(r.transient_sec for r in kept),
+        repeats=len(runs),
+        outlier_runs=int(outliers.sum()),
+        throughput_ci_mbps=confidence_interval(throughputs) if len(kept) > 1 else 0.0,
+        latency_p99_ci_ms=confidence_interval(p99s) if len(kept) > 1 else 0.0,
+        run_throughputs=[r.throughput_mbps for r in runs],
+        run_latency_p99s=[r.latency_p99_ms for r in runs],
+        run_outliers=outliers.tolist(),
+        latency_histogram=histogram.to_dict(),
+        http_phases=phases.to_dict() if kept[0].http_phases else None,
+        resources=merge_resources([r.resources for r in kept], mean('throughput_mbps')),
+        throughput_windows=windows or None,
+    )
+
+
+def _relative(ci: float, value: float) -> float:
+    return ci / value if value else (0.0 if ci == 0 else math.inf)
+
+
+def run_repeated(run_once: Callable[[int], Optional[BenchmarkResult]],
+                 min_repeats: int = DEFAULT_MIN_REPEATS,
+                 max_repeats: int = DEFAULT_MAX_REPEATS,
+                 target_ci: float = DEFAULT_TARGET_CI) -> Optional[BenchmarkResult]:
+    """
+    Повторять run_once(номер повтора) до тех пор, пока полуширина 95%
+    интервала для среднего throughput и среднего p99 (без выбросов) не
+    станет не больше target_ci от среднего, но не больше max_repeats раз.
+    """
+    runs = []
+    for repeat in range(max_repeats):
+        result = run_once(repeat)
+        if result is None:
+            break
+        runs.append(result)
+        if len(runs) < max(2, min_repeats):
+            continue
+
+        summary = aggregate_runs(runs)
+        throughput_ci = _relative(summary.throughput_ci_mbps, summary.throughput_mbps)
+        p99_ci = _relative(summary.latency_p99_ci_ms, summary.latency_p99_ms)
+        print(f"  Repeat {len(runs)}: throughput ±{throughput_ci:.1%}, p99 ±{p99_ci:.1%}"
+              f"{f', {summary.outlier_runs} outlier(s)' if summary.outlier_runs else ''}")
+        if throughput_ci <= target_ci and p99_ci <= target_ci:
+            break
+    else:
+        if runs:
+            print(f"  ⚠️  Target ±{target_ci:.0%} not reached in {max_repeats} repeats")
+
+    return aggregate_runs(runs) if runs else None
+
+
+def _kept_throughputs(result: BenchmarkResult) -> List[float]:
+    """Throughput повторов без выбросов"""
+    outliers = result.run_outliers or [False] * len(result.run_throughputs or [])
+    return [v for v, bad in zip(result.run_throughputs or [], outliers) if not bad]
+
+
+def significantly_better(best: BenchmarkResult, other: BenchmarkResult) -> Optional[bool]:
+    """
+    Значимо ли best быстрее other по throughput (Welch t-test, 95%).
+    None - нет повторов, значимость не проверить.
+    """
+    a = _kept_throughputs(best)
+    b = _kept_throughputs(other)
+    if len(a) < 2 or len(b) < 2:
+        return None
+    var_a = np.var(a, ddof=1) / len(a)
+    var_b = np.var(b, ddof=1) / len(b)
+    if var_a + var_b == 0:
+        return bool(np.mean(a) > np.mean(b))
+    # Степени свободы Уэлча-Саттертуэйта
+    df = (var_a + var_b) ** 2 / (var_a ** 2 / (len(a) - 1) + var_b ** 2 / (len(b) - 1))
+    t = (np.mean(a) - np.mean(b)) / math.sqrt(var_a + var_b)
+    return bool(t > t_critical(int(df)))
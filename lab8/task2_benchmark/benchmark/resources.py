@@ -0,0 +1,238 @@
+"""Ресурсы клиента и хоста во время прогона: CPU, RSS, сеть, диск, FUSE демоны (/proc)"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Период опроса /proc: одно чтение - доли миллисекунды
+DEFAULT_INTERVAL_SEC = 0.5
+# Процессы FUSE клиентов S3, которые ищем по точке монтирования
+DAEMON_NAMES = ('s3fs', 'goofys')
+# Загрузка клиента от этой доли ядра (одного процесса) или всех ядер - упор в CPU
+CPU_BOUND_FRACTION = 0.9
+
+MB = 1024 * 1024
+_PROC = Path('/proc')
+_SECTOR_BYTES = 512
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text()
+    except OSError:
+        return ''
+
+
+def _cpu_ticks(pid: int) -> Optional[int]:
+    """utime + stime в тиках из /proc/<pid>/stat; None - процесса нет"""
+    stat = _read(_PROC / str(pid) / 'stat')
+    if not stat:
+        return None
+    # Имя процесса в скобках может содержать пробелы - поля считаем после ')'
+    fields = stat.rsplit(')', 1)[1].split()
+    return int(fields[11]) + int(fields[12])
+
+
+def _rss_bytes(pid: int) -> int:
+    statm = _read(_PROC / str(pid) / 'statm').split()
+    return int(statm[1]) * os.sysconf('SC_PAGE_SIZE') if len(statm) > 1 else 0
+
+
+def _net_bytes():
+    """(принято, отправлено) байт по всем интерфейсам, кроме loopback"""
+    rx = tx = 0
+    for line in _read(_PROC / 'net' / 'dev').splitlines()[2:]:
+        name, _, counters = line.partition(':')
+        counters = counters.split()
+        if name.strip() != 'lo' and len(counters) >= 9:
+            rx += int(counters[0])
+            tx += int(counters[8])
+    return rx, tx
+
+
+def _disk_bytes():
+    """(прочитано, записано) байт по физическим дискам (без разделов, loop, ram)"""
+    read = written = 0
+    for line in _read(_PROC / 'diskstats').splitlines():
+        fields = line.split()
+        if len(fields) < 10:
+            continue
+        name = fields[2]
+        if name.startswith(('loop', 'ram')) or not (Path('/sys/block') / name).exists():
+            continue
+        read += int(fields[5]) * _SECTOR_BYTES
+        written += int(fields[9]) * _SECTOR_BYTES
+    return read, written
+
+
+def _all_pids() -> List[int]:
+    return [int(entry.name) for entry in _PROC.iterdir() if entry.name.isdigit()]
+
+
+def find_daemons(mount_point) -> List[int]:
+    """PID процессов s3fs/goofys, в командной строке которых есть точка монтирования"""
+    if not mount_point or not _PROC.exists():
+        return []
+    paths = {str(mount_point).rstrip('/'), os.path.realpath(mount_point)}
+    pids = []
+    for pid in _all_pids():
+        argv = _read(_PROC / str(pid) / 'cmdline').split('\0')
+        if (argv and os.path.basename(argv[0]) in DAEMON_NAMES
+                and any(arg.rstrip('/') in paths for arg in argv[1:])):
+            pids.append(pid)
+    return pids
+
+
+class ResourceSampler:
+    """
+    Фоновый опрос /proc во время замера: CPU и RSS клиента (pids - процесс
+    бенчмарка и рабочие процессы --processes; встроенный S3 сервер и
+    прочие дочерние процессы не входят), сеть и диск хоста, CPU и RSS
+    FUSE демона точки монтирования. Вне Linux ничего не записывает.
+    """
+
+    def __init__(self, interval_sec: float = DEFAULT_INTERVAL_SEC, mount_point=None,
+                 pids: List[int] = None):
+        self.interval_sec = interval_sec
+        self.mount_point = mount_point
+        self.pids = pids or [os.getpid()]
+        self.enabled = (_PROC / 'self' / 'stat').exists()
+        self.samples: List[Dict] = []
+        self._ticks = os.sysconf('SC_CLK_TCK') if self.enabled else 100
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_time = None
+        self._first = None
+        self._last = None
+        self._cpu = {}
+        self._daemons: List[int] = []
+        self._cpu_seconds = 0.0
+        self._daemon_cpu_seconds = 0.0
+
+    def _cpu_delta(self, pids: List[int]) -> float:
+        """Секунды CPU процессов с прошлого опроса"""
+        delta = 0
+        for pid in pids:
+            ticks = _cpu_ticks(pid)
+            if ticks is None:
+                continue
+            previous = self._cpu.get(pid)
+            self._cpu[pid] = ticks
+            if previous is not None:
+                delta += ticks - previous
+        return delta / self._ticks
+
+    def _read_counters(self):
+        return {
+            'time': time.perf_counter(),
+            'cpu': self._cpu_delta(self.pids),
+            'daemon_cpu': self._cpu_delta(self._daemons),
+            'net': _net_bytes(),
+            'disk': _disk_bytes(),
+        }
+
+    def _sample(self):
+        current = self._read_counters()
+        last, self._last = self._last, current
+        elapsed = current['time'] - last['time']
+        if elapsed <= 0:
+            return
+        self._cpu_seconds += current['cpu']
+        self._daemon_cpu_seconds += current['daemon_cpu']
+        self.samples.append({
+            't': current['time'] - self._start_time,
+            'cpu_cores': current['cpu'] / elapsed,
+            'rss_mb': sum(_rss_bytes(pid) for pid in self.pids) / MB,
+            'net_rx_mbps': (current['net'][0] - last['net'][0]) / MB / elapsed,
+            'net_tx_mbps': (current['net'][1] - last['net'][1]) / MB / elapsed,
+            'disk_read_mbps': (current['disk'][0] - last['disk'][0]) / MB / elapsed,
+            'disk_write_mbps': (current['disk'][1] - last['disk'][1]) / MB / elapsed,
+            'daemon_cpu_cores': current['daemon_cpu'] / elapsed,
+            'daemon_rss_mb': sum(_rss_bytes(pid) for pid in self._daemons) / MB,
+        })
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_sec):
+            self._sample()
+
+    def start(self):
+        """Начало замера: базовые значения счетчиков и фоновый поток"""
+        if not self.enabled:
+            return
+        self._daemons = find_daemons(self.mount_point)
+        self._start_time = time.perf_counter()
+        self._last = self._read_counters()
+        self._first = self._last
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Конец замера: последний опрос до текущего момента"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._sample()
+
+    def summary(self, throughput_mbps: float = 0.0) -> Optional[Dict]:
+        """Итог для BenchmarkResult.resources: средние, максимумы, объемы и окна"""
+        if not self.samples:
+            return None
+        duration = self._last['time'] - self._first['time']
+        net = [b - a for a, b in zip(self._first['net'], self._last['net'])]
+        disk = [b - a for a, b in zip(self._first['disk'], self._last['disk'])]
+        cpu_cores = self._cpu_seconds / duration if duration > 0 else 0.0
+        daemon_cpu_cores = self._daemon_cpu_seconds / duration if duration > 0 else 0.0
+        summary = {
+            'interval_sec': self.interval_sec,
+            'duration_sec': duration,
+            'cpu_count': os.cpu_count() or 1,
+            'cpu_cores': cpu_cores,
+            'cpu_cores_max': max(s['cpu_cores'] for s in self.samples),
+            'rss_max_mb': max(s['rss_mb'] for s in self.samples),
+            'net_rx_mb': net[0] / MB,
+            'net_tx_mb': net[1] / MB,
+            'disk_read_mb': disk[0] / MB,
+            'disk_write_mb': disk[1] / MB,
+            'daemon_pids': self._daemons,
+            'daemon_cpu_cores': daemon_cpu_cores,
+            'daemon_rss_max_mb': max(s['daemon_rss_mb'] for s in self.samples),
+            'samples': self.samples,
+        }
+        return _per_core(summary, throughput_mbps)
+
+
+def _per_core(resources: Dict, throughput_mbps: float) -> Dict:
+    """MB/s на ядро клиента и на ядро клиента вместе с FUSE демоном"""
+    cpu_cores = resources['cpu_cores']
+    total_cores = cpu_cores + resources['daemon_cpu_cores']
+    resources['mbps_per_cpu_core'] = throughput_mbps / cpu_cores if cpu_cores > 0 else 0.0
+    resources['mbps_per_total_core'] = throughput_mbps / total_cores if total_cores > 0 else 0.0
+    return resources
+
+
+def merge_resources(summaries: List[Optional[Dict]],
+                    throughput_mbps: float) -> Optional[Dict]:
+    """Сводка по повторам: средние и объемы - среднее, максимумы - максимум"""
+    summaries = [s for s in summaries if s]
+    if not summaries:
+        return None
+    merged = dict(summaries[0])
+    for key in summaries[0]:
+        if key in ('samples', 'daemon_pids', 'interval_sec', 'cpu_count'):
+            continue
+        values = [s[key] for s in summaries]
+        merged[key] = max(values) if 'max' in key else sum(values) / len(values)
+    return _per_core(merged, throughput_mbps)
+
+
+def cpu_bound(resources: Dict, processes: int = 1) -> bool:
+    """
+    Упирается ли клиент в CPU: один процесс Python (GIL) - около одного
+    ядра, несколько процессов - около всех ядер хоста.
+    """
+    limit = resources['cpu_count'] if processes > 1 else 1
+    return resources['cpu_cores'] >= CPU_BOUND_FRACTION * min(limit, resources['cpu_count'])
@@ -0,0 +1,690 @@
+"""Встроенный S3-совместимый сервер для офлайн-бенчмарков и отладки"""
+
+import argparse
+import base64
+import bisect
+import hashlib
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+S3_NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+MAX_KEYS = 1000
+THROTTLE_CHUNK = 64 * 1024
+
+
+class S3Error(Exception):
+    """Ошибка S3 API: код, HTTP статус и сообщение"""
+
+    def __init__(self, status: int, code: str, message: str = ""):
+        super().__init__(message or code)
+        self.status = status
+        self.code = code
+        self.message = message or code
+
+
+class StoredObject:
+    """Метаданные объекта"""
+
+    def __init__(self, size: int, etag: str, modified: float):
+        self.size = size
+        self.etag = etag
+        self.modified = modified
+
+
+class MemoryStore:
+    """
+    Хранилище объектов в памяти. Метаданные защищены lock; данные
+    пишутся и читаются без него (у DiskStore - файлы, запись атомарна).
+    """
+
+    def __init__(self):
+        self.buckets: Dict[str, Dict[str, StoredObject]] = {}
+        self._data: Dict[Tuple[str, str], bytes] = {}
+        self.lock = threading.Lock()
+
+    def write(self, bucket: str, key: str, data: bytes):
+        self._data[(bucket, key)] = bytes(data)
+
+    def read(self, bucket: str, key: str, start: int, end: int) -> memoryview:
+        return memoryview(self._data[(bucket, key)])[start:end]
+
+    def remove(self, bucket: str, key: str):
+        self._data.pop((bucket, key), None)
+
+
+class DiskStore(MemoryStore):
+    """Хранилище объектов в файлах (метаданные - в памяти)"""
+
+    def __init__(self, root: Path):
+        super().__init__()
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, bucket: str, key: str) -> Path:
+        # Ключ кодируется целиком, чтобы "a/b" и "a" не конфликтовали
+        return self.root / bucket / quote(key, safe='')
+
+    def write(self, bucket: str, key: str, data: bytes):
+        path = self._path(bucket, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{uuid.uuid4().hex}.tmp")
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def read(self, bucket: str, key: str, start: int, end: int) -> memoryview:
+        with open(self._path(bucket, key), 'rb') as f:
+            f.seek(start)
+            return memoryview(f.read(end - start))
+
+    def remove(self, bucket: str, key: str):
+        try:
+            self._path(bucket, key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class S3Backend:
+    """Логика S3 API поверх хранилища"""
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+        self.uploads: Dict[str, Dict] = {}
+        self._sorted_cache: Dict[str, list] = {}
+
+    # --- Buckets ---
+
+    def create_bucket(self, bucket: str):
+        with self.store.lock:
+            self.store.buckets.setdefault(bucket, {})
+
+    def delete_bucket(self, bucket: str):
+        with self.store.lock:
+            objects = self._bucket(bucket)
+            if objects:
+                raise S3Error(409, "BucketNotEmpty")
+            del self.store.buckets[bucket]
+            self._sorted_cache.pop(bucket, None)
+
+    def _bucket(self, bucket: str) -> Dict[str, StoredObject]:
+        objects = self.store.buckets.get(bucket)
+        if objects is None:
+            raise S3Error(404, "NoSuchBucket", f"Bucket {bucket} does not exist")
+        return objects
+
+    def head_bucket(self, bucket: str):
+        with self.store.lock:
+            self._bucket(bucket)
+
+    # --- Objects ---
+
+    def put_object(self, bucket: str, key: str, data: bytes) -> str:
+        etag = hashlib.md5(data).hexdigest()
+        self.head_bucket(bucket)
+        self.store.write(bucket, key, data)
+        with self.store.lock:
+            objects = self._bucket(bucket)
+            if key not in objects:
+                self._sorted_cache.pop(bucket, None)
+            objects[key] = StoredObject(len(data), etag, time.time())
+        return etag
+
+    def head_object(self, bucket: str, key: str) -> StoredObject:
+        with self.store.lock:
+            obj = self._bucket(bucket).get(key)
+        if obj is None:
+            raise S3Error(404, "NoSuchKey", f"Key {key} does not exist")
+        return obj
+
+    def get_object(self, bucket: str, key: str, start: int, end: int) -> memoryview:
+        try:
+            return self.store.read(bucket, key, start, end)
+        except (KeyError, FileNotFoundError):
+            # Объект удалили между HEAD и чтением
+            raise S3Error(404, "NoSuchKey", f"Key {key} does not exist")
+
+    def delete_object(self, bucket: str, key: str):
+        with self.store.lock:
+            objects = self._bucket(bucket)
+            if objects.pop(key, None) is not None:
+                self.store.remove(bucket, key)
+                self._sorted_cache.pop(bucket, None)
+
+    def _sorted_keys(self, bucket: str):
+        """Отсортированные ключи бакета (кэш сбрасывается при изменениях)"""
+        keys = self._sorted_cache.get(bucket)
+        if keys is None:
+            keys = self._sorted_cache[bucket] = sorted(self._bucket(bucket))
+        return keys
+
+    def list_objects(self, bucket: str, prefix: str, delimiter: str,
+                     start_after: str, max_keys: int):
+        """ListObjectsV2: (contents, common_prefixes, next_marker)"""
+        with self.store.lock:
+            objects = self._bucket(bucket)
+            keys = self._sorted_keys(bucket)
+            position = bisect.bisect_right(keys, max(prefix, start_after)) \
+                if start_after >= prefix else bisect.bisect_left(keys, prefix)
+
+            contents, prefixes = [], []
+            last_item = None
+            truncated = False
+            for key in itertools.islice(keys, position, None):
+                if not key.startswith(prefix):
+                    break
+                item, is_prefix = key, False
+                if delimiter:
+                    pos = key.find(delimiter, len(prefix))
+                    if pos >= 0:
+                        item, is_prefix = key[:pos + len(delimiter)], True
+                if item == last_item or (start_after and item <= start_after):
+                    continue
+                if len(contents) + len(prefixes) >= max_keys:
+                    truncated = True
+                    break
+                last_item = item
+                if is_prefix:
+                    prefixes.append(item)
+                else:
+                    contents.append((key, objects[key]))
+            return contents, prefixes, last_item if truncated else None
+
+    # --- Multipart upload ---
+
+    def create_upload(self, bucket: str, key: str) -> str:
+        self.head_bucket(bucket)
+        upload_id = uuid.uuid4().hex
+        with self.store.lock:
+            self.uploads[upload_id] = {'bucket': bucket, 'key': key, 'parts': {}}
+        return upload_id
+
+    def _upload(self, upload_id: str) -> Dict:
+        upload = self.uploads.get(upload_id)
+        if upload is None:
+            raise S3Error(404, "NoSuchUpload", f"Upload {upload_id} does not exist")
+        return upload
+
+    def upload_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        etag = hashlib.md5(data).hexdigest()
+        with self.store.lock:
+            self._upload(upload_id)['parts'][part_number] = (bytes(data), etag)
+        return etag
+
+    def complete_upload(self, upload_id: str, part_numbers) -> Tuple[str, str, str]:
+        with self.store.lock:
+            upload = self._upload(upload_id)
+            try:
+                parts = [upload['parts'][n] for n in part_numbers]
+            except KeyError:
+                raise S3Error(400, "InvalidPart", "One or more parts were not uploaded")
+            del self.uploads[upload_id]
+        data = b"".join(p[0] for p in parts)
+        digest = hashlib.md5(b"".join(bytes.fromhex(p[1]) for p in parts)).hexdigest()
+        etag = f"{digest}-{len(parts)}"
+        self.store.write(upload['bucket'], upload['key'], data)
+        with self.store.lock:
+            objects = self._bucket(upload['bucket'])
+            if upload['key'] not in objects:
+                self._sorted_cache.pop(upload['bucket'], None)
+            objects[upload['key']] = StoredObject(len(data), etag, time.time())
+        return upload['bucket'], upload['key'], etag
+
+    def abort_upload(self, upload_id: str):
+        with self.store.lock:
+            self._upload(upload_id)
+            del self.uploads[upload_id]
+
+
+def _xml(root_tag: str, children, namespace: bool = True) -> bytes:
+    """Простая сборка XML-ответа: children - список (tag, text | list)"""
+    def build(parent, items):
+        for tag, value in items:
+            element = ET.SubElement(parent, tag)
+            if isinstance(value, list):
+                build(element, value)
+            elif value is not None:
+                element.text = str(value)
+
+    root = ET.Element(root_tag, xmlns=S3_NS) if namespace else ET.Element(root_tag)
+    build(root, children)
+    return b'<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(root)
+
+
+def _http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def _iso_date(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(timestamp))
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Range: bytes=a-b | a- | -n  ->  [start, end)"""
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].split(",")[0].strip()
+    first, _, last = spec.partition("-")
+    if first == "":
+        length = int(last)
+        start, end = max(0, size - length), size
+    else:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+    if start >= size or start >= end:
+        raise S3Error(416, "InvalidRange", "The requested range is not satisfiable")
+    return start, end
+
+
+class S3RequestHandler(BaseHTTPRequestHandler):
+    """HTTP-обработчик: разбор запроса, вызов S3Backend, ответ"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "LocalS3"
+    # Заголовки и тело уходят отдельными write(): без TCP_NODELAY
+    # Nagle + delayed ACK добавляют ~40 ms к каждому ответу
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # --- Ввод/вывод с ограничением полосы ---
+
+    def _throttle(self, nbytes: int, started: float):
+        bandwidth = self.server.bandwidth_bps
+        if bandwidth:
+            delay = nbytes / bandwidth - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+
+    def _read_exact(self, length: int) -> bytes:
+        chunks, remaining = [], length
+        started = time.perf_counter()
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, THROTTLE_CHUNK))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+            self._throttle(length - remaining, started)
+        return b"".join(chunks)
+
+    def _read_line(self) -> bytes:
+        return self.rfile.readline(65537).rstrip(b"\r\n")
+
+    def _read_chunked(self) -> bytes:
+        """Тело в chunked-кодировке (HTTP chunked или aws-chunked)"""
+        chunks = []
+        while True:
+            size_line = self._read_line().split(b";")[0]
+            size = int(size_line, 16)
+            if size == 0:
+                # Трейлеры (контрольные суммы) до пустой строки
+                while self._read_line():
+                    pass
+                break
+            chunks.append(self._read_exact(size))
+            self._read_line()
+        return b"".join(chunks)
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = self._read_chunked()
+        else:
+            body = self._read_exact(int(self.headers.get("Content-Length") or 0))
+
+        aws_chunked = ("aws-chunked" in self.headers.get("Content-Encoding", "")
+                       or self.headers.get("x-amz-content-sha256", "").startswith("STREAMING-"))
+        if aws_chunked:
+            body = self._decode_aws_chunked(body)
+        return body
+
+    @staticmethod
+    def _decode_aws_chunked(body: bytes) -> bytes:
+        chunks, pos = [], 0
+        while pos < len(body):
+            line_end = body.index(b"\r\n", pos)
+            size = int(body[pos:line_end].split(b";")[0], 16)
+            pos = line_end + 2
+            if size == 0:
+                break
+            chunks.append(body[pos:pos + size])
+            pos += size + 2
+        return b"".join(chunks)
+
+    def _send(self, status: int, body: bytes = b"", headers: Dict = None,
+              head_only: bool = False, content_length: int = None):
+        self.send_response(status)
+        self.send_header("x-amz-request-id", uuid.uuid4().hex[:16].upper())
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if content_length is None:
+            content_length = len(body)
+        self.send_header("Content-Length", str(content_length))
+        self.end_headers()
+        if head_only or not body:
+            return
+        view = memoryview(body)
+        started = time.perf_counter()
+        for offset in range(0, len(view), THROTTLE_CHUNK):
+            self.wfile.write(view[offset:offset + THROTTLE_CHUNK])
+            self._throttle(min(offset + THROTTLE_CHUNK, len(view)), started)
+
+    def _send_error(self, error: S3Error, head_only: bool = False):
+        body = _xml("Error", [("Code", error.code), ("Message", error.message),
+                              ("Resource", self.path)], namespace=False)
+        self._send(error.status, body, {"Content-Type": "application/xml"},
+                   head_only=head_only)
+
+    # --- Маршрутизация ---
+
+    def _route(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+        path = unquote(url.path).lstrip("/")
+        bucket, _, key = path.partition("/")
+        return bucket, key, query
+
+    def _handle(self, method: str):
+        body_read = False
+        try:
+            if self.server.latency_sec:
+                time.sleep(self.server.latency_sec)
+            bucket, key, query = self._route()
+            handler = getattr(self, f"_{method.lower()}_{'object' if key else 'bucket'}")
+            body_read = method not in ("PUT", "POST")
+            handler(bucket, key, query)
+        except S3Error as e:
+            if not body_read:
+                # Тело запроса нужно дочитать, иначе соединение не переиспользовать
+                self.close_connection = True
+            self._send_error(e, head_only=(method == "HEAD"))
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        except Exception as e:
+            self.close_connection = True
+            self._send_error(S3Error(500, "InternalError", str(e)))
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_HEAD(self):
+        self._handle("HEAD")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    # --- Bucket-операции ---
+
+    def _get_bucket(self, bucket: str, key: str, query: Dict):
+        backend = self.server.backend
+        if not bucket:
+            with backend.store.lock:
+                names = sorted(backend.store.buckets)
+            body = _xml("ListAllMyBucketsResult", [
+                ("Buckets", [("Bucket", [("Name", n), ("CreationDate", _iso_date(0))])
+                             for n in names])])
+            self._send(200, body, {"Content-Type": "application/xml"})
+            return
+        if "location" in query:
+            body = _xml("LocationConstraint", [])
+            self._send(200, body, {"Content-Type": "application/xml"})
+            return
+
+        prefix = query.get("prefix", "")
+        delimiter = query.get("delimiter", "")
+        max_keys = min(int(query.get("max-keys", MAX_KEYS)), MAX_KEYS)
+        token = query.get("continuation-token")
+        start_after = (base64.urlsafe_b64decode(token.encode()).decode()
+                       if token else query.get("start-after", ""))
+        contents, prefixes, next_marker = backend.list_objects(
+            bucket, prefix, delimiter, start_after, max_keys)
+
+        children = [("Name", bucket), ("Prefix", prefix), ("KeyCount", len(contents) + len(prefixes)),
+                    ("MaxKeys", max_keys), ("IsTruncated", "true" if next_marker else "false")]
+        if delimiter:
+            children.append(("Delimiter", delimiter))
+        if token:
+            children.append(("ContinuationToken", token))
+        if next_marker:
+            children.append(("NextContinuationToken",
+                             base64.urlsafe_b64encode(next_marker.encode()).decode()))
+        for name, obj in contents:
+            children.append(("Contents", [("Key", name), ("LastModified", _iso_date(obj.modified)),
+                                          ("ETag", f'"{obj.etag}"'), ("Size", obj.size),
+                                          ("StorageClass", "STANDARD")]))
+        for common in prefixes:
+            children.append(("CommonPrefixes", [("Prefix", common)]))
+        self._send(200, _xml("ListBucketResult", children), {"Content-Type": "application/xml"})
+
+    def _head_bucket(self, bucket: str, key: str, query: Dict):
+        self.server.backend.head_bucket(bucket)
+        self._send(200, head_only=True)
+
+    def _put_bucket(self, bucket: str, key: str, query: Dict):
+        self._read_body()
+        self.server.backend.create_bucket(bucket)
+        self._send(200, headers={"Location": f"/{bucket}"})
+
+    def _delete_bucket(self, bucket: str, key: str, query: Dict):
+        self.server.backend.delete_bucket(bucket)
+        self._send(204)
+
+    def _post_bucket(self, bucket: str, key: str, query: Dict):
+        body = self._read_body()
+        if "delete" not in query:
+            raise S3Error(400, "InvalidRequest", "Unsupported bucket POST")
+        # DeleteObjects
+        root = ET.fromstring(body)
+        quiet = (root.findtext(f"{{{S3_NS}}}Quiet") or root.findtext("Quiet") or "") == "true"
+        deleted = []
+        for obj in list(root.iter(f"{{{S3_NS}}}Object")) + list(root.iter("Object")):
+            name = obj.findtext(f"{{{S3_NS}}}Key") or obj.findtext("Key")
+            self.server.backend.delete_object(bucket, name)
+            if not quiet:
+                deleted.append(("Deleted", [("Key", name)]))
+        self._send(200, _xml("DeleteResult", deleted), {"Content-Type": "application/xml"})
+
+    # --- Object-операции ---
+
+    def _get_object(self, bucket: str, key: str, query: Dict, head_only: bool = False):
+        backend = self.server.backend
+        obj = backend.head_object(bucket, key)
+        headers = {"ETag": f'"{obj.etag}"', "Last-Modified": _http_date(obj.modified),
+                   "Accept-Ranges": "bytes", "Content-Type": "application/octet-stream"}
+        byte_range = _parse_range(self.headers.get("Range"), obj.size)
+        status = 200
+        start, end = 0, obj.size
+        if byte_range:
+            status = 206
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{obj.size}"
+        if head_only:
+            self._send(status, headers=headers, head_only=True, content_length=end - start)
+            return
+        self._send(status, backend.get_object(bucket, key, start, end), headers)
+
+    def _head_object(self, bucket: str, key: str, query: Dict):
+        self._get_object(bucket, key, query, head_only=True)
+
+    def _put_object(self, bucket: str, key: str, query: Dict):
+        data = self._read_body()
+        backend = self.server.backend
+        if "uploadId" in query:
+            etag = backend.upload_part(query["uploadId"], int(query["partNumber"]), data)
+        else:
+            etag = backend.put_object(bucket, key, data)
+        self._send(200, headers={"ETag": f'"{etag}"'})
+
+    def _post_object(self, bucket: str, key: str, query: Dict):
+        body = self._read_body()
+        backend = self.server.backend
+        if "uploads" in query:
+            upload_id = backend.create_upload(bucket, key)
+            result = _xml("InitiateMultipartUploadResult",
+                          [("Bucket", bucket), ("Key", key), ("UploadId", upload_id)])
+        elif "uploadId" in query:
+            root = ET.fromstring(body)
+            numbers = [int(p.findtext(f"{{{S3_NS}}}PartNumber") or p.findtext("PartNumber"))
+                       for p in list(root.iter(f"{{{S3_NS}}}Part")) + list(root.iter("Part"))]
+            bucket, key, etag = backend.complete_upload(query["uploadId"], numbers)
+            result = _xml("CompleteMultipartUploadResult",
+                          [("Location", f"/{bucket}/{key}"), ("Bucket", bucket),
+                           ("Key", key), ("ETag", f'"{etag}"')])
+        else:
+            raise S3Error(400, "InvalidRequest", "Unsupported object POST")
+        self._send(200, result, {"Content-Type": "application/xml"})
+
+    def _delete_object(self, bucket: str, key: str, query: Dict):
+        backend = self.server.backend
+        if "uploadId" in query:
+            backend.abort_upload(query["uploadId"])
+        else:
+            backend.delete_object(bucket, key)
+        self._send(204)
+
+
+class LocalS3Server:
+    """
+    Локальный S3-совместимый сервер (path-style адресация, без проверки
+    подписи). Поддерживает PUT/GET (Range)/HEAD/DELETE, ListObjectsV2,
+    multipart upload и DeleteObjects. Данные - в памяти или в data_dir.
+    latency_ms добавляется к каждому запросу, bandwidth_mbps ограничивает
+    скорость передачи тела в каждом соединении.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, data_dir: str = None,
+                 latency_ms: float = 0.0, bandwidth_mbps: float = 0.0,
+                 buckets=(), verbose: bool = False):
+        store = DiskStore(Path(data_dir)) if data_dir else MemoryStore()
+        self.backend = S3Backend(store)
+        for bucket in buckets:
+            self.backend.create_bucket(bucket)
+
+        self.httpd = ThreadingHTTPServer((host, port), S3RequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.backend = self.backend
+        self.httpd.latency_sec = latency_ms / 1000.0
+        self.httpd.bandwidth_bps = bandwidth_mbps * 1024 * 1024
+        self.httpd.verbose = verbose
+        self._thread = None
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'LocalS3Server':
+        """Запуск в фоновом потоке"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _serve(connection, kwargs):
+    """Точка входа дочернего процесса LocalS3Process"""
+    server = LocalS3Server(**kwargs)
+    connection.send(server.endpoint_url)
+    connection.close()
+    try:
+        server.httpd.serve_forever()
+    finally:
+        server.httpd.server_close()
+
+
+class LocalS3Process:
+    """
+    LocalS3Server в отдельном процессе: сервер не делит GIL с бенчмарком,
+    поэтому его обработка запросов не искажает задержки клиента.
+    Параметры - как у LocalS3Server.
+    """
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.endpoint_url = None
+        self._process = None
+
+    def start(self) -> 'LocalS3Process':
+        ctx = multiprocessing.get_context('spawn')
+        parent, child = ctx.Pipe(duplex=False)
+        self._process = ctx.Process(target=_serve, args=(child, self.kwargs), daemon=True)
+        self._process.start()
+        child.close()
+        try:
+            if not parent.poll(30):
+                raise EOFError
+            self.endpoint_url = parent.recv()
+        except EOFError:
+            self.stop()
+            raise RuntimeError("Local S3 server did not start")
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local S3-compatible server for benchmarking')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--data-dir', default=None,
+                       help='Store objects on disk (default: in memory)')
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                       help='Extra latency added to every request')
+    parser.add_argument('--bandwidth-mbps', type=float, default=0.0,
+                       help='Per-connection body transfer limit, MB/s (0 = unlimited)')
+    parser.add_argument('--bucket', action='append', default=[],
+                       help='Bucket to create on startup (repeatable)')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = LocalS3Server(args.host, args.port, args.data_dir, args.latency_ms,
+                           args.bandwidth_mbps, args.bucket, args.verbose)
+    print(f"Local S3 server listening on {server.endpoint_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
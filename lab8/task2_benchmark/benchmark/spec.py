@@ -0,0 +1,243 @@
+"""Декларативное описание нагрузки (JSON/YAML)"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+from .workloads import WorkloadConfig, WorkloadType
+
+# Операции, которые умеет выполнять каждый бэкенд
+PUT = "put"
+GET = "get"
+HEAD = "head"
+DELETE = "delete"
+LIST = "list"
+OPERATIONS = (PUT, GET, HEAD, DELETE, LIST)
+
+# Длина расписания по умолчанию для прогонов по времени (расписание повторяется)
+DEFAULT_SCHEDULE_LENGTH = 100000
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+def parse_size(value) -> int:
+    """Размер в байтах из числа или строки вида '4KB', '1.5 MB'"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMG]?B?)\s*', str(value).upper())
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+@dataclass
+class SizeDistribution:
+    """
+    Распределение размеров объектов:
+      fixed     - {"size": "1MB"}
+      uniform   - {"min": "4KB", "max": "1MB"}
+      lognormal - {"median": "64KB", "sigma": 1.0, "min": ..., "max": ...}
+      choice    - {"sizes": ["4KB", "1MB"], "weights": [0.9, 0.1]}
+    """
+    distribution: str = "fixed"
+    params: Dict = field(default_factory=dict)
+
+    KINDS = ("fixed", "uniform", "lognormal", "choice")
+
+    @classmethod
+    def from_dict(cls, data) -> 'SizeDistribution':
+        if not isinstance(data, dict):
+            return cls("fixed", {'size': data})
+        data = dict(data)
+        distribution = data.pop('distribution', 'fixed')
+        if distribution not in cls.KINDS:
+            raise ValueError(f"Unknown size distribution: {distribution}")
+        return cls(distribution, data)
+
+    def sample(self, count: int, rng: np.random.Generator) -> np.ndarray:
+        p = self.params
+        if self.distribution == "fixed":
+            sizes = np.full(count, parse_size(p['size']), dtype=np.int64)
+        elif self.distribution == "uniform":
+            sizes = rng.integers(parse_size(p['min']), parse_size(p['max']) + 1, count)
+        elif self.distribution == "lognormal":
+            sizes = rng.lognormal(np.log(parse_size(p['median'])), p.get('sigma', 1.0), count)
+        else:
+            choices = np.array([parse_size(s) for s in p['sizes']])
+            weights = np.array(p.get('weights', [1.0] * len(choices)), dtype=float)
+            sizes = rng.choice(choices, count, p=weights / weights.sum())
+        low = parse_size(p.get('min', 1))
+        high = parse_size(p['max']) if 'max' in p else None
+        return np.clip(sizes, low, high).astype(np.int64)
+
+    @property
+    def max_size(self) -> Optional[int]:
+        """Верхняя граница размера (None, если не ограничена)"""
+        p = self.params
+        if self.distribution == "fixed":
+            return parse_size(p['size'])
+        if self.distribution == "choice":
+            return max(parse_size(s) for s in p['sizes'])
+        return parse_size(p['max']) if 'max' in p else None
+
+
+@dataclass
+class KeyPopularity:
+    """
+    Распределение обращений по ключам:
+      uniform    - все ключи равновероятны
+      sequential - ключи по кругу
+      zipf       - {"exponent": 0.99}: вероятность ключа ранга k ~ 1/k^exponent
+      hotspot    - {"hot_fraction": 0.2, "hot_access": 0.8}: доля hot_access
+                   обращений приходится на hot_fraction ключей
+    Для zipf и hotspot ранги случайно переставляются по ключам, чтобы
+    популярные ключи не шли подряд (соседние имена часто в одной партиции).
+    """
+    distribution: str = "uniform"
+    params: Dict = field(default_factory=dict)
+
+    KINDS = ("uniform", "sequential", "zipf", "hotspot")
+
+    @classmethod
+    def from_dict(cls, data) -> 'KeyPopularity':
+        if isinstance(data, str):
+            data = {'distribution': data}
+        data = dict(data or {})
+        distribution = data.pop('distribution', 'uniform')
+        if distribution not in cls.KINDS:
+            raise ValueError(f"Unknown key popularity distribution: {distribution}")
+        return cls(distribution, data)
+
+    def sample(self, count: int, keys: int, rng: np.random.Generator) -> np.ndarray:
+        p = self.params
+        if self.distribution == "sequential":
+            return np.arange(count, dtype=np.int64) % keys
+        if self.distribution == "zipf":
+            weights = np.arange(1, keys + 1, dtype=float) ** -float(p.get('exponent', 0.99))
+            ranks = rng.choice(keys, count, p=weights / weights.sum())
+        elif self.distribution == "hotspot":
+            hot = min(keys, max(1, int(keys * p.get('hot_fraction', 0.2))))
+            ranks = rng.integers(0, hot, count)
+            cold = rng.random(count) >= p.get('hot_access', 0.8)
+            if hot < keys:
+                ranks[cold] = rng.integers(hot, keys, int(cold.sum()))
+        else:
+            return rng.integers(0, keys, count, dtype=np.int64)
+        return rng.permutation(keys)[ranks].astype(np.int64)
+
+    def describe(self) -> str:
+        """Краткое описание для вывода"""
+        params = ", ".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.distribution}({params})" if params else self.distribution
+
+
+@dataclass
+class WorkloadSpec:
+    """
+    Описание нагрузки:
+      name        - имя (имя результата в отчете)
+      operations  - доли операций, например {"get": 0.8, "put": 0.2}
+      object_size - распределение размеров (см. SizeDistribution)
+      keys        - число ключей
+      popularity  - распределение обращений по ключам (см. KeyPopularity)
+      ops / duration_sec - число операций или длительность прогона
+      concurrency - число потоков нагрузки
+      prefill     - заранее создать все ключи (нужно для get/head)
+      seed        - seed генератора расписания (воспроизводимость)
+    """
+    name: str
+    operations: Dict[str, float]
+    object_size: SizeDistribution = field(default_factory=SizeDistribution)
+    keys: int = 1000
+    popularity: KeyPopularity = field(default_factory=KeyPopularity)
+    ops: Optional[int] = None
+    duration_sec: Optional[float] = None
+    concurrency: int = 1
+    prefill: bool = True
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        unknown = set(self.operations) - set(OPERATIONS)
+        if unknown:
+            raise ValueError(f"Unknown operations in spec {self.name!r}: {sorted(unknown)}")
+        if not self.operations or sum(self.operations.values()) <= 0:
+            raise ValueError(f"Spec {self.name!r} has no operations")
+        if self.keys < 1:
+            raise ValueError(f"Spec {self.name!r}: keys must be positive")
+        if self.ops is None and self.duration_sec is None:
+            raise ValueError(f"Spec {self.name!r}: either ops or duration_sec is required")
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'WorkloadSpec':
+        data = dict(data)
+        data['object_size'] = SizeDistribution.from_dict(data.get('object_size', '1MB'))
+        data['popularity'] = KeyPopularity.from_dict(data.get('popularity'))
+        return cls(**data)
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'operations': self.operations,
+            'object_size': {'distribution': self.object_size.distribution,
+                            **self.object_size.params},
+            'keys': self.keys,
+            'popularity': {'distribution': self.popularity.distribution,
+                           **self.popularity.params},
+            'ops': self.ops,
+            'duration_sec': self.duration_sec,
+            'concurrency': self.concurrency,
+            'prefill': self.prefill,
+            'seed': self.seed,
+        }
+
+
+def mixed_spec(operations: Dict[str, float] = None, popularity: KeyPopularity = None,
+               keys: int = WorkloadConfig.MIXED_KEYS,
+               object_size: int = WorkloadConfig.MIXED_OBJECT_SIZE,
+               ops: int = WorkloadConfig.MIXED_OPERATIONS,
+               concurrency: int = 1) -> WorkloadSpec:
+    """Спецификация встроенной смешанной нагрузки (mixed)"""
+    if popularity is None:
+        popularity = KeyPopularity(WorkloadConfig.MIXED_POPULARITY,
+                                   {'exponent': WorkloadConfig.MIXED_ZIPF_EXPONENT})
+    return WorkloadSpec(
+        name=WorkloadType.MIXED,
+        operations=dict(operations or WorkloadConfig.MIXED_OPERATIONS_MIX),
+        object_size=SizeDistribution("fixed", {'size': object_size}),
+        keys=keys,
+        popularity=popularity,
+        ops=ops,
+        concurrency=concurrency,
+    )
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Доли операций из строки вида 'get=0.8,put=0.2'"""
+    mix = {}
+    for item in value.split(','):
+        name, sep, weight = item.partition('=')
+        if not sep:
+            raise ValueError(f"Invalid operation mix entry: {item!r} (expected op=weight)")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def load_specs(path: Path) -> list:
+    """
+    Чтение файла со спецификациями: одна нагрузка (объект) или
+    список нагрузок. YAML поддерживается, если установлен PyYAML.
+    """
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("PyYAML is required for YAML workload specs: pip install pyyaml")
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    items = data if isinstance(data, list) else [data]
+    return [WorkloadSpec.from_dict(item) for item in items]
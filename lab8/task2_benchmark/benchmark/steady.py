@@ -0,0 +1,86 @@
+"""Поиск установившегося режима по временному ряду и отсечение переходного участка"""
+
+from dataclasses import replace
+from typing import List
+import numpy as np
+from .histogram import LatencyHistogram
+from .timeseries import TimeSeriesSampler
+
+# Меньше окон - переходный участок не ищем: оценка слишком шумная
+MIN_WINDOWS = 5
+# Отсекаем не больше этой доли окон (стандартное ограничение MSER)
+MAX_TRANSIENT_FRACTION = 0.5
+
+
+def detect_steady_state(values: List[float],
+                        max_fraction: float = MAX_TRANSIENT_FRACTION) -> int:
+    """
+    Номер первого окна установившегося режима по правилу MSER
+    (Marginal Standard Error Rule): отсечение d выбирается так, чтобы
+    минимизировать sum((x[d:] - mean(x[d:]))^2) / (n - d)^2, то есть
+    стандартную ошибку среднего оставшейся части. Переходный участок
+    (прогрев соединений, кэшей) добавляет разброс, и его отсечение
+    уменьшает статистику, а отсечение установившихся окон - увеличивает.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n < MIN_WINDOWS:
+        return 0
+    best, best_d = np.inf, 0
+    for d in range(int(n * max_fraction) + 1):
+        tail = values[d:]
+        statistic = np.sum((tail - tail.mean()) ** 2) / len(tail) ** 2
+        if statistic < best:
+            best, best_d = statistic, d
+    return best_d
+
+
+def trim_transient(result: 'BenchmarkResult', sampler: TimeSeriesSampler) -> 'BenchmarkResult':
+    """
+    Результат без переходного участка: throughput, IOPS и задержки
+    пересчитываются по окнам установившегося режима. Нужен сэмплер
+    с keep_histograms=True (гистограммы окон полной точности).
+    """
+    samples = sampler.samples
+    if not sampler.window_histograms or len(sampler.window_histograms) != len(samples):
+        return result
+    # Последнее окно неполное - в поиске не участвует
+    start = detect_steady_state([s['throughput_mbps'] for s in samples[:-1]])
+    if start == 0:
+        return result
+
+    steady = samples[start:]
+    histogram = LatencyHistogram.from_dict(sampler.window_histograms[start])
+    for data in sampler.window_histograms[start + 1:]:
+        histogram.merge(LatencyHistogram.from_dict(data))
+    if not histogram.total_count:
+        return result
+
+    transient_sec = start * sampler.window_sec
+    steady_time = result.total_time_sec - transient_sec
+    if steady_time <= 0:
+        return result
+    ops = sum(s['ops'] for s in steady)
+    total_bytes = sum(s['bytes'] for s in steady)
+    transient_ops = sum(s['ops'] + s['errors'] for s in samples[:start])
+    print(f"  Steady state after {transient_sec:.1f} sec "
+          f"({start} windows, {transient_ops} ops excluded)")
+
+    return replace(
+        result,
+        throughput_mbps=total_bytes / (1024 * 1024) / steady_time,
+        iops=ops / steady_time,
+        latency_avg_ms=histogram.mean_ms,
+        latency_p50_ms=histogram.percentile(50),
+        latency_p90_ms=histogram.percentile(90),
+        latency_p95_ms=histogram.percentile(95),
+        latency_p99_ms=histogram.percentile(99),
+        latency_p999_ms=histogram.percentile(99.9),
+        latency_max_ms=histogram.max_ms,
+        latency_histogram=histogram.to_dict(),
+        total_time_sec=steady_time,
+        iterations=max(0, result.iterations - transient_ops),
+        transient_sec=transient_sec,
+        transient_iterations=transient_ops,
+        throughput_windows=sampler.throughput_windows()[start:] or None,
+    )
@@ -0,0 +1,232 @@
+"""Запись throughput и задержек по временным окнам во время прогона"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from .histogram import DEFAULT_SIGNIFICANT_DIGITS, LatencyHistogram
+
+# Точность гистограмм окон ниже основной: окон много, а для графиков
+# двух значащих цифр достаточно
+WINDOW_HISTOGRAM_DIGITS = 2
+
+# Границы интервалов тепловой карты задержек: 1/16 ms .. ~65 s, степени двойки
+HEATMAP_EDGES_MS = [2.0 ** k for k in range(-4, 17)]
+
+
+class TimeWindow:
+    """Счетчики одного временного окна"""
+
+    def __init__(self, significant_digits: int = WINDOW_HISTOGRAM_DIGITS):
+        self.ops = 0
+        self.bytes = 0.0
+        self.errors = 0
+        self.histogram = LatencyHistogram(significant_digits=significant_digits)
+
+    def merge(self, other: 'TimeWindow'):
+        self.ops += other.ops
+        self.bytes += other.bytes
+        self.errors += other.errors
+        self.histogram.merge(other.histogram)
+        return self
+
+
+class WindowRecorder:
+    """
+    Запись операций одного потока. У каждого потока свой recorder,
+    поэтому блокировка почти никогда не бывает занята.
+    """
+
+    def __init__(self, sampler: 'TimeSeriesSampler'):
+        self._sampler = sampler
+        self._lock = threading.Lock()
+        self._windows: Dict[int, TimeWindow] = {}
+
+    def record(self, finished_at: float, latency_ms: float, bytes_processed: float):
+        """Успешная операция, завершившаяся в момент finished_at (perf_counter)"""
+        index = self._sampler.window_index(finished_at)
+        with self._lock:
+            window = self._windows.get(index)
+            if window is None:
+                window = self._windows[index] = TimeWindow(self._sampler.histogram_digits)
+            window.ops += 1
+            window.bytes += bytes_processed
+            window.histogram.record(latency_ms)
+
+    def record_error(self, finished_at: float):
+        index = self._sampler.window_index(finished_at)
+        with self._lock:
+            window = self._windows.get(index)
+            if window is None:
+                window = self._windows[index] = TimeWindow(self._sampler.histogram_digits)
+            window.errors += 1
+
+    def take(self, before_index: Optional[int] = None) -> Dict[int, TimeWindow]:
+        """Забрать окна с номером меньше before_index (все, если None)"""
+        with self._lock:
+            if before_index is None:
+                taken, self._windows = self._windows, {}
+                return taken
+            taken = {i: w for i, w in self._windows.items() if i < before_index}
+            for i in taken:
+                del self._windows[i]
+            return taken
+
+
+class TimeSeriesSampler:
+    """
+    Сэмплер временного ряда: ops, байты, ошибки и квантили задержек за
+    каждое окно window_sec. Закрытые окна фоновым потоком дописываются
+    в JSONL-файл (по строке на окно), гистограммы окон после записи
+    освобождаются. В памяти на весь прогон остаются сводки окон samples
+    (нужны для доверительных интервалов и steady.py, ~1 KB на окно) и,
+    при keep_histograms, гистограммы окон полной точности.
+    """
+
+    def __init__(self, output_path: Path = None, window_sec: float = 1.0,
+                 labels: Dict = None, keep_histograms: bool = False):
+        if window_sec <= 0:
+            raise ValueError("window_sec must be positive")
+        self.output_path = Path(output_path) if output_path else None
+        self.window_sec = window_sec
+        self.labels = labels or {}
+        self.samples: List[Dict] = []
+        # keep_histograms - хранить гистограммы окон полной точности,
+        # чтобы пересчитать задержки без переходного участка (steady.py)
+        self.keep_histograms = keep_histograms
+        self.histogram_digits = (DEFAULT_SIGNIFICANT_DIGITS if keep_histograms
+                                 else WINDOW_HISTOGRAM_DIGITS)
+        self.window_histograms: List[Dict] = []
+        self.start_time = None
+        self.start_wall_time = None
+
+        self._recorders: List[WindowRecorder] = []
+        self._pending: Dict[int, TimeWindow] = {}
+        self._next_index = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._file = None
+
+    def window_index(self, timestamp: float) -> int:
+        return int((timestamp - self.start_time) / self.window_sec)
+
+    def recorder(self) -> WindowRecorder:
+        """Новый recorder для потока нагрузки"""
+        recorder = WindowRecorder(self)
+        with self._lock:
+            self._recorders.append(recorder)
+        return recorder
+
+    def start(self, start_time: float = None, background: bool = True):
+        """Начало отсчета окон; background - периодически сбрасывать окна"""
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self.start_wall_time = time.time() - (time.perf_counter() - self.start_time)
+        if self.output_path:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.output_path, 'a', encoding='utf-8')
+        if background:
+            self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self._thread.start()
+
+    def add_windows(self, windows: Dict[int, TimeWindow]):
+        """Добавить окна, собранные в другом процессе"""
+        with self._lock:
+            self._merge_pending(windows)
+
+    def drain(self) -> Dict[int, TimeWindow]:
+        """Забрать все накопленные окна без записи (для передачи в родительский процесс)"""
+        with self._lock:
+            for recorder in self._recorders:
+                self._merge_pending(recorder.take())
+            drained, self._pending = self._pending, {}
+            return drained
+
+    def stop(self) -> List[Dict]:
+        """Остановка: сбросить все оставшиеся окна и закрыть файл"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        self._flush(final=True)
+        if self._file:
+            self._file.close()
+            self._file = None
+        return self.samples
+
+    def throughput_windows(self) -> List[float]:
+        """MB/s по записанным окнам, кроме последнего (неполного)"""
+        return [sample['throughput_mbps'] for sample in self.samples[:-1]]
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.window_sec):
+            self._flush()
+
+    def _merge_pending(self, windows: Dict[int, TimeWindow]):
+        for index, window in windows.items():
+            # Опоздавшие данные уже записанных окон идут в ближайшее незаписанное
+            index = max(index, self._next_index)
+            if index in self._pending:
+                self._pending[index].merge(window)
+            else:
+                self._pending[index] = window
+
+    def _flush(self, final: bool = False):
+        """Записать окна, которые уже точно закрыты"""
+        with self._lock:
+            if final:
+                limit = None
+            else:
+                # Небольшой запас, чтобы операции на границе окна успели записаться
+                elapsed = time.perf_counter() - self.start_time - self.window_sec * 0.1
+                limit = int(elapsed / self.window_sec)
+            for recorder in self._recorders:
+                self._merge_pending(recorder.take(limit))
+
+            if limit is None:
+                last = max(self._pending, default=self._next_index - 1)
+            else:
+                last = limit - 1
+            # Пустые окна тоже пишем - провалы throughput должны быть видны
+            for index in range(self._next_index, last + 1):
+                self._emit(index, self._pending.pop(index, None)
+                           or TimeWindow(self.histogram_digits))
+            self._next_index = max(self._next_index, last + 1)
+
+    def _emit(self, index: int, window: TimeWindow):
+        histogram = window.histogram
+        sample = dict(self.labels)
+        sample.update({
+            'window': index,
+            'window_start_sec': index * self.window_sec,
+            'window_sec': self.window_sec,
+            'timestamp': self.start_wall_time + index * self.window_sec,
+            'ops': window.ops,
+            'bytes': window.bytes,
+            'errors': window.errors,
+            'iops': window.ops / self.window_sec,
+            'throughput_mbps': window.bytes / (1024 * 1024) / self.window_sec,
+            'latency_avg_ms': histogram.mean_ms,
+            'latency_p50_ms': histogram.percentile(50),
+            'latency_p90_ms': histogram.percentile(90),
+            'latency_p99_ms': histogram.percentile(99),
+            'latency_max_ms': histogram.max_ms,
+            'latency_heatmap': histogram.counts_by_edges(HEATMAP_EDGES_MS),
+        })
+        self.samples.append(sample)
+        if self.keep_histograms:
+            self.window_histograms.append(histogram.to_dict())
+        if self._file:
+            self._file.write(json.dumps(sample) + "\n")
+            self._file.flush()
+
+
+def load_samples(path: Path) -> List[Dict]:
+    """Чтение JSONL-файла временного ряда"""
+    samples = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                samples.append(json.loads(line))
+    return samples
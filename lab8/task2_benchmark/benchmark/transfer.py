@@ -0,0 +1,285 @@
+"""Клиентские движки передачи больших объектов через S3 API"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, List, Tuple
+from .payload import PayloadReader
+
+# Ограничения S3 на multipart upload
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+MAX_DELETE_BATCH = 1000
+# Попыток на пакет delete_objects
+DELETE_BATCH_ATTEMPTS = 2
+
+# Размер блока записи в файл при загрузке диапазона
+FILE_CHUNK_SIZE = 1024 * 1024
+
+
+class MultipartUploader:
+    """
+    Multipart-загрузка с параллельной отправкой частей.
+
+    Пул потоков создается один раз и переиспользуется между загрузками,
+    чтобы создание потоков не попадало в измеряемое время.
+    """
+
+    def __init__(self, s3_client, bucket_name: str, part_size: int,
+                 concurrency: int = 4):
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes")
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.part_size = part_size
+        self.concurrency = max(1, concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                            thread_name_prefix="mpu")
+
+    def _upload_part(self, key: str, upload_id: str, part_number: int,
+                     data, offset: int) -> dict:
+        # Часть отдается срезом memoryview - данные не копируются
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=PayloadReader(memoryview(data)[offset:offset + self.part_size])
+        )
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    def upload(self, key: str, data: bytes) -> int:
+        """Загрузка объекта; возвращает число отправленных байт"""
+        size = len(data)
+        if (size + self.part_size - 1) // self.part_size > MAX_PARTS:
+            raise ValueError(f"Object needs more than {MAX_PARTS} parts, increase part_size")
+
+        upload_id = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket_name, Key=key)['UploadId']
+        futures = []
+        try:
+            for number, offset in enumerate(range(0, size, self.part_size), start=1):
+                futures.append(self._executor.submit(self._upload_part, key, upload_id,
+                                                     number, data, offset))
+            parts = [f.result() for f in futures]
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except Exception:
+            # Части в очереди отменяем, отправляемые дожидаемся: после abort
+            # не должно прийти ни одной части, а следующая загрузка не делит
+            # пул с хвостом этой
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            try:
+                self.s3_client.abort_multipart_upload(
+                    Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+            except Exception:
+                pass
+            raise
+        return size
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+class RangedDownloader:
+    """
+    Загрузка объекта параллельными Range GET запросами.
+
+    Диапазоны пишутся сразу на свое место в заранее выделенный буфер
+    (или в файл через pwrite), без склейки кусков в конце.
+    """
+
+    def __init__(self, s3_client, bucket_name: str, range_size: int,
+                 concurrency: int = 4):
+        if range_size <= 0:
+            raise ValueError("range_size must be positive")
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.range_size = range_size
+        self.concurrency = max(1, concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                            thread_name_prefix="rget")
+
+    def _get_range(self, key: str, offset: int, length: int):
+        response = self.s3_client.get_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Range=f'bytes={offset}-{offset + length - 1}'
+        )
+        return response['Body']
+
+    def _fetch_into(self, key: str, offset: int, view: memoryview) -> int:
+        body = self._get_range(key, offset, len(view))
+        received = 0
+        try:
+            while received < len(view):
+                if hasattr(body, 'readinto'):
+                    n = body.readinto(view[received:])
+                else:
+                    chunk = body.read(len(view) - received)
+                    n = len(chunk)
+                    view[received:received + n] = chunk
+                if not n:
+                    break
+                received += n
+        finally:
+            body.close()
+        if received != len(view):
+            raise IOError(f"Short range read at {offset}: {received} of {len(view)} bytes")
+        return received
+
+    def _fetch_to_file(self, key: str, offset: int, length: int, fd: int) -> int:
+        body = self._get_range(key, offset, length)
+        received = 0
+        try:
+            for chunk in body.iter_chunks(chunk_size=FILE_CHUNK_SIZE):
+                os.pwrite(fd, chunk, offset + received)
+                received += len(chunk)
+        finally:
+            body.close()
+        if received != length:
+            raise IOError(f"Short range read at {offset}: {received} of {length} bytes")
+        return received
+
+    def _ranges(self, size: int):
+        for offset in range(0, size, self.range_size):
+            yield offset, min(self.range_size, size - offset)
+
+    def object_size(self, key: str) -> int:
+        head = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+        return head['ContentLength']
+
+    def download(self, key: str, buffer: bytearray = None, size: int = None) -> int:
+        """
+        Загрузка объекта в буфер; возвращает число полученных байт.
+        Буфер можно переиспользовать между загрузками - выделение памяти
+        тогда не попадает в измеряемое время.
+        """
+        if size is None:
+            size = self.object_size(key)
+        if buffer is None:
+            buffer = bytearray(size)
+        elif len(buffer) < size:
+            raise ValueError("buffer is smaller than the object")
+
+        view = memoryview(buffer)
+        futures = [
+            self._executor.submit(self._fetch_into, key, offset, view[offset:offset + length])
+            for offset, length in self._ranges(size)
+        ]
+        return sum(f.result() for f in futures)
+
+    def download_file(self, key: str, path: str, size: int = None) -> int:
+        """Загрузка объекта в файл (каждый диапазон пишется по своему смещению)"""
+        if size is None:
+            size = self.object_size(key)
+
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            futures = [
+                self._executor.submit(self._fetch_to_file, key, offset, length, fd)
+                for offset, length in self._ranges(size)
+            ]
+            return sum(f.result() for f in futures)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+class BulkDeleter:
+    """
+    Массовое удаление объектов: постраничный обход префикса и
+    delete_objects по 1000 ключей, несколько пакетов одновременно.
+    Пакет, который не удалось удалить (SlowDown, таймаут, разрыв
+    соединения), повторяется один раз, затем его ключи считаются в
+    failed - обход остальных страниц продолжается. deleted и failed
+    накапливаются по мере удаления и верны, даже если упал сам листинг.
+    """
+
+    def __init__(self, s3_client, bucket_name: str, concurrency: int = 8,
+                 batch_size: int = MAX_DELETE_BATCH):
+        if not 1 <= batch_size <= MAX_DELETE_BATCH:
+            raise ValueError(f"batch_size must be in range 1..{MAX_DELETE_BATCH}")
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.concurrency = max(1, concurrency)
+        self.batch_size = batch_size
+        self.deleted = 0
+        self.failed = 0
+        self.last_error = None
+
+    def _delete_batch(self, keys) -> Tuple[int, int]:
+        """(удалено, не удалось удалить) для одного пакета"""
+        for attempt in range(DELETE_BATCH_ATTEMPTS):
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+                )
+                break
+            except Exception:
+                if attempt == DELETE_BATCH_ATTEMPTS - 1:
+                    raise
+        # В режиме Quiet ответ содержит только ключи, которые удалить не удалось
+        failed = len(response.get('Errors', []))
+        return len(keys) - failed, failed
+
+    def _batches(self, keys: Iterable[str]) -> Iterator[List[str]]:
+        batch = []
+        for key in keys:
+            batch.append(key)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _list_keys(self, prefix: str) -> Iterator[str]:
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield obj['Key']
+
+    def delete_keys(self, keys: Iterable[str]) -> int:
+        """Удаление ключей; возвращает число удаленных объектов"""
+        deleted_before = self.deleted
+
+        def collect(futures):
+            # Счетчики обновляет только этот поток - пакеты лишь возвращают числа
+            for future in futures:
+                size = in_flight.pop(future)
+                try:
+                    ok, failed = future.result()
+                except Exception as e:
+                    ok, failed = 0, size
+                    self.last_error = f"{type(e).__name__}: {e}"
+                self.deleted += ok
+                self.failed += failed
+
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix="bdel") as executor:
+            in_flight = {}
+            try:
+                for batch in self._batches(keys):
+                    # Не больше 2 * concurrency пакетов в очереди - список
+                    # следующей страницы идет параллельно с удалением
+                    if len(in_flight) >= 2 * self.concurrency:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    in_flight[executor.submit(self._delete_batch, batch)] = len(batch)
+            finally:
+                # И при ошибке листинга отправленные пакеты учитываются
+                collect(list(in_flight))
+        return self.deleted - deleted_before
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Удаление всех объектов под префиксом"""
+        return self.delete_keys(self._list_keys(prefix))
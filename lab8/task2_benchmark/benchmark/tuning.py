@@ -0,0 +1,96 @@
+"""Перебор параметров клиента (размер части, параллельность, пул) и выбор лучшей конфигурации"""
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+from .base import BenchmarkBase, BenchmarkResult
+
+# Прирост метрики меньше этой доли считается выходом на плато
+PLATEAU_TOLERANCE = 0.05
+
+
+@dataclass
+class TuningPoint:
+    """Одна конфигурация и ее результат"""
+    parameters: Dict
+    result: BenchmarkResult
+
+    def to_dict(self):
+        return {'parameters': self.parameters, 'result': self.result.to_dict()}
+
+
+@dataclass
+class TuningResult:
+    """Результат перебора конфигураций для одной нагрузки и хранилища"""
+    name: str
+    storage_type: str
+    metric: str
+    points: List[TuningPoint] = field(default_factory=list)
+
+    @property
+    def best(self) -> TuningPoint:
+        candidates = [p for p in self.points if not p.result.errors] or self.points
+        return max(candidates, key=lambda p: getattr(p.result, self.metric))
+
+    def plateau(self, parameter: str,
+                tolerance: float = PLATEAU_TOLERANCE) -> List[TuningPoint]:
+        """
+        Где метрика перестает расти с parameter: для каждого сочетания
+        остальных параметров - точка с наименьшим значением parameter,
+        у которой метрика не хуже лучшей более чем на tolerance.
+        """
+        groups = {}
+        for point in self.points:
+            key = tuple((k, v) for k, v in point.parameters.items() if k != parameter)
+            groups.setdefault(key, []).append(point)
+        knees = []
+        for points in groups.values():
+            points.sort(key=lambda p: p.parameters[parameter])
+            best = max(getattr(p.result, self.metric) for p in points)
+            knees.append(next(p for p in points
+                              if getattr(p.result, self.metric) >= best * (1 - tolerance)))
+        return knees
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'storage_type': self.storage_type,
+            'metric': self.metric,
+            'points': [p.to_dict() for p in self.points],
+            'best': self.best.parameters if self.points else None,
+        }
+
+
+def sweep_configurations(make_benchmark: Callable[..., BenchmarkBase],
+                         grid: Dict[str, List], iterations: int,
+                         concurrency: int = 1,
+                         metric: str = 'throughput_mbps',
+                         duration: float = None) -> TuningResult:
+    """
+    Прогон бенчмарка на всех сочетаниях параметров из grid
+    (duration, сек - остановка каждого прогона по времени).
+
+    make_benchmark(**parameters) создает бенчмарк для одной конфигурации.
+    Параметр 'concurrency' в grid, если есть, передается в run(),
+    а не в make_benchmark.
+    """
+    names = list(grid)
+    tuning = None
+
+    for values in itertools.product(*(grid[n] for n in names)):
+        parameters = dict(zip(names, values))
+        benchmark_kwargs = {k: v for k, v in parameters.items() if k != 'concurrency'}
+        run_concurrency = parameters.get('concurrency', concurrency)
+
+        benchmark = make_benchmark(**benchmark_kwargs)
+        if tuning is None:
+            tuning = TuningResult(benchmark.name, benchmark.storage_type, metric)
+
+        print(f"  Config: {parameters}")
+        result = benchmark.run(iterations=iterations, concurrency=run_concurrency,
+                               duration=duration)
+        tuning.points.append(TuningPoint(parameters, result))
+        print(f"    -> {getattr(result, metric):.2f} {metric}, "
+              f"p99 {result.latency_p99_ms:.2f} ms, errors {result.errors}")
+
+    return tuning
@@ -0,0 +1,146 @@
+"""Задержка видимости между путями: запись через S3 API - чтение через точку монтирования и наоборот"""
+
+import os
+import time
+from pathlib import Path
+from botocore.exceptions import ClientError
+from .base import BenchmarkBase
+from .native_s3 import NativeS3Benchmark, is_not_found
+from .payload import RANDOM, get_pool
+from .transfer import BulkDeleter
+from .workloads import WorkloadConfig, WorkloadType
+
+# Каталог нагрузки в точке монтирования (и префикс ключей в bucket)
+VISIBILITY_DIR = "benchmark_visibility"
+# Уникальная метка в начале объекта: содержимое не спутать с чужим/неполным
+TOKEN_SIZE = 32
+
+
+class VisibilityBenchmark(BenchmarkBase):
+    """
+    Через сколько после записи объект виден по другому пути.
+    s3_to_fs - put_object клиентом NativeS3Benchmark, опрос точки
+    монтирования (кэши stat и каталогов s3fs/goofys); fs_to_s3 - запись
+    файла в точку монтирования, опрос get_object. Задержка итерации -
+    от завершения записи до первого чтения с правильным размером и
+    содержимым, с точностью до интервала опроса. Точка монтирования
+    должна показывать тот же bucket (mount_prefix - префикс ключей,
+    если смонтирован bucket:/prefix).
+    """
+
+    # Параметры нагрузки, которые приходят вместе с параметрами ФС
+    OPTIONS = ('direction', 'poll_interval', 'timeout', 'mount_prefix',
+               'object_size', 'payload_profile')
+
+    def __init__(self, storage_type: str, mount_point: str, bucket_name: str,
+                 endpoint_url: str = None, access_key: str = None,
+                 secret_key: str = None,
+                 direction: str = WorkloadConfig.VISIBILITY_S3_TO_FS,
+                 poll_interval: float = WorkloadConfig.VISIBILITY_POLL_INTERVAL,
+                 timeout: float = WorkloadConfig.VISIBILITY_TIMEOUT,
+                 mount_prefix: str = '', object_size: int = None,
+                 payload_profile: str = RANDOM, s3_options: dict = None):
+        if direction not in WorkloadConfig.VISIBILITY_DIRECTIONS:
+            raise ValueError(f"Unknown visibility direction: {direction}")
+        super().__init__(f"visibility_{direction}", storage_type)
+        # Клиент native S3 с теми же настройками, что и у native_s3 нагрузок;
+        # потоки нагрузки используют его совместно (boto3 клиент потокобезопасен)
+        self.s3 = NativeS3Benchmark(bucket_name, WorkloadType.SMALL_FILES, endpoint_url,
+                                    access_key, secret_key,
+                                    **{**(s3_options or {}), 'trace_phases': False})
+        self.bucket_name = bucket_name
+        self.mount_point = Path(mount_point)
+        self.test_dir = self.mount_point / VISIBILITY_DIR
+        mount_prefix = mount_prefix.strip('/')
+        self.key_prefix = (f"{mount_prefix}/" if mount_prefix else "") + f"{VISIBILITY_DIR}/"
+        self.direction = direction
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.object_size = max(object_size or WorkloadConfig.VISIBILITY_OBJECT_SIZE, TOKEN_SIZE)
+        self.payload_profile = payload_profile
+
+    def setup(self):
+        """Bucket, каталог нагрузки и пул данных"""
+        self.s3.setup()
+        self.test_dir.mkdir(parents=True, exist_ok=True)
+        get_pool(self.payload_profile, self.object_size)
+
+    def _payload(self, name: str) -> bytes:
+        """Данные объекта: уникальная метка + срез общего пула"""
+        token = f"{name}:{time.time_ns()}".encode()[:TOKEN_SIZE].ljust(TOKEN_SIZE, b'.')
+        body = get_pool(self.payload_profile, self.object_size).slice(
+            self.object_size - TOKEN_SIZE)
+        return token + bytes(body)
+
+    def run_iteration(self) -> float:
+        """Запись по одному пути и ожидание видимости по другому"""
+        name = self._next_name("vis")
+        data = self._payload(name)
+        if self.direction == WorkloadConfig.VISIBILITY_S3_TO_FS:
+            self.s3.s3_client.put_object(Bucket=self.bucket_name,
+                                         Key=self.key_prefix + name, Body=data)
+            self.restart_latency()
+            self._wait_visible(name, data, self._read_mount)
+        else:
+            with open(self.test_dir / name, 'wb') as f:
+                f.write(data)
+            self.restart_latency()
+            self._wait_visible(name, data, self._read_s3)
+        return len(data)
+
+    def _wait_visible(self, name: str, data: bytes, read):
+        """Опрос с интервалом poll_interval, пока read(name) не вернет data"""
+        deadline = time.perf_counter() + self.timeout
+        while read(name) != data:
+            if time.perf_counter() >= deadline:
+                raise TimeoutError(f"{name} is not visible after {self.timeout:g} s")
+            time.sleep(self.poll_interval)
+
+    def _read_mount(self, name: str):
+        """Содержимое файла в точке монтирования; None - нет или другой размер"""
+        path = self.test_dir / name
+        try:
+            if os.stat(path).st_size != self.object_size:
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _read_s3(self, name: str):
+        """Содержимое объекта через S3 API; None - нет или другой размер"""
+        try:
+            response = self.s3.s3_client.get_object(Bucket=self.bucket_name,
+                                                    Key=self.key_prefix + name)
+        except ClientError as e:
+            if is_not_found(e):
+                return None
+            raise
+        if response['ContentLength'] != self.object_size:
+            response['Body'].close()
+            return None
+        return response['Body'].read()
+
+    def cleanup(self) -> int:
+        """Удаление объектов нагрузки через обе стороны и каталога в точке монтирования"""
+        # Файлы, которые точка монтирования еще не выгрузила, видны только в ней
+        if self.test_dir.is_dir():
+            for path in self.test_dir.iterdir():
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        deleter = BulkDeleter(self.s3.s3_client, self.bucket_name, self.s3.delete_concurrency)
+        try:
+            deleter.delete_prefix(self.key_prefix)
+        except Exception as e:
+            print(f"  Cleanup error: {e}")
+        if deleter.failed:
+            print(f"  Cleanup warning: {deleter.failed} objects were not deleted "
+                  f"({deleter.last_error})")
+        try:
+            self.test_dir.rmdir()
+        except OSError:
+            # Каталог уже исчез вместе с префиксом или еще в кэше точки монтирования
+            pass
+        return deleter.deleted
@@ -3,27 +3,54 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple
 from .base import BenchmarkResult
+from .listing import ListingScale
+from .loadsweep import LoadSweep
+from .phases import PHASES
+from .timeseries import HEATMAP_EDGES_MS, load_samples
 
 
-def generate_all_plots(results: List[BenchmarkResult], output_dir: Path):
+def generate_all_plots(results: List[BenchmarkResult], output_dir: Path,
+                       load_sweeps: List[LoadSweep] = None,
+                       timeseries_path: Path = None,
+                       listing_scales: List[ListingScale] = None):
     """Генерация всех графиков"""
     output_dir.mkdir(parents=True, exist_ok=True)
     
     print("\n📊 Generating plots...")
     
-    # 1. Throughput comparison
-    plot_throughput_comparison(results, output_dir / "01_throughput_comparison.png")
+    if results:
+        # 1. Throughput comparison
+        plot_throughput_comparison(results, output_dir / "01_throughput_comparison.png")
+        
+        # 2. IOPS comparison
+        plot_iops_comparison(results, output_dir / "02_iops_comparison.png")
+        
+        # 3. Latency percentiles
+        plot_latency_percentiles(results, output_dir / "03_latency_percentiles.png")
+        
+        # 4. Overall performance radar
+        plot_performance_radar(results, output_dir / "04_performance_radar.png")
+    
+    # 5. Latency vs offered load (open-loop)
+    if load_sweeps:
+        plot_load_sweeps(load_sweeps, output_dir / "05_latency_vs_offered_load.png")
     
-    # 2. IOPS comparison
-    plot_iops_comparison(results, output_dir / "02_iops_comparison.png")
+    # 6-7. Time series
+    if timeseries_path:
+        series = group_timeseries(load_samples(timeseries_path))
+        if series:
+            plot_throughput_over_time(series, output_dir / "06_throughput_over_time.png")
+            plot_latency_heatmap(series, output_dir / "07_latency_heatmap.png")
     
-    # 3. Latency percentiles
-    plot_latency_percentiles(results, output_dir / "03_latency_percentiles.png")
+    # 8. HTTP phases (native_s3)
+    if any(r.http_phases and r.http_phases['requests'] for r in results):
+        plot_http_phases(results, output_dir / "08_http_phases.png")
     
-    # 4. Overall performance radar
-    plot_performance_radar(results, output_dir / "04_performance_radar.png")
+    # 9. Listing time vs number of entries
+    if listing_scales:
+        plot_listing_scales(listing_scales, output_dir / "09_listing_scaling.png")
     
     print(f"✅ All plots saved to {output_dir}/")
 
@@ -32,10 +59,13 @@ def plot_throughput_comparison(results: List[BenchmarkResult], output_path: Path
     """Сравнение throughput по типам нагрузки"""
     # Группируем по workload
     workloads = {}
+    errors = {}
     for r in results:
         if r.name not in workloads:
             workloads[r.name] = {}
+            errors[r.name] = {}
         workloads[r.name][r.storage_type] = r.throughput_mbps
+        errors[r.name][r.storage_type] = r.throughput_ci_mbps
     
     # Создаем grouped bar chart
     fig, ax = plt.subplots(figsize=(14, 8))
@@ -50,9 +80,12 @@ def plot_throughput_comparison(results: List[BenchmarkResult], output_path: Path
     
     for i, storage in enumerate(storage_types):
         values = [workloads[w].get(storage, 0) for w in workload_names]
+        # 95% интервалы при --repeat
+        cis = [errors[w].get(storage, 0) for w in workload_names]
         offset = width * (i - len(storage_types)/2 + 0.5)
         bars = ax.bar(x + offset, values, width, 
-                     label=storage, color=colors.get(storage, '#95a5a6'))
+                     label=storage, color=colors.get(storage, '#95a5a6'),
+                     yerr=cis if any(cis) else None, capsize=4)
         
         # Добавляем значения над столбцами
         for bar in bars:
@@ -129,10 +162,11 @@ def plot_latency_percentiles(results: List[BenchmarkResult], output_path: Path):
     storage_data = {}
     for r in results:
         if r.storage_type not in storage_data:
-            storage_data[r.storage_type] = {'avg': [], 'p95': [], 'p99': []}
+            storage_data[r.storage_type] = {'avg': [], 'p95': [], 'p99': [], 'p99_ci': []}
         storage_data[r.storage_type]['avg'].append(r.latency_avg_ms)
         storage_data[r.storage_type]['p95'].append(r.latency_p95_ms)
         storage_data[r.storage_type]['p99'].append(r.latency_p99_ms)
+        storage_data[r.storage_type]['p99_ci'].append(r.latency_p99_ci_ms)
     
     fig, ax = plt.subplots(figsize=(12, 7))
     
@@ -146,13 +180,17 @@ def plot_latency_percentiles(results: List[BenchmarkResult], output_path: Path):
     avg_values = [np.mean(storage_data[s]['avg']) for s in storage_types]
     p95_values = [np.mean(storage_data[s]['p95']) for s in storage_types]
     p99_values = [np.mean(storage_data[s]['p99']) for s in storage_types]
+    # Интервал среднего по нагрузкам из интервалов каждой нагрузки (--repeat)
+    p99_cis = [np.sqrt(np.sum(np.square(storage_data[s]['p99_ci']))) / len(storage_data[s]['p99_ci'])
+               for s in storage_types]
     
     bars1 = ax.bar(x - width, avg_values, width, label='Average', 
                    color=[colors_avg.get(s, '#95a5a6') for s in storage_types], alpha=0.8)
     bars2 = ax.bar(x, p95_values, width, label='P95',
                    color=[colors_avg.get(s, '#95a5a6') for s in storage_types], alpha=0.6)
     bars3 = ax.bar(x + width, p99_values, width, label='P99',
-                   color=[colors_avg.get(s, '#95a5a6') for s in storage_types], alpha=0.4)
+                   color=[colors_avg.get(s, '#95a5a6') for s in storage_types], alpha=0.4,
+                   yerr=p99_cis if any(p99_cis) else None, capsize=4)
     
     # Добавляем значения
     for bars in [bars1, bars2, bars3]:
@@ -196,11 +234,11 @@ def plot_performance_radar(results: List[BenchmarkResult], output_path: Path):
     normalized = {}
     for metric in ['Throughput', 'IOPS', 'Latency\n(lower is better)']:
         max_val = max(metrics[s][metric] for s in storage_types)
-        if max_val > 0:
-            for storage in storage_types:
-                if storage not in normalized:
-                    normalized[storage] = []
-                normalized[storage].append(metrics[storage][metric] / max_val)
+        for storage in storage_types:
+            if storage not in normalized:
+                normalized[storage] = []
+            # Нулевая ось (например, все задержки > 100 ms) рисуется в центре
+            normalized[storage].append(metrics[storage][metric] / max_val if max_val > 0 else 0.0)
     
     # Построение радарного графика
     categories = ['Throughput', 'IOPS', 'Latency\n(lower is better)']
@@ -235,3 +273,173 @@ def plot_performance_radar(results: List[BenchmarkResult], output_path: Path):
     plt.savefig(output_path, dpi=150, bbox_inches='tight')
     plt.close()
     print(f"  ✓ {output_path.name}")
+
+
+def plot_load_sweeps(sweeps: List[LoadSweep], output_path: Path):
+    """p99 задержки от заданной интенсивности, с отметкой точки насыщения"""
+    fig, ax = plt.subplots(figsize=(12, 7))
+    
+    colors = {'s3fs': '#e74c3c', 'goofys': '#3498db', 'native_s3': '#2ecc71'}
+    
+    for sweep in sweeps:
+        offered = [p.target_rate for p in sweep.points]
+        p99 = [p.latency_p99_ms for p in sweep.points]
+        color = colors.get(sweep.storage_type, '#95a5a6')
+        ax.plot(offered, p99, 'o-', linewidth=2, color=color,
+               label=f"{sweep.storage_type} / {sweep.name}")
+        if sweep.saturation_rate:
+            ax.axvline(sweep.saturation_rate, color=color, linestyle=':', alpha=0.7)
+    
+    ax.set_xlabel('Offered load (ops/s)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('P99 latency (ms)', fontsize=12, fontweight='bold')
+    ax.set_title('Latency vs Offered Load (dotted lines: saturation)', 
+                fontsize=14, fontweight='bold', pad=20)
+    ax.set_yscale('log')
+    ax.legend(fontsize=10)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    plt.close()
+    print(f"  ✓ {output_path.name}")
+
+
+def group_timeseries(samples: List[Dict]) -> Dict[Tuple[str, str], List[Dict]]:
+    """Окна временного ряда по (storage_type, workload), упорядоченные по времени"""
+    series = {}
+    for sample in samples:
+        key = (sample.get('storage_type', ''), sample.get('workload', ''))
+        series.setdefault(key, []).append(sample)
+    for windows in series.values():
+        windows.sort(key=lambda w: w['window'])
+    return series
+
+
+def plot_throughput_over_time(series: Dict[Tuple[str, str], List[Dict]], output_path: Path):
+    """Throughput и p99 по окнам времени для каждого прогона"""
+    workloads = sorted(set(w for _, w in series))
+    fig, axes = plt.subplots(len(workloads), 1, figsize=(14, 4 * len(workloads)),
+                             squeeze=False, sharex=False)
+    
+    colors = {'s3fs': '#e74c3c', 'goofys': '#3498db', 'native_s3': '#2ecc71'}
+    
+    for ax, workload in zip(axes[:, 0], workloads):
+        latency_ax = ax.twinx()
+        for (storage, w), windows in series.items():
+            if w != workload:
+                continue
+            t = [s['window_start_sec'] for s in windows]
+            color = colors.get(storage, '#95a5a6')
+            ax.plot(t, [s['throughput_mbps'] for s in windows], '-', linewidth=2,
+                   color=color, label=f"{storage} MB/s")
+            latency_ax.plot(t, [s['latency_p99_ms'] for s in windows], ':',
+                           color=color, label=f"{storage} p99")
+        
+        ax.set_title(f'{workload}: throughput over time (solid) and p99 latency (dotted)',
+                    fontsize=12, fontweight='bold')
+        ax.set_xlabel('Time (s)', fontsize=11)
+        ax.set_ylabel('Throughput (MB/s)', fontsize=11)
+        latency_ax.set_ylabel('P99 latency (ms)', fontsize=11)
+        ax.legend(loc='upper left', fontsize=9)
+        latency_ax.legend(loc='upper right', fontsize=9)
+        ax.grid(alpha=0.3, linestyle='--')
+    
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    plt.close()
+    print(f"  ✓ {output_path.name}")
+
+
+def plot_latency_heatmap(series: Dict[Tuple[str, str], List[Dict]], output_path: Path):
+    """Тепловая карта распределения задержек по времени для каждого прогона"""
+    keys = sorted(series)
+    fig, axes = plt.subplots(len(keys), 1, figsize=(14, 3.5 * len(keys)), squeeze=False)
+    
+    for ax, key in zip(axes[:, 0], keys):
+        windows = series[key]
+        counts = np.array([w['latency_heatmap'] for w in windows], dtype=float).T
+        # Пустые строки сверху/снизу не показываем
+        rows = np.nonzero(counts.sum(axis=1))[0]
+        if len(rows) == 0:
+            ax.set_visible(False)
+            continue
+        low, high = rows[0], rows[-1] + 1
+        
+        t0 = windows[0]['window_start_sec']
+        t1 = windows[-1]['window_start_sec'] + windows[-1]['window_sec']
+        image = ax.imshow(np.log1p(counts[low:high]), aspect='auto', origin='lower',
+                          cmap='viridis', interpolation='nearest',
+                          extent=[t0, t1, low, high])
+        ax.set_yticks(np.arange(low, high) + 0.5)
+        ax.set_yticklabels([f"{HEATMAP_EDGES_MS[i]:g}" for i in range(low, high)],
+                           fontsize=8)
+        ax.set_title(f'{key[0]} / {key[1]}: latency distribution over time',
+                    fontsize=12, fontweight='bold')
+        ax.set_xlabel('Time (s)', fontsize=11)
+        ax.set_ylabel('Latency ≥ (ms)', fontsize=11)
+        fig.colorbar(image, ax=ax, label='log(1 + ops)')
+    
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    plt.close()
+    print(f"  ✓ {output_path.name}")
+
+
+def plot_http_phases(results: List[BenchmarkResult], output_path: Path):
+    """Среднее время запроса по фазам (подпись, соединение, сервер, передача)"""
+    traced = [r for r in results if r.http_phases and r.http_phases['requests']]
+    labels = [f"{r.storage_type} / {r.name}" for r in traced]
+    fig, ax = plt.subplots(figsize=(14, max(3, 0.6 * len(traced) + 2)))
+    
+    colors = plt.cm.tab10(np.arange(len(PHASES)))
+    left = np.zeros(len(traced))
+    for phase, color in zip(PHASES, colors):
+        # Вклад фазы в средний запрос: соединение, например, есть не у каждого
+        values = np.array([r.http_phases['phases'].get(phase, {}).get('sum_ms', 0.0)
+                           / r.http_phases['requests'] for r in traced])
+        if not values.any():
+            continue
+        ax.barh(labels, values, left=left, color=color, label=phase)
+        left += values
+    
+    ax.set_xlabel('Mean time per request (ms)', fontsize=12, fontweight='bold')
+    ax.set_title('HTTP request phases (native_s3)', fontsize=14, fontweight='bold', pad=20)
+    ax.invert_yaxis()
+    ax.legend(loc='lower right', fontsize=10)
+    ax.grid(axis='x', alpha=0.3, linestyle='--')
+    
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    plt.close()
+    print(f"  ✓ {output_path.name}")
+
+
+def plot_listing_scales(scales: List[ListingScale], output_path: Path):
+    """p50 времени полного обхода от числа записей (log-log)"""
+    fig, ax = plt.subplots(figsize=(12, 7))
+    
+    colors = {'s3fs': '#e74c3c', 'goofys': '#3498db', 'native_s3': '#2ecc71'}
+    styles = {'flat': 'o-', 'nested': 's--'}
+    
+    for scale in scales:
+        entries = [p.entries for p in scale.points]
+        p50 = [p.result.latency_p50_ms for p in scale.points]
+        label = f"{scale.storage_type} / {scale.layout}"
+        if len(scale.points) > 1:
+            label += f" (N^{scale.scaling_exponent:.2f})"
+        ax.plot(entries, p50, styles.get(scale.layout, 'o-'), linewidth=2,
+               color=colors.get(scale.storage_type, '#95a5a6'), label=label)
+    
+    ax.set_xlabel('Entries in directory / prefix', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Full walk time, p50 (ms)', fontsize=12, fontweight='bold')
+    ax.set_title('Listing scaling: readdir vs ListObjectsV2', fontsize=14,
+                fontweight='bold', pad=20)
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.legend(fontsize=10)
+    ax.grid(True, alpha=0.3, linestyle='--', which='both')
+    
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    plt.close()
+    print(f"  ✓ {output_path.name}")
@@ -11,6 +11,26 @@ class WorkloadConfig:
     # Random I/O
     RANDOM_BLOCK_SIZE = 4 * 1024  # 4 KB
     RANDOM_OPERATIONS = 1000
+    RANDOM_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+    
+    # Режимы случайного чтения для ФС: open/stat/read/close на каждую операцию,
+    # постоянный дескриптор + pread, постоянный mmap
+    RANDOM_READ_REOPEN = "reopen"
+    RANDOM_READ_PREAD = "pread"
+    RANDOM_READ_MMAP = "mmap"
+    RANDOM_READ_MODES = (RANDOM_READ_REOPEN, RANDOM_READ_PREAD, RANDOM_READ_MMAP)
+    
+    # Режимы записи для ФС: до возврата write() в page cache/буфер FUSE,
+    # с fsync перед close (ждем выгрузки в S3), O_DIRECT в обход page cache
+    WRITE_BUFFERED = "buffered"
+    WRITE_FSYNC = "fsync"
+    WRITE_DIRECT = "direct"
+    WRITE_MODES = (WRITE_BUFFERED, WRITE_FSYNC, WRITE_DIRECT)
+    DIRECT_IO_ALIGNMENT = 4096
+    
+    # Холодное чтение: рабочий набор больше page cache и кэша FUSE
+    # (по умолчанию с запасом относительно объема RAM)
+    COLD_READ_RAM_FACTOR = 1.25
     
     # Small Files
     SMALL_FILE_SIZE = 4 * 1024  # 4 KB
@@ -18,6 +38,58 @@ class WorkloadConfig:
     
     # Metadata Operations
     METADATA_OPERATIONS = 5000
+    
+    # Большие объекты (multipart_upload, parallel_read)
+    LARGE_OBJECT_SIZE = 256 * 1024 * 1024  # 256 MB
+    
+    # Multipart Upload (только native S3)
+    MULTIPART_PART_SIZE = 8 * 1024 * 1024  # 8 MB
+    MULTIPART_CONCURRENCY = 8
+    MULTIPART_UPLOADS = 10
+    MULTIPART_SWEEP_PART_SIZES_MB = [5, 8, 16, 32, 64, 128]
+    MULTIPART_SWEEP_CONCURRENCY = [1, 2, 4, 8, 16]
+    
+    # Parallel Read: Range GET запросы (только native S3)
+    PARALLEL_READ_RANGE_SIZE = 8 * 1024 * 1024  # 8 MB
+    PARALLEL_READ_CONCURRENCY = 8
+    PARALLEL_READ_DOWNLOADS = 10
+    PARALLEL_READ_SWEEP_RANGE_SIZES_MB = [1, 4, 8, 16, 32, 64]
+    PARALLEL_READ_SWEEP_CONCURRENCY = [1, 2, 4, 8, 16, 32]
+    
+    # Mixed: смешанные операции над общим набором ключей, популярность по Zipf
+    MIXED_OPERATIONS_MIX = {"get": 0.75, "put": 0.15, "head": 0.05,
+                            "list": 0.01, "delete": 0.04}
+    MIXED_OBJECT_SIZE = 64 * 1024  # 64 KB
+    MIXED_KEYS = 1000
+    MIXED_OPERATIONS = 5000
+    MIXED_POPULARITY = "zipf"
+    MIXED_ZIPF_EXPONENT = 0.99
+    
+    # Listing: полный обход каталога/префикса из N записей (readdir на ФС,
+    # постраничный ListObjectsV2 в S3); nested - подкаталоги по FANOUT записей
+    LISTING_ENTRIES = 10000
+    LISTING_SWEEP_ENTRIES = [1000, 10000, 100000, 1000000]
+    LISTING_FLAT = "flat"
+    LISTING_NESTED = "nested"
+    LISTING_LAYOUTS = (LISTING_FLAT, LISTING_NESTED)
+    LISTING_FANOUT = 1000
+    LISTING_PAGE_SIZE = 1000  # максимум ключей на страницу ListObjectsV2
+    LISTING_WALKS = 10
+    # Потоки заполнения и удаления каталога (миллион пустых объектов)
+    LISTING_SETUP_CONCURRENCY = 32
+    
+    # Visibility: запись через один путь (native S3 или точку монтирования)
+    # и опрос другого, пока объект не появится с нужным размером и содержимым
+    VISIBILITY_S3_TO_FS = "s3_to_fs"
+    VISIBILITY_FS_TO_S3 = "fs_to_s3"
+    VISIBILITY_DIRECTIONS = (VISIBILITY_S3_TO_FS, VISIBILITY_FS_TO_S3)
+    VISIBILITY_OBJECT_SIZE = 4 * 1024  # 4 KB
+    VISIBILITY_OBJECTS = 100
+    VISIBILITY_POLL_INTERVAL = 0.01  # 10 ms - разрешение измерения задержки
+    VISIBILITY_TIMEOUT = 60.0
+    
+    # Cleanup: пакеты delete_objects в полете одновременно
+    DELETE_CONCURRENCY = 8
 
 
 class WorkloadType:
@@ -27,3 +99,13 @@ class WorkloadType:
     RANDOM_IO = "random_io"
     SMALL_FILES = "small_files"
     METADATA_OPS = "metadata_ops"
+    MULTIPART_UPLOAD = "multipart_upload"
+    PARALLEL_READ = "parallel_read"
+    MIXED = "mixed"
+    LISTING = "listing"
+    VISIBILITY = "visibility"
+    
+    # Нагрузки, которые есть только у native S3 API
+    NATIVE_S3_ONLY = (MULTIPART_UPLOAD, PARALLEL_READ)
+    # Нагрузки, которым нужна точка монтирования (и native S3 клиент)
+    MOUNT_ONLY = (VISIBILITY,)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Сравнение прогона с базовым по истории результатов (history.db).
+Код возврата 1, если найдена регрессия throughput или p99.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Добавляем путь к benchmark модулю
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark.history import (
+    DEFAULT_CONFIDENCE, DEFAULT_RESAMPLES, DEFAULT_THRESHOLD,
+    ResultsDatabase, compare_runs, fingerprint_diff
+)
+
+DEFAULT_DB = Path('benchmark_results') / 'history.db'
+
+
+def print_runs(db: ResultsDatabase, limit: int):
+    """Список последних прогонов"""
+    print(f"{'ID':>5}  {'Timestamp':16}  {'Results':>7}  {'Version':14}  {'Host':16}  Label")
+    for run in db.list_runs(limit):
+        print(f"{run['id']:>5}  {run['timestamp']:16}  {run['results']:>7}  "
+              f"{run['version'] or '-':14}  {run['host'] or '-':16}  {run['label'] or ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare a benchmark run against a baseline',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Latest run vs the previous one
+  python3 compare.py
+
+  # Explicit runs, fail on >10% throughput drop or p99 growth
+  python3 compare.py --baseline 12 --run 15 --threshold 0.10
+
+  # List stored runs
+  python3 compare.py --list
+        """
+    )
+    parser.add_argument('--db', default=str(DEFAULT_DB),
+                       help='History database (default: benchmark_results/history.db)')
+    parser.add_argument('--list', action='store_true',
+                       help='List stored runs and exit')
+    parser.add_argument('--limit', type=int, default=20,
+                       help='Number of runs shown by --list')
+    parser.add_argument('--baseline', type=int, default=None,
+                       help='Baseline run id (default: the run before --run)')
+    parser.add_argument('--run', type=int, default=None,
+                       help='Run id to check (default: the latest run)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                       help='Tolerated relative degradation, e.g. 0.05 = 5%%')
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE,
+                       help='Confidence level of the bootstrap intervals')
+    parser.add_argument('--resamples', type=int, default=DEFAULT_RESAMPLES,
+                       help='Bootstrap resamples')
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ History database not found: {args.db}")
+        sys.exit(2)
+
+    with ResultsDatabase(args.db) as db:
+        if args.list:
+            print_runs(db, args.limit)
+            return
+
+        run_id = args.run or next(iter(db.latest_run_ids(1)), None)
+        baseline_id = args.baseline
+        if baseline_id is None and run_id is not None:
+            earlier = [i for i in db.latest_run_ids(1000) if i < run_id]
+            baseline_id = earlier[0] if earlier else None
+        candidate = db.load_run(run_id) if run_id else None
+        baseline = db.load_run(baseline_id) if baseline_id else None
+        if candidate is None or baseline is None:
+            print("❌ Need two runs to compare (see --list)")
+            sys.exit(2)
+
+    print("=" * 80)
+    print(f"COMPARE: run {candidate.id} ({candidate.timestamp}) vs "
+          f"baseline {baseline.id} ({baseline.timestamp})")
+    print("=" * 80)
+
+    changes = fingerprint_diff(baseline.fingerprint, candidate.fingerprint)
+    if changes:
+        print("Environment changes:")
+        for line in changes:
+            print(f"  • {line}")
+        print()
+
+    comparisons = compare_runs(baseline, candidate, threshold=args.threshold,
+                               confidence=args.confidence, resamples=args.resamples)
+    if not comparisons:
+        print("⚠️  No common workloads between the runs")
+        sys.exit(2)
+
+    ci = f"{args.confidence:.0%} CI"
+    print(f"{'Workload':28} {'Storage':10} {'Metric':15} {'Baseline':>10} {'Run':>10} "
+          f"{'Change':>8}  {ci}")
+    print("-" * 100)
+    for c in comparisons:
+        interval = (f"[{c.ci_low:+.1%}, {c.ci_high:+.1%}]" if c.bootstrapped
+                    else "(no samples)")
+        mark = "❌" if c.regression else "  "
+        print(f"{c.name[:28]:28} {c.storage_type:10} {c.metric:15} {c.baseline:10.2f} "
+              f"{c.candidate:10.2f} {c.change:+8.1%}  {interval} {mark}")
+
+    regressions = [c for c in comparisons if c.regression]
+    print()
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,32 @@
 #!/usr/bin/env python3
 """
-Демонстрация работы benchmark framework с мок-данными
-Запускается без настоящего S3 для проверки функционала
+Демонстрация работы benchmark framework без настоящего S3.
+
+По умолчанию native_s3 нагрузки выполняются по-настоящему против
+встроенного S3-совместимого сервера (benchmark/s3server.py) с эмуляцией
+сетевой задержки и полосы. --mock - сгенерированные данные для всех
+трех типов хранилищ (FUSE без монтирования не запустить).
 """
 
+import argparse
 import sys
 from pathlib import Path
 
 # Добавляем путь к benchmark модулю
 sys.path.insert(0, str(Path(__file__).parent))
 
-from benchmark import MetricsCollector, generate_all_plots
+from benchmark import MetricsCollector, NativeS3Benchmark, generate_all_plots
 from benchmark.base import BenchmarkResult
+from benchmark.s3server import LocalS3Process
 from benchmark.workloads import WorkloadType
 import random
 
+# Параметры эмуляции сети для живого демо и итерации на нагрузку
+DEMO_LATENCY_MS = 2.0
+DEMO_BANDWIDTH_MBPS = 200.0
+DEMO_ITERATIONS = 50
+DEMO_CONCURRENCY = 4
+
 
 def generate_mock_results():
     """Генерация мок-данных для демонстрации"""
@@ -91,6 +103,7 @@ def generate_mock_results():
             latency_avg = baseline['latency'] * profile['latency_mult'] * noise
             latency_p95 = latency_avg * 1.6
             latency_p99 = latency_avg * 2.2
+            latency_p999 = latency_avg * 3.5
             
             result = BenchmarkResult(
                 name=workload,
@@ -102,7 +115,11 @@ def generate_mock_results():
                 latency_p99_ms=latency_p99,
                 errors=0,
                 total_time_sec=100.0 / iops if iops > 0 else 10.0,
-                iterations=100
+                iterations=100,
+                latency_p50_ms=latency_avg * 0.9,
+                latency_p90_ms=latency_avg * 1.4,
+                latency_p999_ms=latency_p999,
+                latency_max_ms=latency_p999 * 1.2
             )
             
             results.append(result)
@@ -110,17 +127,51 @@ def generate_mock_results():
     return results
 
 
+def run_live_results():
+    """Настоящие native_s3 прогоны против встроенного S3 сервера"""
+    
+    workloads = [
+        WorkloadType.SEQUENTIAL_WRITE,
+        WorkloadType.SEQUENTIAL_READ,
+        WorkloadType.RANDOM_IO,
+        WorkloadType.SMALL_FILES,
+        WorkloadType.METADATA_OPS
+    ]
+    
+    results = []
+    with LocalS3Process(latency_ms=DEMO_LATENCY_MS,
+                        bandwidth_mbps=DEMO_BANDWIDTH_MBPS,
+                        buckets=['demo']) as server:
+        print(f"🧪 Local S3 server: {server.endpoint_url} "
+              f"({DEMO_LATENCY_MS:g} ms, {DEMO_BANDWIDTH_MBPS:g} MB/s)")
+        for workload in workloads:
+            benchmark = NativeS3Benchmark('demo', workload,
+                                          endpoint_url=server.endpoint_url,
+                                          access_key='demo', secret_key='demo')
+            results.append(benchmark.run(iterations=DEMO_ITERATIONS,
+                                         concurrency=DEMO_CONCURRENCY))
+    return results
+
+
 def main():
+    parser = argparse.ArgumentParser(description='S3 benchmark demo without a real S3')
+    parser.add_argument('--mock', action='store_true',
+                       help='Use generated results for s3fs, goofys and native_s3 '
+                            'instead of live native_s3 runs against the built-in server')
+    args = parser.parse_args()
+    
     print("=" * 80)
     print("S3 STORAGE BENCHMARK - DEMO MODE")
     print("=" * 80)
-    print("Generating mock results to demonstrate framework functionality...")
+    if args.mock:
+        print("Generating mock results to demonstrate framework functionality...")
+    else:
+        print("Running native_s3 workloads against the built-in local S3 server...")
     print("(Run with real S3 endpoint for actual benchmarks)")
     print("=" * 80)
     print()
     
-    # Генерация мок-данных
-    results = generate_mock_results()
+    results = generate_mock_results() if args.mock else run_live_results()
     
     # Инициализация сборщика метрик
     collector = MetricsCollector()
@@ -3,8 +3,10 @@
 S3 Storage Benchmark Tool
 Сравнение производительности s3fs, goofys и native S3 API
 """
+import atexit
 import os
 import sys
+import time
 import argparse
 from pathlib import Path
 
@@ -12,10 +14,42 @@ from benchmark import (
     FilesystemBenchmark,
     NativeS3Benchmark,
     MetricsCollector,
-    generate_all_plots
+    generate_all_plots,
+    run_multiprocess
 )
+from benchmark import payload
+from benchmark.arrival import ArrivalSchedule
+from benchmark.clients import CLIENT_PROFILES, client_config, describe_config
+from benchmark.distributed import run_distributed
+from benchmark.filesystem import WRITE_WORKLOADS, cold_read_working_set
+from benchmark.history import ResultsDatabase, environment_fingerprint
+from benchmark.listing import sweep_listing
+from benchmark.live import DEFAULT_HOST as METRICS_HOST, MetricsServer
+from benchmark.loadsweep import sweep_offered_load
+from benchmark.matrix import MatrixCell, ResultCache, expand_matrix, run_matrix
+from benchmark.repetition import DEFAULT_MIN_REPEATS, DEFAULT_TARGET_CI, run_repeated
+from benchmark.resources import DEFAULT_INTERVAL_SEC as RESOURCE_INTERVAL_SEC
+from benchmark.s3server import LocalS3Process
+from benchmark.spec import KeyPopularity, WorkloadSpec, load_specs, mixed_spec, parse_mix, parse_size
+from benchmark.timeseries import TimeSeriesSampler
+from benchmark.tuning import sweep_configurations
+from benchmark.visibility import VisibilityBenchmark
 from benchmark.workloads import WorkloadType, WorkloadConfig
 
+MB = 1024 * 1024
+
+# Встроенные нагрузки по умолчанию
+DEFAULT_WORKLOADS = [
+    WorkloadType.SEQUENTIAL_WRITE,
+    WorkloadType.SEQUENTIAL_READ,
+    WorkloadType.RANDOM_IO,
+    WorkloadType.SMALL_FILES,
+    WorkloadType.METADATA_OPS,
+]
+
+# Верхняя граница итераций для прогонов по времени
+UNBOUNDED_ITERATIONS = 10 ** 12
+
 
 def check_mount_points(s3fs_mount: str = None, goofys_mount: str = None):
     """Проверка доступности точек монтирования"""
@@ -38,14 +72,40 @@ def check_mount_points(s3fs_mount: str = None, goofys_mount: str = None):
     return issues
 
 
-def run_workload(storage_type: str, workload_type: str, 
-                mount_point: str = None, bucket_name: str = None,
-                endpoint_url: str = None, iterations: int = 100,
-                access_key: str = None, secret_key: str = None,
-    ):
-    """Запуск одной нагрузки для одного типа хранилища"""
+def create_benchmark(storage_type: str, workload_type: str,
+                     mount_point: str = None, bucket_name: str = None,
+                     endpoint_url: str = None,
+                     access_key: str = None, secret_key: str = None,
+                     s3_options: dict = None, fs_options: dict = None,
+                     resource_interval: float = RESOURCE_INTERVAL_SEC):
+    """Создание бенчмарка для типа хранилища (None, если не настроено)"""
     
-    if storage_type in ['s3fs', 'goofys']:
+    if workload_type in WorkloadType.NATIVE_S3_ONLY and storage_type != 'native_s3':
+        print(f"⚠️  Skipping {storage_type}/{workload_type}: native S3 only workload")
+        return None
+    if workload_type in WorkloadType.MOUNT_ONLY and storage_type not in ['s3fs', 'goofys']:
+        print(f"⚠️  Skipping {storage_type}/{workload_type}: s3fs/goofys only workload")
+        return None
+    
+    if workload_type == WorkloadType.VISIBILITY:
+        if not mount_point or not bucket_name:
+            print(f"⚠️  Skipping {storage_type}/{workload_type}: "
+                  f"mount point and bucket name are both required")
+            return None
+        
+        # Запись/чтение через native S3 с теми же настройками клиента
+        benchmark = VisibilityBenchmark(
+            storage_type=storage_type,
+            mount_point=mount_point,
+            bucket_name=bucket_name,
+            endpoint_url=endpoint_url,
+            access_key=access_key,
+            secret_key=secret_key,
+            s3_options=s3_options,
+            **{k: v for k, v in (fs_options or {}).items()
+               if k in VisibilityBenchmark.OPTIONS}
+        )
+    elif storage_type in ['s3fs', 'goofys']:
         if not mount_point:
             print(f"⚠️  Skipping {storage_type}/{workload_type}: mount point not provided")
             return None
@@ -53,7 +113,8 @@ def run_workload(storage_type: str, workload_type: str,
         benchmark = FilesystemBenchmark(
             storage_type=storage_type,
             mount_point=mount_point,
-            workload_type=workload_type
+            workload_type=workload_type,
+            **(fs_options or {})
         )
     elif storage_type == 'native_s3':
         if not bucket_name:
@@ -65,28 +126,147 @@ def run_workload(storage_type: str, workload_type: str,
             workload_type=workload_type,
             endpoint_url=endpoint_url,
             access_key=access_key,
-            secret_key=secret_key
+            secret_key=secret_key,
+            **(s3_options or {})
         )
     else:
         print(f"❌ Unknown storage type: {storage_type}")
         return None
     
-    # Определяем количество итераций в зависимости от workload
+    benchmark.resource_interval = resource_interval
+    return benchmark
+
+
+def workload_iterations(workload_type: str, iterations: int) -> int:
+    """Количество итераций в зависимости от workload"""
     if workload_type == WorkloadType.SEQUENTIAL_WRITE:
-        iters = min(iterations, WorkloadConfig.SEQUENTIAL_FILES)
+        return min(iterations, WorkloadConfig.SEQUENTIAL_FILES)
     elif workload_type == WorkloadType.SEQUENTIAL_READ:
-        iters = min(iterations, WorkloadConfig.SEQUENTIAL_FILES)
+        return min(iterations, WorkloadConfig.SEQUENTIAL_FILES)
     elif workload_type == WorkloadType.RANDOM_IO:
-        iters = min(iterations, WorkloadConfig.RANDOM_OPERATIONS)
+        return min(iterations, WorkloadConfig.RANDOM_OPERATIONS)
     elif workload_type == WorkloadType.SMALL_FILES:
-        iters = min(iterations, WorkloadConfig.SMALL_FILES_COUNT)
+        return min(iterations, WorkloadConfig.SMALL_FILES_COUNT)
     elif workload_type == WorkloadType.METADATA_OPS:
-        iters = min(iterations, WorkloadConfig.METADATA_OPERATIONS)
-    else:
-        iters = iterations
+        return min(iterations, WorkloadConfig.METADATA_OPERATIONS)
+    elif workload_type == WorkloadType.MULTIPART_UPLOAD:
+        return min(iterations, WorkloadConfig.MULTIPART_UPLOADS)
+    elif workload_type == WorkloadType.PARALLEL_READ:
+        return min(iterations, WorkloadConfig.PARALLEL_READ_DOWNLOADS)
+    elif workload_type == WorkloadType.MIXED:
+        return min(iterations, WorkloadConfig.MIXED_OPERATIONS)
+    elif workload_type == WorkloadType.LISTING:
+        return min(iterations, WorkloadConfig.LISTING_WALKS)
+    elif workload_type == WorkloadType.VISIBILITY:
+        return min(iterations, WorkloadConfig.VISIBILITY_OBJECTS)
+    return iterations
+
+
+def workload_runs(storage_type: str, workloads: list, read_modes: list,
+                  write_modes: list, cold_read_bytes: int = 0,
+                  specs: list = (), mixed: WorkloadSpec = None,
+                  visibility: list = ()) -> list:
+    """
+    Список прогонов (workload, подпись, параметры ФС, спецификация) для
+    хранилища. На ФС random_io выполняется в каждом режиме чтения, а
+    нагрузки записи - в каждом режиме записи отдельно, visibility - в
+    каждом направлении (visibility - параметры по направлениям).
+    Нагрузки из спецификаций идут после встроенных.
+    """
+    runs = []
+    for workload_type in workloads:
+        if workload_type == WorkloadType.MIXED:
+            runs.append((workload_type, workload_type, {}, mixed))
+            continue
+        if storage_type in ['s3fs', 'goofys'] and workload_type == WorkloadType.VISIBILITY:
+            for options in visibility:
+                runs.append((workload_type, f"{workload_type}_{options['direction']}",
+                             options, None))
+            continue
+        if storage_type not in ['s3fs', 'goofys']:
+            variants = [{}]
+        elif workload_type == WorkloadType.RANDOM_IO:
+            variants = [{'read_mode': mode} for mode in read_modes]
+        elif workload_type in WRITE_WORKLOADS:
+            variants = [{'write_mode': mode} for mode in write_modes]
+        else:
+            variants = [{}]
+        for variant in variants:
+            label = workload_type
+            if storage_type in ['s3fs', 'goofys']:
+                label = FilesystemBenchmark.result_name(workload_type,
+                                                        cold_read_bytes=cold_read_bytes,
+                                                        **variant)
+            runs.append((workload_type, label, variant, None))
+    for spec in specs:
+        runs.append((spec.name, spec.name, {}, spec))
+    return runs
+
+
+def spec_run_plan(spec: WorkloadSpec, rate: float = None):
+    """(итерации, длительность) для нагрузки по спецификации"""
+    if spec.ops:
+        return spec.ops, spec.duration_sec
+    if rate:
+        # Open-loop: число операций определяется интенсивностью
+        return max(1, int(rate * spec.duration_sec)), None
+    return UNBOUNDED_ITERATIONS, spec.duration_sec
+
+
+def run_workload(storage_type: str, workload_type: str, 
+                mount_point: str = None, bucket_name: str = None,
+                endpoint_url: str = None, iterations: int = 100,
+                access_key: str = None, secret_key: str = None,
+                concurrency: int = 1, processes: int = 1,
+                rate: float = None, arrival: str = ArrivalSchedule.FIXED,
+                sampler: TimeSeriesSampler = None, s3_options: dict = None,
+                fs_options: dict = None, duration: float = None,
+                warmup: int = 0, warmup_sec: float = None,
+                steady_state: bool = False,
+                resource_interval: float = RESOURCE_INTERVAL_SEC,
+                workers: list = None,
+    ):
+    """
+    Запуск одной нагрузки для одного типа хранилища
+    (workers - узлы worker.py, см. distributed.py)
+    """
+    
+    benchmark = create_benchmark(storage_type, workload_type, mount_point,
+                                 bucket_name, endpoint_url, access_key, secret_key,
+                                 s3_options, fs_options, resource_interval)
+    if benchmark is None:
+        return None
+    
+    iters = workload_iterations(workload_type, iterations)
     
     try:
-        result = benchmark.run(iterations=iters)
+        if workers:
+            # Узлы создают бенчмарк сами, credentials у каждого свои
+            options = {
+                'storage_type': storage_type,
+                'workload_type': workload_type,
+                'mount_point': mount_point,
+                'bucket_name': bucket_name,
+                'endpoint_url': endpoint_url,
+                's3_options': s3_options,
+                'fs_options': fs_options,
+                'resource_interval': resource_interval,
+            }
+            result = run_distributed(benchmark, workers, options, iterations=iters,
+                                     concurrency=concurrency, rate=rate, arrival=arrival,
+                                     sampler=sampler, duration=duration, warmup=warmup,
+                                     warmup_sec=warmup_sec, steady_state=steady_state)
+        elif processes > 1:
+            result = run_multiprocess(benchmark, iterations=iters,
+                                      processes=processes, concurrency=concurrency,
+                                      rate=rate, arrival=arrival, sampler=sampler,
+                                      duration=duration, warmup=warmup,
+                                      warmup_sec=warmup_sec, steady_state=steady_state)
+        else:
+            result = benchmark.run(iterations=iters, concurrency=concurrency,
+                                   rate=rate, arrival=arrival, sampler=sampler,
+                                   duration=duration, warmup=warmup,
+                                   warmup_sec=warmup_sec, steady_state=steady_state)
         return result
     except Exception as e:
         print(f"❌ Error running {storage_type}/{workload_type}: {e}")
@@ -95,6 +275,117 @@ def run_workload(storage_type: str, workload_type: str,
         return None
 
 
+def run_transfer_sweep(storage_type: str, workload_type: str, grid: dict,
+                       iterations: int, concurrency: int, s3_options: dict,
+                       duration: float = None, **benchmark_kwargs):
+    """Перебор параметров передачи (размер части, параллельность) для нагрузки"""
+    
+    def make_benchmark(**parameters):
+        return create_benchmark(storage_type, workload_type,
+                                s3_options={**s3_options, **parameters},
+                                **benchmark_kwargs)
+    
+    if make_benchmark() is None:
+        return None
+    
+    try:
+        return sweep_configurations(make_benchmark, grid, iterations, concurrency,
+                                    duration=duration)
+    except Exception as e:
+        print(f"❌ Error tuning {storage_type}/{workload_type}: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def run_matrix_cell(cell: MatrixCell, mount_points: dict, s3_options: dict,
+                    fs_options: dict, mixed: WorkloadSpec = None,
+                    sample_interval: float = 0, timeseries_file: Path = None,
+                    repeat: dict = None, **run_kwargs):
+    """Прогон одной ячейки матрицы (repeat - параметры run_repeated)"""
+    s3_options = dict(s3_options)
+    fs_options = dict(fs_options)
+    if cell.object_size:
+        s3_options['object_size'] = cell.object_size
+        fs_options['object_size'] = cell.object_size
+    if cell.part_size:
+        s3_options['part_size'] = cell.part_size
+    if cell.workload == WorkloadType.MIXED and mixed is not None:
+        s3_options['spec'] = fs_options['spec'] = mixed
+    
+    def run_once(index):
+        return run_workload(
+            storage_type=cell.storage_type,
+            workload_type=cell.workload,
+            mount_point=mount_points.get(cell.storage_type),
+            concurrency=cell.concurrency,
+            sampler=repeat_sampler(index, sample_interval, timeseries_file,
+                                   {'storage_type': cell.storage_type, 'workload': cell.label},
+                                   run_kwargs.get('steady_state', False)),
+            s3_options=s3_options,
+            fs_options=fs_options,
+            **run_kwargs
+        )
+    
+    return run_repeated(run_once, **repeat) if repeat else run_once(0)
+
+
+def repeat_sampler(index: int, sample_interval: float, timeseries_file: Path,
+                   labels: dict, steady_state: bool = False):
+    """
+    Сэмплер повтора: временной ряд в файл пишет только первый повтор,
+    у остальных окна нужны лишь для throughput_windows (и --steady-state)
+    """
+    if sample_interval <= 0:
+        return None
+    return TimeSeriesSampler(timeseries_file if index == 0 else None,
+                             window_sec=sample_interval, labels=labels,
+                             keep_histograms=steady_state)
+
+
+def run_listing_scale(storage_type: str, layout: str, entries: list,
+                      iterations: int, concurrency: int, s3_options: dict,
+                      fs_options: dict, **benchmark_kwargs):
+    """Время полного обхода каталога/префикса для каждого числа записей"""
+    
+    def make_benchmark(count):
+        listing = {'listing_entries': count, 'listing_layout': layout}
+        return create_benchmark(storage_type, WorkloadType.LISTING,
+                                s3_options={**s3_options, **listing},
+                                fs_options={**fs_options, **listing},
+                                **benchmark_kwargs)
+    
+    if make_benchmark(min(entries)) is None:
+        return None
+    
+    try:
+        return sweep_listing(make_benchmark, entries, iterations, concurrency, layout)
+    except Exception as e:
+        print(f"❌ Error listing {storage_type}/{layout}: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def run_load_sweep(storage_type: str, workload_type: str, rates, 
+                   step_duration: float, concurrency: int,
+                   arrival: str, **benchmark_kwargs):
+    """Поиск точки насыщения для одного типа хранилища"""
+    
+    benchmark = create_benchmark(storage_type, workload_type, **benchmark_kwargs)
+    if benchmark is None:
+        return None
+    
+    try:
+        return sweep_offered_load(benchmark, rates, step_duration_sec=step_duration,
+                                  concurrency=concurrency, arrival=arrival)
+    except Exception as e:
+        print(f"❌ Error sweeping {storage_type}/{workload_type}: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
 def main():
     ACCESS_KEY = os.getenv("AWS_ACCESS_KEY_ID", "minioadmin")
     SECRET_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "minioadmin")
@@ -111,6 +402,86 @@ Examples:
   python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
       --storage native_s3
 
+  # 64 parallel clients
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 --concurrency 64
+
+  # 8 processes x 16 threads (bypass the GIL on the client side)
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 --processes 8 --concurrency 16
+
+  # Open-loop: 200 ops/s Poisson arrivals, latency from intended start
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 --concurrency 32 --rate 200 --arrival poisson
+
+  # Find the saturation point of each storage type
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 --workloads small_files --concurrency 64 \\
+      --sweep-rates 50 100 200 400 800 1600
+
+  # Multipart upload: sweep part size and part concurrency
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 --workloads multipart_upload \\
+      --part-size-mb 5 8 16 32 64 128 --part-concurrency 1 2 4 8 16
+
+  # Separate FUSE metadata cost from data path in random reads
+  python3 main.py --bucket benchmark --goofys-mount /mnt/goofys \\
+      --storage goofys --workloads random_io --read-modes reopen pread mmap
+
+  # Honest writes (wait for upload) and cold reads past all caches
+  python3 main.py --bucket benchmark --s3fs-mount /mnt/s3fs --storage s3fs \\
+      --workloads sequential_write sequential_read \\
+      --write-modes buffered fsync direct --cold-read
+
+  # Compressible data with varied object sizes (512 KB .. 1.5 MB)
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 --workloads sequential_write --payload text --size-spread 0.5
+
+  # Ranged-GET download: default range size x concurrency grid
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 --workloads parallel_read --transfer-sweep
+
+  # Production mix from a spec file (see workloads/*.json)
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 --spec workloads/read_heavy.json
+
+  # 80/20 read/write mix over Zipf-popular keys (cache-friendly skew)
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 goofys --goofys-mount /mnt/goofys --workloads mixed \\
+      --mix get=0.8,put=0.2 --key-distribution zipf --zipf-exponent 1.1
+
+  # Overnight matrix: storage x workload x size x concurrency x part size;
+  # re-running the same command skips cells already in the cache
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 goofys --goofys-mount /mnt/goofys \\
+      --workloads sequential_write multipart_upload \\
+      --matrix-sizes 4KB 1MB 64MB --matrix-concurrency 1 8 32 --matrix-part-mb 8 32
+
+  # No MinIO needed: built-in S3 server with 5 ms latency and 100 MB/s links
+  python3 main.py --bucket benchmark --storage native_s3 --local-s3 \\
+      --local-s3-latency-ms 5 --local-s3-bandwidth-mbps 100
+
+  # Repeat each workload (3..10 times) until the 95% CI is within +-5%,
+  # drop outlier runs and test whether the winner is significant
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 goofys --goofys-mount /mnt/goofys --repeat-max 10
+
+  # Warm up connections/caches for 10 s, then drop the transient before
+  # throughput settles
+  python3 main.py --bucket benchmark --goofys-mount /mnt/goofys \\
+      --storage goofys --workloads sequential_read --warmup-sec 10 --steady-state
+
+  # Connection pool sizing: pool size x concurrency with one shared client;
+  # reports where throughput stops improving and connections opened
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 --workloads small_files --client-profile standard \\
+      --pool-sweep 1 2 4 8 16 32 --pool-sweep-concurrency 8 32
+
+  # Check a FUSE/MinIO upgrade: compare the latest run with the previous one
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 --run-label "minio 2024-06"
+  python3 compare.py --threshold 0.05
+
   # Specific workloads
   python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
       --storage native_s3 --workloads sequential_write sequential_read
@@ -121,6 +492,15 @@ Examples:
                        help='S3 bucket name')
     parser.add_argument('--endpoint', default=None,
                        help='S3 endpoint URL (e.g., http://localhost:9000)')
+    parser.add_argument('--local-s3', action='store_true',
+                       help='Start the built-in S3-compatible server (separate '
+                            'process) and benchmark against it instead of --endpoint')
+    parser.add_argument('--local-s3-dir', default=None,
+                       help='Store --local-s3 objects in this directory (default: memory)')
+    parser.add_argument('--local-s3-latency-ms', type=float, default=0.0,
+                       help='Latency injected by --local-s3 into every request')
+    parser.add_argument('--local-s3-bandwidth-mbps', type=float, default=0.0,
+                       help='Per-connection bandwidth limit of --local-s3, MB/s (0 = unlimited)')
     parser.add_argument('--s3fs-mount', default=None,
                        help='s3fs mount point (e.g., /mnt/s3fs)')
     parser.add_argument('--goofys-mount', default=None,
@@ -129,31 +509,286 @@ Examples:
                        choices=['s3fs', 'goofys', 'native_s3'],
                        default=['native_s3'],
                        help='Storage types to benchmark')
+    parser.add_argument('--spec', nargs='+', default=[], metavar='FILE',
+                       help='Workload spec files (JSON, or YAML with PyYAML); '
+                            'without --workloads only the specs are run')
     parser.add_argument('--workloads', nargs='+',
                        choices=[
                            WorkloadType.SEQUENTIAL_WRITE,
                            WorkloadType.SEQUENTIAL_READ,
                            WorkloadType.RANDOM_IO,
                            WorkloadType.SMALL_FILES,
-                           WorkloadType.METADATA_OPS
+                           WorkloadType.METADATA_OPS,
+                           WorkloadType.MULTIPART_UPLOAD,
+                           WorkloadType.PARALLEL_READ,
+                           WorkloadType.MIXED,
+                           WorkloadType.LISTING,
+                           WorkloadType.VISIBILITY
                        ],
-                       default=[
-                           WorkloadType.SEQUENTIAL_WRITE,
-                           WorkloadType.SEQUENTIAL_READ,
-                           WorkloadType.RANDOM_IO,
-                           WorkloadType.SMALL_FILES,
-                           WorkloadType.METADATA_OPS
-                       ],
-                       help='Workload types to run')
+                       default=None,
+                       help='Workload types to run (default: sequential_write '
+                            'sequential_read random_io small_files metadata_ops)')
     parser.add_argument('--iterations', type=int, default=100,
                        help='Number of iterations per workload')
+    parser.add_argument('--concurrency', type=int, default=None,
+                       help='Number of parallel worker threads per workload '
+                            '(default: 1, or the spec concurrency for --spec)')
+    parser.add_argument('--processes', type=int, default=1,
+                       help='Number of worker processes (0 = one per CPU core); '
+                            '--concurrency threads run in each process')
+    parser.add_argument('--rate', type=float, default=None,
+                       help='Open-loop mode: target rate in ops/s '
+                            '(latency is measured from the intended start)')
+    parser.add_argument('--arrival', choices=list(ArrivalSchedule.KINDS),
+                       default=ArrivalSchedule.FIXED,
+                       help='Arrival process for open-loop mode')
+    parser.add_argument('--sweep-rates', type=float, nargs='+', default=None,
+                       help='Sweep offered load over these rates (ops/s) and '
+                            'report the saturation point')
+    parser.add_argument('--step-duration', type=float, default=10.0,
+                       help='Duration of each --sweep-rates step in seconds')
+    parser.add_argument('--matrix-sizes', nargs='+', default=None, metavar='SIZE',
+                       help='Matrix mode: object sizes, e.g. 4KB 1MB 64MB '
+                            '(cross product with --storage, --workloads and '
+                            'the other --matrix-* values)')
+    parser.add_argument('--matrix-concurrency', type=int, nargs='+', default=None,
+                       help='Matrix mode: concurrency levels')
+    parser.add_argument('--matrix-part-mb', type=int, nargs='+', default=None,
+                       help='Matrix mode: multipart_upload part sizes in MB')
+    parser.add_argument('--matrix-cache', default=None, metavar='DIR',
+                       help='Cache of completed matrix cells; re-running the same '
+                            'matrix skips them (default: <output-dir>/matrix_cache)')
+    parser.add_argument('--repeat-max', type=int, default=None, metavar='N',
+                       help='Repeat each workload up to N times until the 95%% CI '
+                            'of mean throughput and p99 is within --target-ci; '
+                            'outlier runs are excluded')
+    parser.add_argument('--repeat-min', type=int, default=DEFAULT_MIN_REPEATS,
+                       help='Minimum repeats with --repeat-max')
+    parser.add_argument('--target-ci', type=float, default=DEFAULT_TARGET_CI,
+                       help='Target CI half-width relative to the mean, e.g. 0.05 = 5%%')
+    parser.add_argument('--warmup', type=int, default=0, metavar='N',
+                       help='Run N untimed iterations per workload before measuring '
+                            '(split across threads and processes)')
+    parser.add_argument('--warmup-sec', type=float, default=None, metavar='SEC',
+                       help='Warm up for SEC seconds before measuring '
+                            '(with --warmup: whichever ends first)')
+    parser.add_argument('--steady-state', action='store_true',
+                       help='Detect when windowed throughput stabilizes (MSER) and '
+                            'exclude the transient from the results '
+                            '(uses the --sample-interval windows)')
+    parser.add_argument('--part-size-mb', type=int, nargs='+', default=None,
+                       help='multipart_upload part size in MB (5-128); '
+                            'several values run a sweep')
+    parser.add_argument('--part-concurrency', type=int, nargs='+', default=None,
+                       help='multipart_upload parts in flight per upload; '
+                            'several values run a sweep')
+    parser.add_argument('--range-size-mb', type=int, nargs='+', default=None,
+                       help='parallel_read range size in MB; '
+                            'several values run a sweep')
+    parser.add_argument('--range-concurrency', type=int, nargs='+', default=None,
+                       help='parallel_read ranges in flight per download; '
+                            'several values run a sweep')
+    parser.add_argument('--transfer-sweep', action='store_true',
+                       help='Sweep the default part/range size x concurrency grid '
+                            'for multipart_upload and parallel_read')
+    parser.add_argument('--object-mb', type=int, default=None,
+                       help='Object size in MB (default: per workload, '
+                            '256 for multipart_upload and parallel_read)')
+    parser.add_argument('--client-profile', choices=list(CLIENT_PROFILES), default='default',
+                       help='native_s3 client configuration: default (botocore), '
+                            'standard / adaptive retries with keep-alive, fail-fast')
+    parser.add_argument('--max-pool-connections', type=int, default=None,
+                       help='native_s3 connection pool size per client '
+                            '(default: enough for part/range concurrency)')
+    parser.add_argument('--retry-mode', choices=['legacy', 'standard', 'adaptive'],
+                       default=None, help='Override the profile retry mode')
+    parser.add_argument('--max-attempts', type=int, default=None,
+                       help='Override the profile retry attempts')
+    parser.add_argument('--connect-timeout', type=float, default=None,
+                       help='Override the profile connect timeout (seconds)')
+    parser.add_argument('--read-timeout', type=float, default=None,
+                       help='Override the profile read timeout (seconds)')
+    parser.add_argument('--tcp-keepalive', action='store_true', default=None,
+                       help='Enable TCP keep-alive on client connections')
+    parser.add_argument('--shared-client', action='store_true',
+                       help='All worker threads share one native_s3 client and its '
+                            'connection pool (default: a client per thread)')
+    parser.add_argument('--pool-sweep', type=int, nargs='+', default=None, metavar='SIZE',
+                       help='native_s3: sweep connection pool sizes with a shared client '
+                            'x --pool-sweep-concurrency')
+    parser.add_argument('--pool-sweep-concurrency', type=int, nargs='+', default=None,
+                       metavar='N', help='Concurrency levels for --pool-sweep '
+                                         '(default: --concurrency)')
+    parser.add_argument('--resource-interval', type=float, default=RESOURCE_INTERVAL_SEC,
+                       help='Period of client/host resource sampling from /proc '
+                            '(CPU, RSS, network, disk, FUSE daemon) in seconds; 0 = off')
+    parser.add_argument('--workers', nargs='+', default=None, metavar='HOST:PORT',
+                       help='Run workloads on these worker.py nodes with a synchronized start '
+                            'and merge their histograms and time series (coordinator mode)')
+    parser.add_argument('--metrics-port', type=int, default=None, metavar='PORT',
+                       help='Serve live ops/bytes/errors/latency histograms per storage '
+                            'and workload at http://HOST:PORT/metrics (Prometheus/OpenMetrics); '
+                            '0 = any free port')
+    parser.add_argument('--metrics-host', default=METRICS_HOST,
+                       help='Address for --metrics-port (0.0.0.0 to expose it to Prometheus '
+                            'on another host)')
+    parser.add_argument('--metrics-linger', type=float, default=0, metavar='SEC',
+                       help='Keep the metrics endpoint up this long after the run '
+                            'so the final values get scraped')
+    parser.add_argument('--no-phase-trace', action='store_true',
+                       help='native_s3: do not record per-request HTTP phases '
+                            '(signing, connect, send, server wait, transfer)')
+    parser.add_argument('--delete-concurrency', type=int,
+                       default=WorkloadConfig.DELETE_CONCURRENCY,
+                       help='native_s3 cleanup: delete_objects batches '
+                            '(1000 keys each) in flight')
+    parser.add_argument('--read-modes', nargs='+',
+                       choices=list(WorkloadConfig.RANDOM_READ_MODES),
+                       default=[WorkloadConfig.RANDOM_READ_REOPEN],
+                       help='random_io on s3fs/goofys: reopen (open/stat/read/close '
+                            'per op), pread (persistent fd), mmap; each mode is '
+                            'reported separately')
+    parser.add_argument('--write-modes', nargs='+',
+                       choices=list(WorkloadConfig.WRITE_MODES),
+                       default=[WorkloadConfig.WRITE_BUFFERED],
+                       help='sequential_write/small_files on s3fs/goofys: buffered, '
+                            'fsync (wait for the upload before close), direct '
+                            '(O_DIRECT); each mode is reported separately')
+    parser.add_argument('--cold-read', nargs='?', const='auto', default=None,
+                       metavar='MB',
+                       help='sequential_read on s3fs/goofys with a working set '
+                            'larger than the page and FUSE caches: size in MB '
+                            '(default: 1.25 x RAM)')
+    parser.add_argument('--payload', choices=list(payload.PROFILES),
+                       default=payload.RANDOM,
+                       help='Test data entropy profile: random (incompressible), '
+                            'text (~2x compressible) or zero (fully compressible)')
+    parser.add_argument('--size-spread', type=float, default=0.0,
+                       help='Vary write sizes uniformly within size * (1 +- spread), '
+                            'e.g. 0.5')
+    parser.add_argument('--listing-entries', type=int, nargs='+',
+                       default=[WorkloadConfig.LISTING_ENTRIES], metavar='N',
+                       help='listing: entries in the directory/prefix, several values '
+                            'give a scaling curve (e.g. 1000 10000 100000 1000000)')
+    parser.add_argument('--listing-layout', nargs='+', choices=WorkloadConfig.LISTING_LAYOUTS,
+                       default=[WorkloadConfig.LISTING_FLAT],
+                       help=f'listing: flat directory or nested subdirectories of '
+                            f'{WorkloadConfig.LISTING_FANOUT} entries')
+    parser.add_argument('--visibility-direction', nargs='+',
+                       choices=WorkloadConfig.VISIBILITY_DIRECTIONS,
+                       default=list(WorkloadConfig.VISIBILITY_DIRECTIONS),
+                       help='visibility: write via native S3 and poll the mount (s3_to_fs), '
+                            'write via the mount and poll S3 (fs_to_s3)')
+    parser.add_argument('--visibility-poll-ms', type=float,
+                       default=WorkloadConfig.VISIBILITY_POLL_INTERVAL * 1000,
+                       help='visibility: polling interval, i.e. lag resolution (ms)')
+    parser.add_argument('--visibility-timeout', type=float,
+                       default=WorkloadConfig.VISIBILITY_TIMEOUT,
+                       help='visibility: give up and count an error after this many seconds')
+    parser.add_argument('--mount-prefix', default='',
+                       help='Key prefix exposed by the s3fs/goofys mounts of --bucket '
+                            '(for bucket:/prefix mounts)')
+    parser.add_argument('--mix', default=None, metavar='OP=WEIGHT,...',
+                       help='Operation mix for the mixed workload, e.g. '
+                            'get=0.8,put=0.2 (ops: put get head delete list)')
+    parser.add_argument('--key-distribution', default=WorkloadConfig.MIXED_POPULARITY,
+                       choices=list(KeyPopularity.KINDS),
+                       help='Key popularity for the mixed workload (default: zipf)')
+    parser.add_argument('--zipf-exponent', type=float,
+                       default=WorkloadConfig.MIXED_ZIPF_EXPONENT,
+                       help='Zipf exponent for --key-distribution zipf')
+    parser.add_argument('--hot-fraction', type=float, default=0.2,
+                       help='Share of hot keys for --key-distribution hotspot')
+    parser.add_argument('--hot-access', type=float, default=0.8,
+                       help='Share of accesses to hot keys for --key-distribution hotspot')
+    parser.add_argument('--sample-interval', type=float, default=1.0,
+                       help='Time-series window in seconds for '
+                            'benchmark_timeseries_*.jsonl (0 = disabled)')
     parser.add_argument('--output-dir', default='benchmark_results',
                        help='Output directory for results')
+    parser.add_argument('--history-db', default=None,
+                       help='Append results to this SQLite history '
+                            '(default: <output-dir>/history.db); see compare.py')
+    parser.add_argument('--no-history', action='store_true',
+                       help='Do not record this run in the history database')
+    parser.add_argument('--run-label', default=None,
+                       help='Free-form label stored with the run in the history')
     
     args = parser.parse_args()
     
-    # Проверяем mount points для FUSE решений
-    if 's3fs' in args.storage or 'goofys' in args.storage:
+    # Нагрузки из спецификаций; без --workloads встроенные запускаются,
+    # только если спецификаций нет
+    try:
+        specs = [spec for path in args.spec for spec in load_specs(path)]
+    except (OSError, ValueError, TypeError, ImportError) as e:
+        print(f"❌ Invalid workload spec: {e}")
+        sys.exit(1)
+    if args.workloads is None:
+        args.workloads = [] if specs else list(DEFAULT_WORKLOADS)
+    concurrency_given = args.concurrency is not None
+    if args.steady_state and args.sample_interval <= 0:
+        print("❌ --steady-state needs time-series windows (--sample-interval > 0)")
+        sys.exit(1)
+    args.concurrency = args.concurrency or 1
+    
+    # Режим матрицы: задан хотя бы один диапазон --matrix-*
+    matrix_mode = bool(args.matrix_sizes or args.matrix_concurrency or args.matrix_part_mb)
+    if matrix_mode:
+        try:
+            matrix_sizes = [parse_size(size) for size in args.matrix_sizes or []]
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        matrix_cells = expand_matrix(
+            args.storage, args.workloads,
+            object_sizes=matrix_sizes or [None],
+            concurrency=args.matrix_concurrency or [args.concurrency],
+            part_sizes=[size * MB for size in args.matrix_part_mb or []] or [None],
+        )
+    
+    # Встроенная смешанная нагрузка: доли операций и популярность ключей из CLI
+    mixed = None
+    if WorkloadType.MIXED in args.workloads:
+        popularity_params = {
+            'zipf': {'exponent': args.zipf_exponent},
+            'hotspot': {'hot_fraction': args.hot_fraction, 'hot_access': args.hot_access},
+        }.get(args.key_distribution, {})
+        try:
+            mixed = mixed_spec(
+                operations=parse_mix(args.mix) if args.mix else None,
+                popularity=KeyPopularity(args.key_distribution, popularity_params),
+                ops=workload_iterations(WorkloadType.MIXED, args.iterations),
+                concurrency=args.concurrency,
+            )
+        except ValueError as e:
+            print(f"❌ Invalid mixed workload: {e}")
+            sys.exit(1)
+    
+    # Встроенный S3 сервер вместо внешнего endpoint
+    if args.local_s3:
+        local_s3 = LocalS3Process(
+            data_dir=args.local_s3_dir,
+            latency_ms=args.local_s3_latency_ms,
+            bandwidth_mbps=args.local_s3_bandwidth_mbps,
+            buckets=[args.bucket],
+        ).start()
+        atexit.register(local_s3.stop)
+        args.endpoint = local_s3.endpoint_url
+        print(f"🧪 Local S3 server: {args.endpoint}")
+    
+    # Живые метрики для Prometheus/Grafana
+    metrics_server = None
+    if args.metrics_port is not None:
+        try:
+            metrics_server = MetricsServer(args.metrics_port, args.metrics_host).start()
+        except OSError as e:
+            print(f"❌ Cannot serve metrics on {args.metrics_host}:{args.metrics_port}: {e}")
+            sys.exit(1)
+        atexit.register(metrics_server.stop)
+        print(f"📡 Live metrics: {metrics_server.url}")
+    
+    # Проверяем mount points для FUSE решений (с --workers - на узлах)
+    if ('s3fs' in args.storage or 'goofys' in args.storage) and not args.workers:
         issues = check_mount_points(args.s3fs_mount, args.goofys_mount)
         if issues:
             print("⚠️  Mount point issues detected:")
@@ -168,23 +803,211 @@ Examples:
     print(f"Bucket:       {args.bucket}")
     print(f"Endpoint:     {args.endpoint or 'default'}")
     print(f"Storage:      {', '.join(args.storage)}")
-    print(f"Workloads:    {', '.join(args.workloads)}")
+    print(f"Workloads:    {', '.join(args.workloads + [spec.name for spec in specs])}")
     print(f"Iterations:   {args.iterations}")
+    print(f"Concurrency:  {args.concurrency}")
+    if args.workers:
+        print(f"Workers:      {', '.join(args.workers)}")
+    else:
+        print(f"Processes:    {args.processes or os.cpu_count()}")
+    if args.sweep_rates:
+        print(f"Sweep rates:  {', '.join(f'{r:g}' for r in args.sweep_rates)} ops/s "
+              f"({args.arrival})")
+    elif args.rate:
+        print(f"Rate:         {args.rate:g} ops/s ({args.arrival})")
+    if matrix_mode:
+        print(f"Matrix:       {len(matrix_cells)} cells")
+    if 'native_s3' in args.storage:
+        print(f"Client:       {args.client_profile} "
+              f"({'shared' if args.shared_client else 'per thread'})")
+    if args.pool_sweep:
+        print(f"Pool sweep:   {', '.join(map(str, args.pool_sweep))} x concurrency "
+              f"{', '.join(map(str, args.pool_sweep_concurrency or [args.concurrency]))}")
+    if args.warmup or args.warmup_sec:
+        warmup = [f"{args.warmup} ops" if args.warmup else "",
+                  f"{args.warmup_sec:g} sec" if args.warmup_sec else ""]
+        print(f"Warmup:       {' / '.join(w for w in warmup if w)}")
+    if args.steady_state:
+        print(f"Steady state: auto (MSER over {args.sample_interval:g} sec windows)")
+    if args.repeat_max:
+        print(f"Repeats:      {min(args.repeat_min, args.repeat_max)}..{args.repeat_max} "
+              f"(target ±{args.target_ci:.0%})")
     print(f"Output:       {args.output_dir}")
     print("=" * 80)
     print()
     
+    # Параметры передачи больших объектов: без явных значений берем
+    # одну конфигурацию по умолчанию или всю сетку при --transfer-sweep
+    def transfer_values(values, default, sweep):
+        return values or (sweep if args.transfer_sweep else [default])
+    
+    part_sizes = transfer_values(args.part_size_mb, WorkloadConfig.MULTIPART_PART_SIZE // MB,
+                                 WorkloadConfig.MULTIPART_SWEEP_PART_SIZES_MB)
+    part_concurrency = transfer_values(args.part_concurrency,
+                                       WorkloadConfig.MULTIPART_CONCURRENCY,
+                                       WorkloadConfig.MULTIPART_SWEEP_CONCURRENCY)
+    range_sizes = transfer_values(args.range_size_mb,
+                                  WorkloadConfig.PARALLEL_READ_RANGE_SIZE // MB,
+                                  WorkloadConfig.PARALLEL_READ_SWEEP_RANGE_SIZES_MB)
+    range_concurrency = transfer_values(args.range_concurrency,
+                                        WorkloadConfig.PARALLEL_READ_CONCURRENCY,
+                                        WorkloadConfig.PARALLEL_READ_SWEEP_CONCURRENCY)
+    
+    # Профиль и разброс размера тестовых данных - общие для всех хранилищ
+    payload_options = {
+        'payload_profile': args.payload,
+        'size_spread': args.size_spread,
+    }
+    fs_options = dict(payload_options)
+    if args.object_mb:
+        fs_options['object_size'] = args.object_mb * MB
+    if args.cold_read:
+        fs_options['cold_read_bytes'] = (cold_read_working_set() if args.cold_read == 'auto'
+                                         else int(args.cold_read) * MB)
+    
+    # Задержка видимости: по одному прогону на направление
+    visibility = [{
+        'direction': direction,
+        'poll_interval': args.visibility_poll_ms / 1000,
+        'timeout': args.visibility_timeout,
+        'mount_prefix': args.mount_prefix,
+    } for direction in args.visibility_direction]
+    
+    # Параметры native S3 клиента
+    s3_options = {
+        **payload_options,
+        'part_size': part_sizes[0] * MB,
+        'part_concurrency': part_concurrency[0],
+        'range_size': range_sizes[0] * MB,
+        'range_concurrency': range_concurrency[0],
+        'object_size': args.object_mb * MB if args.object_mb else None,
+        'delete_concurrency': args.delete_concurrency,
+        # Без флага не добавляем - хэш ячеек матрицы прежний
+        **({'trace_phases': False} if args.no_phase_trace else {}),
+        # Каждому потоку нагрузки нужно по соединению на часть/диапазон в полете
+        'max_pool_connections': args.max_pool_connections or max(
+            10, args.delete_concurrency,
+            max(args.matrix_concurrency or [args.concurrency])
+            * max(part_concurrency + range_concurrency)),
+    }
+    # Конфигурация клиента; значения по умолчанию не добавляем - хэш ячеек матрицы прежний
+    client_options = {name: value for name, value in (
+        ('retry_mode', args.retry_mode), ('max_attempts', args.max_attempts),
+        ('connect_timeout', args.connect_timeout), ('read_timeout', args.read_timeout),
+        ('tcp_keepalive', args.tcp_keepalive)) if value is not None}
+    if args.client_profile != 'default':
+        s3_options['client_profile'] = args.client_profile
+    if client_options:
+        s3_options['client_options'] = client_options
+    if args.shared_client:
+        s3_options['shared_client'] = True
+    if 'native_s3' in args.storage:
+        try:
+            config = client_config(args.client_profile, s3_options['max_pool_connections'],
+                                   **client_options)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"ℹ️  native_s3 client: {describe_config(config)}\n")
+    transfer_grids = {
+        WorkloadType.MULTIPART_UPLOAD: {
+            'part_size': [size * MB for size in part_sizes],
+            'part_concurrency': part_concurrency,
+        },
+        WorkloadType.PARALLEL_READ: {
+            'range_size': [size * MB for size in range_sizes],
+            'range_concurrency': range_concurrency,
+        },
+    }
+    
+    # Повторы прогона до нужной точности
+    repeat = None
+    if args.repeat_max:
+        repeat = {
+            'min_repeats': min(args.repeat_min, args.repeat_max),
+            'max_repeats': args.repeat_max,
+            'target_ci': args.target_ci,
+        }
+    
     # Инициализация сборщика метрик
     collector = MetricsCollector()
+    output_dir = Path(args.output_dir)
+    timeseries_file = collector.timeseries_file(output_dir)
+    
+    if matrix_mode:
+        cache = ResultCache(args.matrix_cache or output_dir / "matrix_cache")
+        s3_context = {k: v for k, v in s3_options.items() if k != 'max_pool_connections'}
+        processes = args.processes or os.cpu_count() or 1
+        matrix_results = run_matrix(
+            matrix_cells,
+            lambda cell: run_matrix_cell(
+                cell,
+                mount_points={'s3fs': args.s3fs_mount, 'goofys': args.goofys_mount},
+                s3_options=s3_options,
+                fs_options=fs_options,
+                mixed=mixed,
+                sample_interval=args.sample_interval,
+                timeseries_file=timeseries_file,
+                repeat=repeat,
+                warmup=args.warmup,
+                warmup_sec=args.warmup_sec,
+                steady_state=args.steady_state,
+                resource_interval=args.resource_interval,
+                workers=args.workers,
+                bucket_name=args.bucket,
+                endpoint_url=args.endpoint,
+                access_key=ACCESS_KEY,
+                secret_key=SECRET_KEY,
+                iterations=args.iterations,
+                processes=processes,
+                rate=args.rate,
+                arrival=args.arrival,
+            ),
+            cache,
+            context={
+                'bucket': args.bucket,
+                'endpoint': args.endpoint,
+                'mounts': {'s3fs': args.s3fs_mount, 'goofys': args.goofys_mount},
+                'iterations': args.iterations,
+                'processes': processes,
+                'rate': args.rate,
+                'arrival': args.arrival,
+                's3_options': s3_context,
+                'fs_options': fs_options,
+                'mixed': mixed.to_dict() if mixed else None,
+                # Без повторов и прогрева хэш ячеек прежний
+                **({'repeat': repeat} if repeat else {}),
+                **({'warmup': [args.warmup, args.warmup_sec, args.steady_state]}
+                   if args.warmup or args.warmup_sec or args.steady_state else {}),
+                **({'workers': args.workers} if args.workers else {}),
+            },
+        )
+        for _, result in matrix_results:
+            collector.add_result(result)
     
-    # Запуск всех комбинаций storage × workload
-    total = len(args.storage) * len(args.workloads)
+    # Запуск всех комбинаций storage × workload (× режим чтения для random_io на ФС)
+    runs = {}
+    for storage_type in args.storage:
+        runs[storage_type] = [] if matrix_mode else workload_runs(
+            storage_type, args.workloads, args.read_modes, args.write_modes,
+            fs_options.get('cold_read_bytes', 0), specs, mixed, visibility)
+    total = sum(len(storage_runs) for storage_runs in runs.values())
     current = 0
     
     for storage_type in args.storage:
-        for workload_type in args.workloads:
+        for workload_type, label, fs_variant, spec in runs[storage_type]:
             current += 1
-            print(f"\n[{current}/{total}] Running {storage_type} / {workload_type}...")
+            run_fs_options = {**fs_options, **fs_variant}
+            run_s3_options = s3_options
+            run_iterations, run_duration = args.iterations, None
+            run_concurrency = args.concurrency
+            if spec is not None:
+                run_fs_options['spec'] = spec
+                run_s3_options = {**s3_options, 'spec': spec}
+                run_iterations, run_duration = spec_run_plan(spec, args.rate)
+                if not concurrency_given:
+                    run_concurrency = spec.concurrency
+            print(f"\n[{current}/{total}] Running {storage_type} / {label}...")
             print("-" * 80)
             
             # Определяем параметры в зависимости от типа хранилища
@@ -195,25 +1018,147 @@ Examples:
             else:
                 mount_point = None
             
-            result = run_workload(
-                storage_type=storage_type,
-                workload_type=workload_type,
-                mount_point=mount_point,
-                bucket_name=args.bucket,
-                endpoint_url=args.endpoint,
-                access_key=ACCESS_KEY,
-                iterations=args.iterations,
-                secret_key=SECRET_KEY
-            )
+            # Листинг: отдельный прогон на каждое число записей и раскладку
+            if workload_type == WorkloadType.LISTING and spec is None:
+                for layout in args.listing_layout:
+                    scale = run_listing_scale(
+                        storage_type=storage_type,
+                        layout=layout,
+                        entries=args.listing_entries,
+                        iterations=workload_iterations(workload_type, run_iterations),
+                        concurrency=run_concurrency,
+                        s3_options=run_s3_options,
+                        fs_options=run_fs_options,
+                        mount_point=mount_point,
+                        bucket_name=args.bucket,
+                        endpoint_url=args.endpoint,
+                        access_key=ACCESS_KEY,
+                        secret_key=SECRET_KEY,
+                        resource_interval=args.resource_interval
+                    )
+                    if scale and scale.points:
+                        collector.add_listing_scale(scale)
+                        for point in scale.points:
+                            collector.add_result(point.result)
+                        if len(scale.points) > 1:
+                            print(f"✅ Listing scaling ({layout}): "
+                                  f"p50 ~ N^{scale.scaling_exponent:.2f}")
+                continue
+            
+            # Размер пула x параллельность: один клиент на все потоки, иначе
+            # у каждого потока свой пул и размер пула ни на что не влияет
+            if args.pool_sweep and storage_type == 'native_s3':
+                # Спецификация по времени: каждая точка идет duration_sec
+                sweep_iterations, sweep_duration = (
+                    spec_run_plan(spec, None) if spec is not None
+                    else (workload_iterations(workload_type, run_iterations), None))
+                tuning = run_transfer_sweep(
+                    storage_type=storage_type,
+                    workload_type=workload_type,
+                    grid={'max_pool_connections': args.pool_sweep,
+                          'concurrency': args.pool_sweep_concurrency or [run_concurrency]},
+                    iterations=sweep_iterations,
+                    duration=sweep_duration,
+                    concurrency=run_concurrency,
+                    s3_options={**run_s3_options, 'shared_client': True},
+                    mount_point=mount_point,
+                    bucket_name=args.bucket,
+                    endpoint_url=args.endpoint,
+                    access_key=ACCESS_KEY,
+                    secret_key=SECRET_KEY,
+                    resource_interval=args.resource_interval
+                )
+                if tuning and tuning.points:
+                    collector.add_tuning(tuning)
+                    for point in tuning.plateau('max_pool_connections'):
+                        print(f"✅ Plateau: {point.parameters} -> "
+                              f"{point.result.throughput_mbps:.2f} MB/s")
+                continue
+            
+            grid = transfer_grids.get(workload_type)
+            if grid and any(len(values) > 1 for values in grid.values()):
+                tuning = run_transfer_sweep(
+                    storage_type=storage_type,
+                    workload_type=workload_type,
+                    grid=grid,
+                    iterations=workload_iterations(workload_type, args.iterations),
+                    concurrency=args.concurrency,
+                    s3_options=s3_options,
+                    mount_point=mount_point,
+                    bucket_name=args.bucket,
+                    endpoint_url=args.endpoint,
+                    access_key=ACCESS_KEY,
+                    secret_key=SECRET_KEY,
+                    resource_interval=args.resource_interval
+                )
+                if tuning and tuning.points:
+                    collector.add_tuning(tuning)
+                    best = tuning.best
+                    print(f"✅ Best: {best.parameters} -> "
+                         f"{best.result.throughput_mbps:.2f} MB/s")
+                continue
+            
+            if args.sweep_rates:
+                sweep = run_load_sweep(
+                    storage_type=storage_type,
+                    workload_type=workload_type,
+                    rates=args.sweep_rates,
+                    step_duration=args.step_duration,
+                    concurrency=run_concurrency,
+                    arrival=args.arrival,
+                    mount_point=mount_point,
+                    bucket_name=args.bucket,
+                    endpoint_url=args.endpoint,
+                    access_key=ACCESS_KEY,
+                    secret_key=SECRET_KEY,
+                    s3_options=run_s3_options,
+                    fs_options=run_fs_options,
+                    resource_interval=args.resource_interval
+                )
+                if sweep:
+                    collector.add_load_sweep(sweep)
+                    print(f"✅ Saturation: {sweep.saturation_rate or 'not reached'}, "
+                         f"max sustained {sweep.max_sustained_iops:.1f} ops/s")
+                continue
+            
+            def run_once(index):
+                return run_workload(
+                    storage_type=storage_type,
+                    workload_type=workload_type,
+                    mount_point=mount_point,
+                    bucket_name=args.bucket,
+                    endpoint_url=args.endpoint,
+                    access_key=ACCESS_KEY,
+                    iterations=run_iterations,
+                    secret_key=SECRET_KEY,
+                    concurrency=run_concurrency,
+                    processes=args.processes or os.cpu_count() or 1,
+                    rate=args.rate,
+                    arrival=args.arrival,
+                    sampler=repeat_sampler(index, args.sample_interval, timeseries_file,
+                                           {'storage_type': storage_type, 'workload': label},
+                                           args.steady_state),
+                    s3_options=run_s3_options,
+                    fs_options=run_fs_options,
+                    duration=run_duration,
+                    warmup=args.warmup,
+                    warmup_sec=args.warmup_sec,
+                    steady_state=args.steady_state,
+                    resource_interval=args.resource_interval,
+                    workers=args.workers
+                )
+            
+            result = run_repeated(run_once, **repeat) if repeat else run_once(0)
             
             if result:
                 collector.add_result(result)
-                print(f"✅ Completed: {result.throughput_mbps:.2f} MB/s, "
+                ci = (f" ±{result.throughput_ci_mbps:.2f} ({result.repeats} runs)"
+                      if result.repeats > 1 else "")
+                print(f"✅ Completed: {result.throughput_mbps:.2f}{ci} MB/s, "
                      f"{result.iops:.2f} IOPS, "
                      f"{result.latency_avg_ms:.2f}ms avg latency")
     
     # Сохранение результатов
-    output_dir = Path(args.output_dir)
     
     print("\n" + "=" * 80)
     print("SAVING RESULTS")
@@ -222,12 +1167,24 @@ Examples:
     # Raw data
     collector.save_raw_data(output_dir)
     
+    # История прогонов для сравнения с базовым (compare.py)
+    if collector.results and not args.no_history:
+        history_path = Path(args.history_db) if args.history_db else output_dir / "history.db"
+        fingerprint = environment_fingerprint(
+            args.endpoint, {'s3fs': args.s3fs_mount, 'goofys': args.goofys_mount})
+        with ResultsDatabase(history_path) as db:
+            run_id = db.record_run(collector.timestamp, collector.results,
+                                   fingerprint, args.run_label)
+        print(f"✅ Run {run_id} recorded in {history_path}")
+    
     # Report
     collector.generate_report(output_dir)
     
     # Plots
-    if collector.results:
-        generate_all_plots(collector.results, output_dir)
+    if collector.results or collector.load_sweeps:
+        generate_all_plots(collector.results, output_dir, collector.load_sweeps,
+                           timeseries_file if timeseries_file.exists() else None,
+                           collector.listing_scales)
     
     print("\n" + "=" * 80)
     print("✅ BENCHMARK COMPLETED")
@@ -240,7 +1197,21 @@ Examples:
     print(f"  • 02_iops_comparison.png")
     print(f"  • 03_latency_percentiles.png")
     print(f"  • 04_performance_radar.png")
+    if collector.load_sweeps:
+        print(f"  • 05_latency_vs_offered_load.png")
+    if timeseries_file.exists():
+        print(f"  • benchmark_timeseries_*.jsonl - Per-window throughput/latency")
+        print(f"  • 06_throughput_over_time.png")
+        print(f"  • 07_latency_heatmap.png")
+    if any(r.http_phases and r.http_phases['requests'] for r in collector.results):
+        print(f"  • 08_http_phases.png")
+    if collector.listing_scales:
+        print(f"  • 09_listing_scaling.png")
     print()
+    
+    if metrics_server and args.metrics_linger > 0:
+        print(f"📡 Keeping {metrics_server.url} up for {args.metrics_linger:g} sec...")
+        time.sleep(args.metrics_linger)
 
 
 if __name__ == '__main__':
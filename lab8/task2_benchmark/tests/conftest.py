@@ -0,0 +1,26 @@
+"""Общие настройки тестов"""
+
+import sys
+from pathlib import Path
+
+import boto3
+import pytest
+
+# Добавляем путь к benchmark модулю
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmark.s3server import LocalS3Server
+
+@pytest.fixture
+def s3_server():
+    """Встроенный S3 (в памяти) с bucket bench"""
+    server = LocalS3Server(buckets=("bench",)).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def s3_client(s3_server):
+    return boto3.client('s3', endpoint_url=s3_server.endpoint_url,
+                        aws_access_key_id="test", aws_secret_access_key="test",
+                        region_name="us-east-1")
@@ -0,0 +1,60 @@
+"""ArrivalSchedule и коррекция coordinated omission в open-loop режиме"""
+
+import time
+
+import numpy as np
+import pytest
+
+from benchmark.arrival import ArrivalSchedule
+from benchmark.base import BenchmarkBase
+
+
+def test_fixed_schedule_offsets_and_split_phases():
+    schedule = ArrivalSchedule(100.0)
+    assert np.allclose(schedule.offsets(5), [0.0, 0.01, 0.02, 0.03, 0.04])
+    parts = [schedule.split(4, i) for i in range(4)]
+    assert all(part.rate == 25.0 for part in parts)
+    # Исполнители сдвинуты по фазе: вместе - та же сетка 1/rate
+    merged = np.sort(np.concatenate([part.offsets(5) for part in parts]))
+    assert np.allclose(merged, schedule.offsets(20))
+
+
+def test_poisson_schedule_is_seeded():
+    schedule = ArrivalSchedule(200.0, ArrivalSchedule.POISSON, seed=7)
+    offsets = schedule.offsets(20000)
+    assert np.array_equal(offsets, ArrivalSchedule(200.0, ArrivalSchedule.POISSON,
+                                                   seed=7).offsets(20000))
+    assert np.all(np.diff(offsets) > 0)
+    assert np.mean(np.diff(offsets)) == pytest.approx(1 / 200.0, rel=0.05)
+    with pytest.raises(ValueError):
+        ArrivalSchedule(0)
+
+
+class SleepBenchmark(BenchmarkBase):
+    """Итерация - фиксированная пауза, без ввода-вывода"""
+
+    def __init__(self, sleep_sec: float):
+        super().__init__("sleep", "test")
+        self.sleep_sec = sleep_sec
+        self.resource_interval = 0
+
+    def setup(self):
+        pass
+
+    def run_iteration(self) -> float:
+        time.sleep(self.sleep_sec)
+        return 1
+
+    def cleanup(self):
+        return 0
+
+
+def test_open_loop_latency_includes_queueing():
+    # Обслуживание 20 ms при интервале 10 ms: очередь растет на 10 ms за операцию
+    closed = SleepBenchmark(0.02).run(iterations=20)
+    opened = SleepBenchmark(0.02).run(iterations=20, rate=100.0)
+    assert closed.latency_max_ms < 100
+    # Последняя операция запланирована на 190 ms, а завершится около 400 ms
+    assert opened.latency_max_ms > 150
+    assert opened.latency_p50_ms > closed.latency_p50_ms * 2
+    assert opened.target_rate == 100.0
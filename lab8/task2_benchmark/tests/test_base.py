@@ -0,0 +1,67 @@
+"""BenchmarkBase: распределение итераций по потокам и объединение метрик"""
+
+import threading
+import time
+
+from benchmark.base import BenchmarkBase
+
+
+class CountingBenchmark(BenchmarkBase):
+    """Итерация - пауза и 1 KB; каждая fail_every-я итерация потока падает"""
+
+    def __init__(self, sleep_sec: float = 0.0, fail_every: int = 0):
+        super().__init__("counting", "test")
+        self.sleep_sec = sleep_sec
+        self.fail_every = fail_every
+        self.resource_interval = 0
+        self.calls = 0
+        self.names = []
+        self._lock = threading.Lock()
+
+    def setup(self):
+        pass
+
+    def run_iteration(self) -> float:
+        self.calls += 1
+        name = self._next_name("obj")
+        with self._lock:
+            self.names.append(name)
+        time.sleep(self.sleep_sec)
+        if self.fail_every and self.calls % self.fail_every == 0:
+            raise IOError("injected failure")
+        return 1024
+
+    def spawn_worker(self, worker_id: int):
+        worker = super().spawn_worker(worker_id)
+        worker.calls = 0
+        return worker
+
+    def cleanup(self):
+        return 0
+
+
+def test_concurrent_run_merges_all_threads():
+    benchmark = CountingBenchmark()
+    result = benchmark.run(iterations=40, concurrency=4)
+    assert result.iterations == 40
+    assert result.concurrency == 4
+    assert result.errors == 0
+    assert benchmark.histogram.total_count == 40
+    # Имена объектов уникальны между потоками (worker_id в имени)
+    assert len(set(benchmark.names)) == 40
+
+
+def test_concurrent_run_counts_errors_of_every_thread():
+    # 4 потока по 10 итераций, у каждого падает 5-я и 10-я
+    benchmark = CountingBenchmark(fail_every=5)
+    result = benchmark.run(iterations=40, concurrency=4)
+    assert result.errors == 8
+    assert benchmark.histogram.total_count == 32
+
+
+def test_concurrency_overlaps_iterations():
+    serial = CountingBenchmark(sleep_sec=0.02).run(iterations=20)
+    parallel = CountingBenchmark(sleep_sec=0.02).run(iterations=20, concurrency=4)
+    assert serial.total_time_sec > 0.35
+    assert parallel.total_time_sec < serial.total_time_sec / 2
+    assert parallel.iops > serial.iops * 2
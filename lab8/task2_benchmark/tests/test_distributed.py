@@ -0,0 +1,80 @@
+"""Распределенный прогон: координатор и два узла на localhost со встроенным S3"""
+
+import threading
+import time
+
+import pytest
+
+from benchmark import distributed
+from benchmark.distributed import DONE, RUNNING, WorkerServer, run_distributed
+from benchmark.histogram import LatencyHistogram
+from benchmark.native_s3 import NativeS3Benchmark
+
+
+def _make_benchmark(options):
+    return NativeS3Benchmark(access_key="test", secret_key="test", **options)
+
+
+@pytest.fixture
+def workers():
+    servers = [WorkerServer(_make_benchmark, port=0) for _ in range(2)]
+    threads = [threading.Thread(target=server.serve_forever, daemon=True) for server in servers]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 10
+    while any(server.port == 0 for server in servers) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield servers
+    for server, thread in zip(servers, threads):
+        server.shutdown()
+        thread.join()
+
+
+def _run(s3_server, workers, iterations=21):
+    options = {'bucket_name': "bench", 'workload_type': "small_files",
+               'endpoint_url': s3_server.endpoint_url}
+    benchmark = _make_benchmark(options)
+    benchmark.resource_interval = 0
+    return run_distributed(benchmark, [server.address for server in workers], options,
+                           iterations=iterations, concurrency=2)
+
+
+def _fail_status(server: WorkerServer, times: int):
+    """После старта замера первые times запросов /status к узлу заканчиваются ошибкой 500"""
+    handle, failures = server.handle, [times]
+
+    def flaky(method, path, payload):
+        started = server.job is not None and server.job.state in (RUNNING, DONE)
+        if path == '/status' and started and failures[0] > 0:
+            failures[0] -= 1
+            raise ConnectionError("node is busy")
+        return handle(method, path, payload)
+
+    server.handle = flaky
+
+
+def test_run_distributed_merges_two_nodes(s3_server, workers):
+    result = _run(s3_server, workers)
+    assert result.nodes == 2
+    assert result.errors == 0
+    assert result.iterations == 21
+    assert LatencyHistogram.from_dict(result.latency_histogram).total_count == 21
+    assert result.http_phases['requests'] >= 21
+    # Тестовые данные обоих узлов удаляет первый
+    assert result.cleanup_objects == 21
+
+
+def test_poll_errors_do_not_drop_node(s3_server, workers):
+    _fail_status(workers[1], 3)
+    result = _run(s3_server, workers)
+    assert result.errors == 0
+    assert LatencyHistogram.from_dict(result.latency_histogram).total_count == 21
+
+
+def test_unreachable_node_is_lost_after_deadline(s3_server, workers, monkeypatch):
+    monkeypatch.setattr(distributed, 'NODE_LOST_SEC', 1.0)
+    _fail_status(workers[1], 1000)
+    result = _run(s3_server, workers)
+    assert result.errors == 1
+    # Учтены только операции первого узла (11 из 21)
+    assert LatencyHistogram.from_dict(result.latency_histogram).total_count == 11
@@ -0,0 +1,98 @@
+"""WorkloadSpec -> OperationSchedule и разбиение расписания между исполнителями"""
+
+import pickle
+import threading
+
+import numpy as np
+import pytest
+
+from benchmark.engine import ScheduleCursor, compile_schedule
+from benchmark.filesystem import FilesystemBenchmark
+from benchmark.parallel import run_multiprocess
+from benchmark.spec import KeyPopularity, SizeDistribution, WorkloadSpec
+
+
+def _spec(**overrides) -> WorkloadSpec:
+    data = dict(name="t", operations={"put": 1.0},
+                object_size=SizeDistribution("fixed", {'size': 1024}),
+                keys=64, popularity=KeyPopularity("sequential"), ops=64,
+                prefill=False, seed=3)
+    data.update(overrides)
+    return WorkloadSpec(**data)
+
+
+def test_compile_schedule_is_deterministic_for_seed():
+    spec = _spec(operations={"get": 0.7, "put": 0.3}, ops=10000,
+                 popularity=KeyPopularity("zipf", {'exponent': 1.1}),
+                 object_size=SizeDistribution("uniform", {'min': 10, 'max': 20}))
+    first, second = compile_schedule(spec), compile_schedule(spec)
+    for name in ('ops', 'keys', 'sizes', 'key_sizes'):
+        assert np.array_equal(getattr(first, name), getattr(second, name))
+    counts = first.counts()
+    assert sum(counts.values()) == 10000
+    assert counts['get'] / 10000 == pytest.approx(0.7, abs=0.02)
+    assert first.sizes.min() >= 10 and first.sizes.max() <= 20
+    assert first.keys.max() < spec.keys
+
+
+def test_sequential_popularity_and_spec_validation():
+    schedule = compile_schedule(_spec(ops=10, keys=4))
+    assert schedule.keys.tolist() == [0, 1, 2, 3, 0, 1, 2, 3, 0, 1]
+    with pytest.raises(ValueError):
+        _spec(operations={"rename": 1.0})
+    with pytest.raises(ValueError):
+        _spec(ops=None)
+
+
+def test_schedule_cursor_partitions_rows():
+    rows = []
+    for index in range(3):
+        cursor = ScheduleCursor(index, 3)
+        rows.extend(cursor.next() for _ in range(4))
+    assert sorted(rows) == list(range(12))
+
+
+@pytest.fixture
+def recorded_puts(monkeypatch):
+    """Ключи, которые FilesystemBenchmark передал в _op_put (без записи на диск)"""
+    keys, lock = [], threading.Lock()
+
+    def record(self, key, size):
+        with lock:
+            keys.append(key)
+        return size
+
+    monkeypatch.setattr(FilesystemBenchmark, '_op_put', record)
+    return keys
+
+
+def test_schedule_rows_covered_once_across_threads(tmp_path, recorded_puts):
+    benchmark = FilesystemBenchmark("local", str(tmp_path), "t", spec=_spec(ops=200, keys=200))
+    benchmark.resource_interval = 0
+    result = benchmark.run(iterations=200, concurrency=4)
+    assert result.errors == 0
+    assert sorted(recorded_puts) == list(range(200))
+
+
+def test_schedule_rows_covered_once_across_process_copies(tmp_path, recorded_puts):
+    # Как в parallel.py: копия через pickle, partition(), потоки внутри копии
+    benchmark = FilesystemBenchmark("local", str(tmp_path), "t", spec=_spec(ops=60, keys=60))
+    benchmark.setup()
+    for index in range(3):
+        process = pickle.loads(pickle.dumps(benchmark)).spawn_worker(index)
+        process.partition(index, 3)
+        threads = [process.spawn_worker(index * 2 + i) for i in range(2)]
+        for _ in range(10):
+            for worker in threads:
+                worker.run_iteration()
+    assert sorted(recorded_puts) == list(range(60))
+
+
+def test_multiprocess_run_writes_every_key_once(tmp_path):
+    # Только put по последовательным ключам: удалено ровно keys файлов,
+    # если процессы не повторили и не пропустили строки расписания
+    benchmark = FilesystemBenchmark("local", str(tmp_path), "t", spec=_spec(ops=40, keys=40))
+    benchmark.resource_interval = 0
+    result = run_multiprocess(benchmark, iterations=40, processes=2, concurrency=2)
+    assert result.errors == 0
+    assert result.cleanup_objects == 40
@@ -0,0 +1,44 @@
+"""LatencyHistogram: точность перцентилей, объединение, сериализация"""
+
+import numpy as np
+import pytest
+
+from benchmark.histogram import LatencyHistogram
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.record(float(value))
+    assert histogram.total_count == 1000
+    assert histogram.mean_ms == pytest.approx(500.5)
+    for percentile, expected in ((50, 500), (90, 900), (99, 990)):
+        assert histogram.percentile(percentile) == pytest.approx(expected, rel=1e-3)
+    assert histogram.percentile(100) == 1000
+    assert histogram.min_ms == 1
+
+
+def test_histogram_merge_equals_single_recording():
+    values = np.random.default_rng(1).lognormal(2.0, 1.0, 5000)
+    single, left, right = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for i, value in enumerate(values):
+        single.record(value)
+        (left if i % 2 else right).record(value)
+    merged = left.merge(right)
+    assert np.array_equal(merged.counts, single.counts)
+    assert merged.total_count == single.total_count
+    assert merged.min_ms == single.min_ms and merged.max_ms == single.max_ms
+    for percentile in (50, 99, 99.9):
+        assert merged.percentile(percentile) == single.percentile(percentile)
+
+
+def test_histogram_dict_round_trip_and_config_mismatch():
+    histogram = LatencyHistogram()
+    for value in (0.5, 3.0, 42.0):
+        histogram.record(value)
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert np.array_equal(restored.counts, histogram.counts)
+    assert restored.percentile(50) == histogram.percentile(50)
+    assert LatencyHistogram.from_dict(None).total_count == 0
+    with pytest.raises(ValueError):
+        histogram.merge(LatencyHistogram(significant_digits=2))
@@ -0,0 +1,64 @@
+"""History database и коды возврата compare.py"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from benchmark.base import BenchmarkResult
+from benchmark.histogram import LatencyHistogram
+from benchmark.history import ResultsDatabase
+
+COMPARE = Path(__file__).parent.parent / "compare.py"
+
+
+def _result(throughput: float, p99: float, name: str = "t") -> BenchmarkResult:
+    rng = np.random.default_rng(1)
+    histogram = LatencyHistogram()
+    for value in rng.normal(p99 / 2, p99 / 20, 2000):
+        histogram.record(float(value))
+    histogram.record(p99)
+    return BenchmarkResult(name=name, storage_type="test", throughput_mbps=throughput,
+                           iops=throughput * 10, latency_avg_ms=p99 / 2, latency_p95_ms=p99,
+                           latency_p99_ms=histogram.percentile(99), errors=0,
+                           total_time_sec=1.0, iterations=2001,
+                           latency_histogram=histogram.to_dict(),
+                           throughput_windows=list(rng.normal(throughput, 1.0, 30)))
+
+
+def _compare(db_path: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, str(COMPARE), '--db', str(db_path), *args],
+                          capture_output=True, text=True, timeout=120)
+
+
+def _record(db_path: Path, *results: BenchmarkResult) -> int:
+    with ResultsDatabase(db_path) as db:
+        return db.record_run("20260101_000000", list(results), {'host': "h"})
+
+
+def test_compare_exit_codes(tmp_path):
+    db_path = tmp_path / "history.db"
+    _record(db_path, _result(100.0, 10.0))
+    _record(db_path, _result(100.0, 10.0))
+    same = _compare(db_path)
+    assert same.returncode == 0, same.stdout
+    assert "No regressions" in same.stdout
+
+    # Throughput упал вдвое - весь интервал за порогом
+    slow = _record(db_path, _result(50.0, 10.0))
+    regression = _compare(db_path, '--run', str(slow), '--baseline', '1')
+    assert regression.returncode == 1, regression.stdout
+    assert "1 regression(s)" in regression.stdout
+
+
+def test_compare_exit_code_2_without_comparable_runs(tmp_path):
+    db_path = tmp_path / "history.db"
+    assert _compare(db_path).returncode == 2
+    _record(db_path, _result(100.0, 10.0))
+    single = _compare(db_path)
+    assert single.returncode == 2
+    assert "Need two runs" in single.stdout
+    # Нет общих нагрузок
+    _record(db_path, _result(100.0, 10.0, name="other"))
+    assert _compare(db_path).returncode == 2
@@ -0,0 +1,73 @@
+"""Живые метрики: запись в ячейки и endpoint /metrics"""
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmark.filesystem import FilesystemBenchmark
+from benchmark.live import (
+    OPENMETRICS_CONTENT_TYPE, OPS, PROMETHEUS_CONTENT_TYPE, REGISTRY, LiveMetrics, MetricsServer
+)
+
+
+def _get(url: str, accept: str = None):
+    request = urllib.request.Request(url, headers={'Accept': accept} if accept else {})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.headers['Content-Type'], response.read().decode('utf-8')
+
+
+@pytest.fixture
+def metrics_server():
+    registry = LiveMetrics()
+    series = registry.series("native_s3", 'small "files"')
+    series.start()
+    for cell, latency_ms in ((series.cell(), 3.0), (series.cell(), 700.0)):
+        cell.record(latency_ms, 1024)
+    series.cell().record_error()
+    server = MetricsServer(0, registry=registry).start()
+    yield server
+    server.stop()
+
+
+def test_metrics_prometheus_exposition(metrics_server):
+    content_type, body = _get(metrics_server.url)
+    assert content_type == PROMETHEUS_CONTENT_TYPE
+    labels = 'storage_type="native_s3",workload="small \\"files\\""'
+    lines = body.splitlines()
+    assert "# TYPE s3bench_operations_total counter" in lines
+    assert f"s3bench_operations_total{{{labels}}} 2" in lines
+    assert f"s3bench_bytes_total{{{labels}}} 2048" in lines
+    assert f"s3bench_errors_total{{{labels}}} 1" in lines
+    # Корзины кумулятивные: 3 ms - в le=0.005, 700 ms - в le=1
+    assert f's3bench_latency_seconds_bucket{{{labels},le="0.0025"}} 0' in lines
+    assert f's3bench_latency_seconds_bucket{{{labels},le="0.005"}} 1' in lines
+    assert f's3bench_latency_seconds_bucket{{{labels},le="1"}} 2' in lines
+    assert f's3bench_latency_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"s3bench_latency_seconds_count{{{labels}}} 2" in lines
+    assert f"s3bench_latency_seconds_sum{{{labels}}} 0.703" in lines
+    assert f"s3bench_running{{{labels}}} 1" in lines
+    assert "# EOF" not in lines
+
+
+def test_metrics_openmetrics_exposition(metrics_server):
+    content_type, body = _get(metrics_server.url, accept='application/openmetrics-text')
+    assert content_type == OPENMETRICS_CONTENT_TYPE
+    lines = body.splitlines()
+    assert "# TYPE s3bench_operations counter" in lines
+    assert "# TYPE s3bench_latency_seconds histogram" in lines
+    assert lines[-1] == "# EOF"
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _get(metrics_server.url.replace('/metrics', '/other'))
+    assert error.value.code == 404
+
+
+def test_run_publishes_to_registry(tmp_path):
+    benchmark = FilesystemBenchmark("live_test", str(tmp_path), "small_files")
+    benchmark.resource_interval = 0
+    series = REGISTRY.series("live_test", benchmark.name)
+    before = series.totals()[OPS]
+    result = benchmark.run(iterations=20, concurrency=2)
+    assert result.errors == 0
+    assert series.totals()[OPS] - before == 20
+    assert series.running == 0
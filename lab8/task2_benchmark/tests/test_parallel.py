@@ -0,0 +1,39 @@
+"""run_multiprocess: объединение результатов процессов и сорванный старт"""
+
+import os
+import time
+
+import pytest
+
+from benchmark.filesystem import FilesystemBenchmark
+from benchmark.parallel import run_multiprocess
+
+
+class FailingSpawnBenchmark(FilesystemBenchmark):
+    """Процесс 1 падает в spawn_worker - до общего старта"""
+
+    def spawn_worker(self, worker_id: int):
+        if os.getpid() != self.parent_pid and worker_id == 1:
+            raise ValueError("spawn failed")
+        return super().spawn_worker(worker_id)
+
+
+def test_multiprocess_run_merges_processes(tmp_path):
+    benchmark = FilesystemBenchmark("local", str(tmp_path), "small_files")
+    benchmark.resource_interval = 0
+    result = run_multiprocess(benchmark, iterations=20, processes=2, concurrency=2)
+    assert result.errors == 0
+    assert result.iterations == 20
+    assert result.processes == 2
+    assert benchmark.histogram.total_count == 20
+    assert result.cleanup_objects == 20
+
+
+def test_process_failing_before_start_is_reported_quickly(tmp_path):
+    benchmark = FailingSpawnBenchmark("local", str(tmp_path), "small_files")
+    benchmark.resource_interval = 0
+    benchmark.parent_pid = os.getpid()
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match="process 1: ValueError: spawn failed"):
+        run_multiprocess(benchmark, iterations=20, processes=3)
+    assert time.perf_counter() - start < 60
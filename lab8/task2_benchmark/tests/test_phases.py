@@ -0,0 +1,70 @@
+"""Фазы HTTP запросов boto3 и переиспользование соединений на встроенном S3"""
+
+import types
+
+from botocore.hooks import HierarchicalEmitter
+
+from benchmark import phases
+from benchmark.native_s3 import NativeS3Benchmark
+from benchmark.phases import instrument_client
+
+
+def _put_and_get(client, count: int):
+    for i in range(count):
+        client.put_object(Bucket="bench", Key=f"k{i}", Body=b"x" * 4096)
+    for i in range(count):
+        client.get_object(Bucket="bench", Key=f"k{i}")['Body'].read()
+
+
+def test_phase_stats_and_connection_reuse(s3_client):
+    stats = instrument_client(s3_client)
+    s3_client.head_bucket(Bucket="bench")  # До start() не записывается
+    stats.start()
+    _put_and_get(s3_client, 10)
+    stats.stop()
+    data = stats.to_dict()
+    assert data['requests'] == 20
+    assert data['retries'] == 0
+    # Последовательные запросы одного потока идут по одному соединению
+    assert data['connections_new'] == 0
+    assert data['connections_reused'] == 20
+    counts = {phase: histogram['total_count'] for phase, histogram in data['phases'].items()}
+    for phase in ('serialize', 'sign', 'send', 'ttfb', 'response'):
+        assert counts[phase] == 20
+    assert counts['transfer'] == 10
+    assert 'connect' not in counts
+
+
+def test_new_connections_counted_per_thread(s3_server):
+    benchmark = NativeS3Benchmark("bench", "small_files", s3_server.endpoint_url,
+                                  "test", "test")
+    benchmark.resource_interval = 0
+    result = benchmark.run(iterations=40, concurrency=4)
+    phases_data = result.http_phases
+    assert phases_data['requests'] >= 40
+    assert 1 <= phases_data['connections_new'] <= 4
+    assert phases_data['connections_new'] + phases_data['connections_reused'] \
+        == phases_data['requests']
+
+
+def test_missing_pool_internals_keep_event_phases(s3_client, monkeypatch, capsys):
+    monkeypatch.setattr(phases, '_pool_swap_warned', False)
+    endpoint = s3_client._endpoint
+    # Клиент без внутренних атрибутов пула (другая версия botocore)
+    s3_client._endpoint = types.SimpleNamespace()
+    try:
+        stats = instrument_client(s3_client)
+    finally:
+        s3_client._endpoint = endpoint
+    other = types.SimpleNamespace(meta=types.SimpleNamespace(events=HierarchicalEmitter()),
+                                  _endpoint=types.SimpleNamespace())
+    instrument_client(other)
+    assert capsys.readouterr().out.count("Connection phases are not traced") == 1
+
+    stats.start()
+    _put_and_get(s3_client, 3)
+    data = stats.to_dict()
+    assert data['requests'] == 6
+    assert data['connections_new'] == data['connections_reused'] == 0
+    # response считается от заголовков ответа, которые видит только пул
+    assert set(data['phases']) == {'serialize', 'sign', 'transfer'}
@@ -0,0 +1,43 @@
+"""Повторы: aggregate_runs и Welch t-test"""
+
+import math
+
+import numpy as np
+import pytest
+
+from benchmark.base import BenchmarkResult
+from benchmark.histogram import LatencyHistogram
+from benchmark.repetition import aggregate_runs, significantly_better
+
+
+def _result(throughput: float, p99: float = 10.0) -> BenchmarkResult:
+    histogram = LatencyHistogram()
+    histogram.record(p99)
+    return BenchmarkResult(name="t", storage_type="test", throughput_mbps=throughput,
+                           iops=throughput * 10, latency_avg_ms=p99, latency_p95_ms=p99,
+                           latency_p99_ms=p99, errors=0, total_time_sec=1.0, iterations=10,
+                           latency_histogram=histogram.to_dict())
+
+
+def test_aggregate_runs_excludes_outliers():
+    runs = [_result(t) for t in (100.0, 101.0, 99.0, 100.5, 10.0)]
+    summary = aggregate_runs(runs)
+    assert summary.repeats == 5
+    assert summary.outlier_runs == 1
+    assert summary.run_outliers == [False, False, False, False, True]
+    assert summary.throughput_mbps == pytest.approx(100.125)
+    assert summary.iterations == 40
+    assert LatencyHistogram.from_dict(summary.latency_histogram).total_count == 4
+    kept = [100.0, 101.0, 99.0, 100.5]
+    expected_ci = 3.182 * np.std(kept, ddof=1) / math.sqrt(4)
+    assert summary.throughput_ci_mbps == pytest.approx(expected_ci)
+
+
+def test_welch_significance():
+    fast = aggregate_runs([_result(t) for t in (120.0, 121.0, 119.0)])
+    slow = aggregate_runs([_result(t) for t in (100.0, 101.0, 99.0)])
+    noisy = aggregate_runs([_result(t) for t in (90.0, 130.0, 110.0)])
+    assert significantly_better(fast, slow) is True
+    assert significantly_better(slow, fast) is False
+    assert significantly_better(fast, noisy) is False
+    assert significantly_better(fast, _result(100.0)) is None
@@ -0,0 +1,31 @@
+"""Короткий прогон NativeS3Benchmark на встроенном S3"""
+
+from benchmark.histogram import LatencyHistogram
+from benchmark.native_s3 import NativeS3Benchmark
+from benchmark.spec import KeyPopularity, SizeDistribution, WorkloadSpec
+
+
+def test_smoke_native_s3_on_local_server(s3_server):
+    benchmark = NativeS3Benchmark("bench", "small_files", s3_server.endpoint_url,
+                                  "test", "test")
+    benchmark.resource_interval = 0
+    result = benchmark.run(iterations=20, concurrency=2)
+    assert result.errors == 0
+    assert result.iterations == 20
+    assert LatencyHistogram.from_dict(result.latency_histogram).total_count == 20
+    assert result.throughput_mbps > 0
+    assert result.cleanup_objects == 20
+
+
+def test_smoke_spec_on_local_server(s3_server):
+    spec = WorkloadSpec(name="t", operations={"get": 0.8, "put": 0.2},
+                        object_size=SizeDistribution("fixed", {'size': 1024}),
+                        keys=10, popularity=KeyPopularity("uniform"), ops=50,
+                        prefill=True, seed=3)
+    benchmark = NativeS3Benchmark("bench", None, s3_server.endpoint_url, "test", "test",
+                                  spec=spec)
+    benchmark.resource_interval = 0
+    result = benchmark.run(iterations=50, concurrency=2)
+    assert result.errors == 0
+    assert result.iterations == 50
+    assert result.cleanup_objects == 10
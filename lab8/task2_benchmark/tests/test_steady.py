@@ -0,0 +1,16 @@
+"""MSER: отсечение переходного режима"""
+
+import numpy as np
+
+from benchmark.steady import detect_steady_state
+
+
+def test_mser_truncates_transient():
+    noise = np.random.default_rng(0).normal(0, 0.5, 30)
+    values = [10.0, 30.0, 60.0, 80.0] + list(100 + noise)
+    assert detect_steady_state(values) == 4
+
+
+def test_mser_keeps_stationary_and_short_series():
+    assert detect_steady_state([5.0] * 20) == 0
+    assert detect_steady_state([1.0, 100.0, 100.0]) == 0
@@ -0,0 +1,180 @@
+"""Движки передачи: multipart upload, Range GET загрузка, массовое удаление"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from benchmark.transfer import BulkDeleter, MIN_PART_SIZE, MultipartUploader, RangedDownloader
+
+
+def _data(size: int) -> bytes:
+    return np.random.default_rng(size).integers(0, 256, size, dtype=np.uint8).tobytes()
+
+
+# --- MultipartUploader ---
+
+def test_multipart_upload_round_trip(s3_server, s3_client):
+    data = _data(2 * MIN_PART_SIZE + 12345)
+    uploader = MultipartUploader(s3_client, "bench", MIN_PART_SIZE, concurrency=3)
+    try:
+        assert uploader.upload("big.dat", data) == len(data)
+    finally:
+        uploader.close()
+    assert s3_client.get_object(Bucket="bench", Key="big.dat")['Body'].read() == data
+    assert not s3_server.backend.uploads
+
+
+class FailingPartClient:
+    """Заглушка S3: часть 2 падает сразу, остальные отправляются 50 ms"""
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def _event(self, *event):
+        with self._lock:
+            self.events.append(event)
+
+    def create_multipart_upload(self, **kwargs):
+        return {'UploadId': "u1"}
+
+    def upload_part(self, PartNumber, **kwargs):
+        self._event('start', PartNumber)
+        if PartNumber == 2:
+            self._event('end', PartNumber)
+            raise IOError("SlowDown")
+        time.sleep(0.05)
+        self._event('end', PartNumber)
+        return {'ETag': f"etag{PartNumber}"}
+
+    def complete_multipart_upload(self, **kwargs):
+        self._event('complete')
+
+    def abort_multipart_upload(self, **kwargs):
+        self._event('abort')
+
+
+def test_failed_part_aborts_after_in_flight_parts_finish():
+    client = FailingPartClient()
+    uploader = MultipartUploader(client, "bench", MIN_PART_SIZE, concurrency=2)
+    try:
+        with pytest.raises(IOError, match="SlowDown"):
+            uploader.upload("big.dat", bytes(20 * MIN_PART_SIZE))
+    finally:
+        uploader.close()
+    events = client.events
+    assert events[-1] == ('abort',)
+    assert ('complete',) not in events
+    started = {event[1] for event in events if event[0] == 'start'}
+    ended = {event[1] for event in events if event[0] == 'end'}
+    # Все начатые части завершились до abort, части из очереди отменены
+    assert started == ended
+    assert len(started) < 20
+
+
+# --- RangedDownloader ---
+
+def test_ranged_download_round_trip(s3_client, tmp_path):
+    # Размер не кратен диапазону: последний диапазон короче
+    data = _data(1000003)
+    s3_client.put_object(Bucket="bench", Key="obj.dat", Body=data)
+    downloader = RangedDownloader(s3_client, "bench", range_size=65536, concurrency=4)
+    try:
+        buffer = bytearray(len(data) + 10)
+        assert downloader.download("obj.dat", buffer) == len(data)
+        assert bytes(buffer[:len(data)]) == data
+        path = tmp_path / "obj.dat"
+        assert downloader.download_file("obj.dat", str(path)) == len(data)
+        assert path.read_bytes() == data
+        with pytest.raises(ValueError):
+            downloader.download("obj.dat", bytearray(10))
+    finally:
+        downloader.close()
+
+
+# --- BulkDeleter ---
+
+def test_bulk_delete_walks_all_pages(s3_client):
+    keys = [f"p/{i:05d}" for i in range(2500)]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(lambda key: s3_client.put_object(Bucket="bench", Key=key, Body=b"x"),
+                          keys + ["other/keep"]))
+    deleter = BulkDeleter(s3_client, "bench", concurrency=4)
+    # 3 страницы листинга по 1000 ключей
+    assert deleter.delete_prefix("p/") == 2500
+    assert deleter.failed == 0
+    assert s3_client.list_objects_v2(Bucket="bench", Prefix="p/")['KeyCount'] == 0
+    assert s3_client.list_objects_v2(Bucket="bench")['KeyCount'] == 1
+
+
+class FlakyDeleteClient:
+    """
+    Заглушка S3: пакет с ключом fail_key всегда падает, пакет с ключом
+    flaky_key падает один раз, в ответе на пакет с partial_key - 3 ошибки.
+    Листинг отдает страницы по 1000 ключей и падает на странице list_fail_page.
+    """
+
+    def __init__(self, fail_key=None, flaky_key=None, partial_key=None,
+                 list_fail_page=None):
+        self.fail_key = fail_key
+        self.flaky_key = flaky_key
+        self.partial_key = partial_key
+        self.list_fail_page = list_fail_page
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [obj['Key'] for obj in Delete['Objects']]
+        with self._lock:
+            self.calls += 1
+            if self.flaky_key in keys:
+                self.flaky_key = None
+                raise ConnectionResetError("connection reset")
+        if self.fail_key in keys:
+            raise IOError("SlowDown")
+        if self.partial_key in keys:
+            return {'Errors': [{'Key': key} for key in keys[:3]]}
+        return {}
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        for page in range(5):
+            if page == self.list_fail_page:
+                raise IOError("listing failed")
+            yield {'Contents': [{'Key': f"k{i}"} for i in range(page * 1000, page * 1000 + 1000)]}
+
+
+KEYS = [f"k{i}" for i in range(5000)]
+
+
+def test_bulk_delete_failed_batch_does_not_stop_walk():
+    client = FlakyDeleteClient(fail_key="k1500")
+    deleter = BulkDeleter(client, "bench", concurrency=2)
+    assert deleter.delete_keys(KEYS) == 4000
+    assert deleter.failed == 1000
+    assert deleter.deleted == 4000
+    assert "SlowDown" in deleter.last_error
+    # Упавший пакет повторен один раз, остальные - по одному запросу
+    assert client.calls == 6
+
+
+def test_bulk_delete_retries_batch_and_counts_partial_errors():
+    client = FlakyDeleteClient(flaky_key="k10", partial_key="k4999")
+    deleter = BulkDeleter(client, "bench", concurrency=2)
+    assert deleter.delete_keys(KEYS) == 4997
+    assert deleter.failed == 3
+    assert client.calls == 6
+
+
+def test_bulk_delete_keeps_count_when_listing_fails():
+    client = FlakyDeleteClient(list_fail_page=2)
+    deleter = BulkDeleter(client, "bench", concurrency=2)
+    with pytest.raises(IOError, match="listing failed"):
+        deleter.delete_prefix("")
+    assert deleter.deleted == 2000
+    assert deleter.failed == 0
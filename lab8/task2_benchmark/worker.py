@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Узел распределенного прогона: принимает нагрузки от координатора
+(main.py --workers) и выполняет их этим хостом.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Добавляем путь к benchmark модулю
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark.distributed import DEFAULT_WORKER_HOST, DEFAULT_WORKER_PORT, WorkerServer
+from main import check_mount_points, create_benchmark
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Worker node for distributed benchmark runs',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Three workers on one box, coordinated by main.py
+  python3 worker.py --port 9601 &
+  python3 worker.py --port 9602 &
+  python3 worker.py --port 9603 &
+  python3 main.py --bucket benchmark --endpoint http://localhost:9000 \\
+      --storage native_s3 --workers localhost:9601 localhost:9602 localhost:9603
+
+  # Worker reachable from a coordinator on another host
+  python3 worker.py --host 0.0.0.0 --port 9600
+        """
+    )
+    parser.add_argument('--host', default=DEFAULT_WORKER_HOST,
+                       help='Address to listen on (0.0.0.0 for remote coordinators)')
+    parser.add_argument('--port', type=int, default=DEFAULT_WORKER_PORT,
+                       help='Port to listen on')
+    args = parser.parse_args()
+
+    # Credentials - свои у каждого узла, по сети не передаются
+    access_key = os.getenv("AWS_ACCESS_KEY_ID", "minioadmin")
+    secret_key = os.getenv("AWS_SECRET_ACCESS_KEY", "minioadmin")
+
+    def make_benchmark(options):
+        # Точки монтирования проверяются на узле: у координатора их может не быть
+        storage_type = options['storage_type']
+        if storage_type in ['s3fs', 'goofys']:
+            issues = check_mount_points(**{f"{storage_type}_mount": options['mount_point']})
+            if issues:
+                raise ValueError("; ".join(issues))
+        return create_benchmark(access_key=access_key, secret_key=secret_key, **options)
+
+    try:
+        WorkerServer(make_benchmark, args.port, args.host).serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()